@@ -57,6 +57,15 @@ export interface ActivitySummary {
   avg_tokens_per_request: number;
 }
 
+export interface KPIDashboard {
+  summary: KPISummary;
+  tokens: TokenBucket[];
+  chats_created: ChatsBucket[];
+  assist_modes: AssistModeRow[];
+  models: ModelRow[];
+  activity: ActivitySummary;
+}
+
 export interface AuditLogRow {
   id: string;
   user_id: string;
@@ -78,6 +87,21 @@ export interface AuditLogsResponse {
   next_cursor: string | null;
 }
 
+/** All KPI panels for one range/scope in a single request. */
+export async function fetchKPIDashboard(params: {
+  granularity?: string;
+  range?: string;
+  scope?: "tenant" | "me";
+}): Promise<KPIDashboard> {
+  const res = await adminFetch("/kpis/dashboard", {
+    granularity: params.granularity ?? "day",
+    range: params.range ?? "last30d",
+    scope: params.scope ?? "me",
+  });
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
 export async function fetchKPISummary(params: {
   range?: string;
   scope?: "tenant" | "me";
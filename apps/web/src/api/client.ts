@@ -53,6 +53,10 @@ export interface ChatSummary {
   is_favorite: boolean;
   folder_id?: string | null;
   status?: string;
+  /** Counters kept on the chat (non-system messages) */
+  message_count?: number;
+  last_message_at?: string | null;
+  last_message_preview?: string | null;
 }
 
 export interface FolderOut {
@@ -63,9 +67,13 @@ export interface FolderOut {
 
 export interface MessageOut {
   id: string;
+  /** Position in the chat (1, 2, ...); order messages by it */
+  seq: number;
   role: string;
   content: string;
   created_at: string;
+  /** Sanitized structured blocks (assistant messages); null -> render content as markdown */
+  blocks?: StructuredBlock[] | null;
 }
 
 export interface ChatDetail {
@@ -76,7 +84,10 @@ export interface ChatDetail {
   status?: string;
   created_at: string;
   updated_at: string;
+  /** Newest page of messages, oldest first */
   messages: MessageOut[];
+  /** Cursor for older messages (listMessages); null when all are loaded */
+  messages_next_cursor?: string | null;
   /** Session context for Smart Context Banner */
   last_message_at?: string | null;
   first_message_at?: string | null;
@@ -107,13 +118,22 @@ export async function createChat(title?: string): Promise<ChatSummary & { create
   return res.json();
 }
 
+export interface ChatListPage {
+  items: ChatSummary[];
+  next_cursor: string | null;
+}
+
 export async function listChats(params?: {
   folderId?: string | null;
   unfiledOnly?: boolean;
-}): Promise<ChatSummary[]> {
+  cursor?: string | null;
+  limit?: number;
+}): Promise<ChatListPage> {
   const sp = new URLSearchParams();
   if (params?.folderId) sp.set("folder_id", params.folderId);
   if (params?.unfiledOnly) sp.set("unfiled_only", "true");
+  if (params?.cursor) sp.set("cursor", params.cursor);
+  if (params?.limit) sp.set("limit", String(params.limit));
   const q = sp.toString();
   const res = await apiFetch(`/chats${q ? `?${q}` : ""}`);
   if (!res.ok) throw new Error(await res.text());
@@ -126,6 +146,20 @@ export async function getChat(chatId: string): Promise<ChatDetail> {
   return res.json();
 }
 
+export interface MessagePage {
+  items: MessageOut[];
+  next_cursor: string | null;
+}
+
+/** Page of messages older than the cursor, oldest first. */
+export async function listMessages(chatId: string, cursor: string, limit?: number): Promise<MessagePage> {
+  const sp = new URLSearchParams({ cursor });
+  if (limit) sp.set("limit", String(limit));
+  const res = await apiFetch(`/chats/${chatId}/messages?${sp.toString()}`);
+  if (!res.ok) throw new Error(await res.text());
+  return res.json();
+}
+
 export async function patchChat(
   chatId: string,
   patch: { title?: string; is_favorite?: boolean; folder_id?: string | null; metadata?: Record<string, unknown> }
@@ -1,8 +1,10 @@
 /** SSE streaming for chat messages. */
-import { apiFetchStream } from "./client";
+import { apiFetchStream, type StructuredBlock } from "./client";
 
 export interface StreamCallbacks {
   onToken: (text: string) => void;
+  /** Structured block of the answer, sent as soon as it is complete (index = position in the answer). */
+  onBlock?: (index: number, block: StructuredBlock) => void;
   onDone: (data: { message_id: string; usage?: { prompt_tokens?: number; completion_tokens?: number } }) => void;
   onError: (message: string) => void;
 }
@@ -56,6 +58,8 @@ export async function streamChatMessage(
             const obj = JSON.parse(data) as Record<string, unknown>;
             if (event === "token" && typeof obj.text === "string") {
               callbacks.onToken(obj.text);
+            } else if (event === "block" && typeof obj.index === "number") {
+              callbacks.onBlock?.(obj.index, obj.block as StructuredBlock);
             } else if (event === "done") {
               callbacks.onDone({
                 message_id: (obj.message_id as string) ?? "",
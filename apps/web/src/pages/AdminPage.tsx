@@ -2,12 +2,7 @@
 import { useCallback, useState, useEffect } from "react";
 import { useQuery } from "@tanstack/react-query";
 import {
-  fetchKPISummary,
-  fetchKPITokens,
-  fetchKPIChatsCreated,
-  fetchKPIAssistModes,
-  fetchKPIModels,
-  fetchKPIActivity,
+  fetchKPIDashboard,
   fetchAuditLogs,
   type KPISummary,
   type AuditLogRow,
@@ -75,35 +70,16 @@ function KPITab({ scope }: { scope: Scope }) {
   const [granularity, setGranularity] = useState<Granularity>("day");
   const range = "last30d";
 
-  const { data: summary, isLoading: summaryLoading } = useQuery({
-    queryKey: ["admin", "kpis", "summary", scope, range],
-    queryFn: () => fetchKPISummary({ range, scope }),
-  });
-
-  const { data: tokens } = useQuery({
-    queryKey: ["admin", "kpis", "tokens", scope, granularity, range],
-    queryFn: () => fetchKPITokens({ granularity, range, scope }),
-  });
-
-  const { data: chatsCreated } = useQuery({
-    queryKey: ["admin", "kpis", "chats", scope, granularity, range],
-    queryFn: () => fetchKPIChatsCreated({ granularity, range, scope }),
-  });
-
-  const { data: assistModes } = useQuery({
-    queryKey: ["admin", "kpis", "assist-modes", scope, range],
-    queryFn: () => fetchKPIAssistModes({ range, scope }),
-  });
-
-  const { data: models } = useQuery({
-    queryKey: ["admin", "kpis", "models", scope, range],
-    queryFn: () => fetchKPIModels({ range, scope }),
-  });
-
-  const { data: activity } = useQuery({
-    queryKey: ["admin", "kpis", "activity", scope, range],
-    queryFn: () => fetchKPIActivity({ range, scope }),
+  const { data: dashboard, isLoading: summaryLoading } = useQuery({
+    queryKey: ["admin", "kpis", "dashboard", scope, granularity, range],
+    queryFn: () => fetchKPIDashboard({ granularity, range, scope }),
   });
+  const summary = dashboard?.summary;
+  const tokens = dashboard?.tokens;
+  const chatsCreated = dashboard?.chats_created;
+  const assistModes = dashboard?.assist_modes;
+  const models = dashboard?.models;
+  const activity = dashboard?.activity;
 
   const maxTokens = Math.max(1, ...(tokens?.map((t) => t.total_tokens) ?? []));
   const maxChats = Math.max(1, ...(chatsCreated?.map((c) => c.chats_created) ?? []));
@@ -1,7 +1,7 @@
 /** Chat — streaming interface with assist modes and anonymization. Mobile-first: cards on small screens, sidebar on md+. */
-import { useCallback, useEffect, useRef, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate, useParams } from "react-router-dom";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
 import {
   createChat,
   deleteChat,
@@ -15,6 +15,7 @@ import {
   listChats,
   listFolders,
   listInterventions,
+  listMessages,
   listPrompts,
   patchChat,
   type CaseSummaryOut,
@@ -287,6 +288,9 @@ function ChatList({
   isLoading,
   exportLoading,
   caseSummaryLoading,
+  hasMore,
+  loadingMore,
+  onLoadMore,
 }: {
   chats: ChatSummary[];
   chatId: string | null;
@@ -308,6 +312,9 @@ function ChatList({
   isLoading?: boolean;
   exportLoading?: boolean;
   caseSummaryLoading?: boolean;
+  hasMore?: boolean;
+  loadingMore?: boolean;
+  onLoadMore?: () => void;
 }) {
   return (
     <div className="flex flex-col rounded-lg border border-gray-200 bg-white dark:border-gray-700 dark:bg-gray-800">
@@ -405,6 +412,16 @@ className={`min-h-touch rounded px-2.5 py-1.5 text-left text-sm transition-color
             ))}
           </ul>
         )}
+        {hasMore && onLoadMore && (
+          <button
+            type="button"
+            onClick={onLoadMore}
+            disabled={loadingMore}
+            className="mt-2 min-h-touch w-full rounded px-2.5 py-1.5 text-sm text-gray-600 hover:bg-gray-100 disabled:opacity-50 dark:text-gray-300 dark:hover:bg-gray-700"
+          >
+            {loadingMore ? "Laden..." : "Weitere Chats laden"}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -460,6 +477,7 @@ function ChatListItem({
           <button
             type="button"
             onClick={onSelect}
+            title={chat.last_message_preview ?? undefined}
             className="min-h-touch min-w-0 flex-1 truncate text-left text-sm"
           >
             {chat.title}
@@ -545,15 +563,26 @@ export default function ChatPage() {
     queryFn: listFolders,
   });
 
-  const { data: chats = [], refetch: refetchChats, isError: chatsError, isLoading: chatsLoading } = useQuery({
+  const {
+    data: chatPages,
+    refetch: refetchChats,
+    isError: chatsError,
+    isLoading: chatsLoading,
+    hasNextPage: hasMoreChats,
+    fetchNextPage: fetchMoreChats,
+    isFetchingNextPage: chatsLoadingMore,
+  } = useInfiniteQuery({
     queryKey: ["chats", selectedFolderId],
-    queryFn: () =>
+    queryFn: ({ pageParam }) =>
       selectedFolderId === "unfiled"
-        ? listChats({ unfiledOnly: true })
+        ? listChats({ unfiledOnly: true, cursor: pageParam })
         : selectedFolderId
-          ? listChats({ folderId: selectedFolderId })
-          : listChats(),
+          ? listChats({ folderId: selectedFolderId, cursor: pageParam })
+          : listChats({ cursor: pageParam }),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
   });
+  const chats = useMemo(() => chatPages?.pages.flatMap((p) => p.items) ?? [], [chatPages]);
 
   const { data: prompts = [], isError: promptsError } = useQuery({
     queryKey: ["prompts"],
@@ -823,7 +852,46 @@ export default function ChatPage() {
     [chatId, refetchChat]
   );
 
-  const messages: MessageOut[] = chatDetail?.messages ?? [];
+  // Messages seen in this chat (newest page from chatDetail plus older pages), keyed by id:
+  // refetches after sending only return the newest page, so older ones are kept here.
+  const [loadedMessages, setLoadedMessages] = useState<Record<string, MessageOut>>({});
+  const [olderCursor, setOlderCursor] = useState<string | null | undefined>(undefined);
+  const [olderLoading, setOlderLoading] = useState(false);
+
+  useEffect(() => {
+    setLoadedMessages({});
+    setOlderCursor(undefined);
+  }, [chatId]);
+
+  useEffect(() => {
+    if (!chatDetail || chatDetail.id !== chatId) return;
+    setLoadedMessages((prev) => ({
+      ...prev,
+      ...Object.fromEntries(chatDetail.messages.map((m) => [m.id, m])),
+    }));
+    setOlderCursor((prev) => (prev === undefined ? chatDetail.messages_next_cursor ?? null : prev));
+  }, [chatId, chatDetail]);
+
+  const messages: MessageOut[] = useMemo(
+    () => Object.values(loadedMessages).sort((a, b) => a.seq - b.seq),
+    [loadedMessages]
+  );
+
+  const handleLoadOlder = useCallback(async () => {
+    if (!chatId || !olderCursor) return;
+    setOlderLoading(true);
+    try {
+      const page = await listMessages(chatId, olderCursor);
+      setLoadedMessages((prev) => ({
+        ...prev,
+        ...Object.fromEntries(page.items.map((m) => [m.id, m])),
+      }));
+      setOlderCursor(page.next_cursor);
+    } finally {
+      setOlderLoading(false);
+    }
+  }, [chatId, olderCursor]);
+
   const isFinalized = chatDetail?.status === "finalized";
 
   // Initialize safe_mode from conversation metadata when chat loads
@@ -848,7 +916,7 @@ export default function ChatPage() {
     }
   }, [structuredDoc?.content, structuredDoc?.version]);
   const displayMessages = streamingContent
-    ? [...messages, { id: "streaming", role: "assistant", content: streamingContent, created_at: "" }]
+    ? [...messages, { id: "streaming", seq: Number.MAX_SAFE_INTEGER, role: "assistant", content: streamingContent, created_at: "" }]
     : messages;
 
   useEffect(() => {
@@ -898,6 +966,9 @@ export default function ChatPage() {
             onEditingChange={handleEditingChange}
             exportLoading={exportLoading}
             caseSummaryLoading={caseSummaryLoading}
+            hasMore={hasMoreChats}
+            loadingMore={chatsLoadingMore}
+            onLoadMore={() => fetchMoreChats()}
           />
         </aside>
 
@@ -1021,6 +1092,16 @@ export default function ChatPage() {
                         totalTokens={chatDetail.total_tokens_in_session ?? 0}
                       />
                     )}
+                    {olderCursor && (
+                      <button
+                        type="button"
+                        onClick={handleLoadOlder}
+                        disabled={olderLoading}
+                        className="mb-4 min-h-touch w-full rounded px-2.5 py-1.5 text-sm text-gray-600 hover:bg-gray-100 disabled:opacity-50 dark:text-gray-300 dark:hover:bg-gray-700"
+                      >
+                        {olderLoading ? "Laden..." : "Ältere Nachrichten laden"}
+                      </button>
+                    )}
                     <ul className="space-y-4">
                     {displayMessages.map((m) => (
                       <li
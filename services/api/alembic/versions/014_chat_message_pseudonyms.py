@@ -0,0 +1,38 @@
+"""Add chat_messages.content_anonymized and chats.pseudonyms for consistent LLM history.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+Each message stores its pseudonymized shadow (computed once at insert) next to the original.
+chats.pseudonyms maps original person names to stable per-chat placeholders ([PERSON_1], ...).
+Additive; existing rows get their shadow lazily on the next LLM turn.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_messages", sa.Column("content_anonymized", sa.Text(), nullable=True))
+    op.add_column(
+        "chats",
+        sa.Column(
+            "pseudonyms",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("chats", "pseudonyms")
+    op.drop_column("chat_messages", "content_anonymized")
@@ -0,0 +1,28 @@
+"""Add chat_messages.blocks: structured blocks pre-rendered for assistant messages.
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+Assistant replies are sanitized and split into blocks (same schema as ai_responses.structured_blocks)
+once, when the message is stored. NULL for user messages, rows written before this revision and
+replies rejected by the sanitizer; clients render the raw markdown in that case.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_messages", sa.Column("blocks", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_messages", "blocks")
@@ -0,0 +1,48 @@
+"""Add reprocess_checkpoints for resumable bulk reprocessing of ai_responses.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+One row per (job, tenant): last processed ai_responses.id (keyset position) and counters.
+A job name identifies the sanitizer/extractor code version, so a rerun after a crash resumes
+and a run after a parser change starts over.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reprocess_checkpoints",
+        sa.Column("job", sa.Text(), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("last_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job", "tenant_id"),
+    )
+
+    op.execute("ALTER TABLE reprocess_checkpoints ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_reprocess_checkpoints ON reprocess_checkpoints
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_reprocess_checkpoints ON reprocess_checkpoints")
+    op.execute("ALTER TABLE reprocess_checkpoints DISABLE ROW LEVEL SECURITY")
+    op.drop_table("reprocess_checkpoints")
@@ -0,0 +1,87 @@
+"""Counter-based version allocation for ai_responses and prompt_versions.
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-19
+
+Replaces SELECT MAX(version) + 1 (a scan that races under concurrency) with counters:
+- ai_response_version_counters: last version per (tenant_id, entity_id), RLS
+- prompts.latest_version: last version of the prompt's prompt_versions
+Unique (tenant_id, entity_id, version) / (prompt_id, version) constraints back them up.
+Versions duplicated by earlier races are renumbered (creation order kept) before the constraints
+are added; counters are seeded from the resulting maxima.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Renumber duplicates from concurrent MAX()+1 allocation
+    op.execute("""
+        UPDATE ai_responses r SET version = d.rn
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY tenant_id, entity_id ORDER BY version, created_at, id
+            ) AS rn
+            FROM ai_responses
+        ) d
+        WHERE r.id = d.id AND r.version <> d.rn
+    """)
+    op.execute("""
+        UPDATE prompt_versions v SET version = d.rn
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY prompt_id ORDER BY version, created_at, id) AS rn
+            FROM prompt_versions
+        ) d
+        WHERE v.id = d.id AND v.version <> d.rn
+    """)
+
+    op.drop_index("idx_ai_responses_entity_version", table_name="ai_responses")
+    op.create_unique_constraint(
+        "uq_ai_responses_tenant_entity_version", "ai_responses", ["tenant_id", "entity_id", "version"]
+    )
+    op.create_unique_constraint("uq_prompt_versions_prompt_version", "prompt_versions", ["prompt_id", "version"])
+
+    op.create_table(
+        "ai_response_version_counters",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("entity_id", sa.String(255), nullable=False),
+        sa.Column("last_version", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "entity_id"),
+    )
+    op.execute("""
+        INSERT INTO ai_response_version_counters (tenant_id, entity_id, last_version)
+        SELECT tenant_id, entity_id, MAX(version) FROM ai_responses GROUP BY tenant_id, entity_id
+    """)
+    op.execute("ALTER TABLE ai_response_version_counters ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_ai_response_version_counters ON ai_response_version_counters
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+    op.add_column("prompts", sa.Column("latest_version", sa.Integer(), nullable=False, server_default="0"))
+    op.execute("""
+        UPDATE prompts p SET latest_version = v.max_version
+        FROM (SELECT prompt_id, MAX(version) AS max_version FROM prompt_versions GROUP BY prompt_id) v
+        WHERE p.id = v.prompt_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("prompts", "latest_version")
+    op.execute(
+        "DROP POLICY IF EXISTS tenant_isolation_ai_response_version_counters ON ai_response_version_counters"
+    )
+    op.drop_table("ai_response_version_counters")
+    op.drop_constraint("uq_prompt_versions_prompt_version", "prompt_versions", type_="unique")
+    op.drop_constraint("uq_ai_responses_tenant_entity_version", "ai_responses", type_="unique")
+    op.create_index("idx_ai_responses_entity_version", "ai_responses", ["entity_id", "version"], unique=False)
@@ -0,0 +1,142 @@
+"""Monthly range partitions for domain_events; entity_snapshots for projections.
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-19
+
+domain_events becomes PARTITION BY RANGE (timestamp) with one partition per month
+(domain_events_yYYYYmMM) plus a default partition as a safety net. Existing rows are copied.
+Partition keys must be part of every unique index: PK is (id, timestamp), event_id is unique per
+(event_id, timestamp). Future partitions are created and expired ones detached by
+scripts/manage_partitions.py (app/services/partitions.py).
+
+entity_snapshots: periodic projection state per entity (app/services/projections.py), so a replay
+reads snapshot + tail instead of the entity's full history.
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+_COLUMNS = (
+    "id, tenant_id, event_id, timestamp, actor, entity_type, entity_id, event_type, payload, "
+    "source, schema_version, confidence, model"
+)
+
+
+def _add_months(month: date, n: int) -> date:
+    y, m = divmod(month.month - 1 + n, 12)
+    return date(month.year + y, m + 1, 1)
+
+
+def _rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"""
+        CREATE POLICY tenant_isolation_{table} ON {table}
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_domain_events ON domain_events")
+    op.execute("ALTER TABLE domain_events RENAME TO domain_events_unpartitioned")
+    op.execute("ALTER TABLE domain_events_unpartitioned RENAME CONSTRAINT domain_events_pkey TO domain_events_unpartitioned_pkey")
+
+    op.execute("""
+        CREATE TABLE domain_events (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            tenant_id UUID NOT NULL REFERENCES tenants(id) ON DELETE CASCADE,
+            event_id UUID NOT NULL,
+            timestamp TIMESTAMPTZ NOT NULL DEFAULT now(),
+            actor VARCHAR(100) NOT NULL,
+            entity_type VARCHAR(100) NOT NULL,
+            entity_id VARCHAR(255) NOT NULL,
+            event_type VARCHAR(100) NOT NULL,
+            payload JSONB NOT NULL,
+            source VARCHAR(100) NOT NULL,
+            schema_version VARCHAR(20) NOT NULL DEFAULT '1',
+            confidence DOUBLE PRECISION,
+            model VARCHAR(100),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("CREATE UNIQUE INDEX uq_domain_events_event_id ON domain_events (event_id, timestamp)")
+    op.execute("CREATE INDEX ix_domain_events_tenant_ts ON domain_events (tenant_id, timestamp)")
+    op.execute(
+        "CREATE INDEX ix_domain_events_entity_ts ON domain_events (tenant_id, entity_type, entity_id, timestamp, event_id)"
+    )
+
+    oldest = conn.execute(sa.text("SELECT MIN(timestamp) FROM domain_events_unpartitioned")).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = (oldest.date().replace(day=1) if oldest else this_month)
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        nxt = _add_months(month, 1)
+        op.execute(f"""
+            CREATE TABLE domain_events_y{month.year}m{month.month:02d} PARTITION OF domain_events
+            FOR VALUES FROM ('{month.isoformat()}') TO ('{nxt.isoformat()}')
+        """)
+        month = nxt
+    op.execute("CREATE TABLE domain_events_default PARTITION OF domain_events DEFAULT")
+
+    op.execute(f"INSERT INTO domain_events ({_COLUMNS}) SELECT {_COLUMNS} FROM domain_events_unpartitioned")
+    op.execute("DROP TABLE domain_events_unpartitioned")
+    _rls("domain_events")
+
+    op.create_table(
+        "entity_snapshots",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("projection", sa.String(100), nullable=False),
+        sa.Column("entity_id", sa.String(255), nullable=False),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("last_event_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "projection", "entity_id"),
+    )
+    _rls("entity_snapshots")
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_entity_snapshots ON entity_snapshots")
+    op.drop_table("entity_snapshots")
+
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_domain_events ON domain_events")
+    op.execute("ALTER TABLE domain_events RENAME TO domain_events_partitioned")
+    op.create_table(
+        "domain_events",
+        sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("uuid_generate_v4()"), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("actor", sa.String(100), nullable=False),
+        sa.Column("entity_type", sa.String(100), nullable=False),
+        sa.Column("entity_id", sa.String(255), nullable=False),
+        sa.Column("event_type", sa.String(100), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("source", sa.String(100), nullable=False),
+        sa.Column("schema_version", sa.String(20), nullable=False, server_default="1"),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("model", sa.String(100), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Detached (archived) partitions are not copied back
+    op.execute(f"INSERT INTO domain_events ({_COLUMNS}) SELECT {_COLUMNS} FROM domain_events_partitioned")
+    op.execute("DROP TABLE domain_events_partitioned")
+    op.create_index("ix_domain_events_tenant_id", "domain_events", ["tenant_id"], unique=False)
+    op.create_index("ix_domain_events_entity", "domain_events", ["entity_type", "entity_id"], unique=False)
+    op.create_index("ix_domain_events_timestamp", "domain_events", ["timestamp"], unique=False)
+    op.create_index("ix_domain_events_event_id", "domain_events", ["event_id"], unique=True)
+    _rls("domain_events")
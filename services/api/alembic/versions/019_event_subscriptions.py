@@ -0,0 +1,60 @@
+"""Event subscriptions: NOTIFY on domain_events insert; per-consumer checkpoints.
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-19
+
+- Row trigger on domain_events: pg_notify('domain_events', tenant_id). NOTIFY folds identical
+  payloads within a transaction, so subscribers get one wake-up per tenant per commit.
+- event_consumer_checkpoints: last acknowledged (timestamp, event_id) per consumer and tenant.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE FUNCTION notify_domain_event() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('domain_events', NEW.tenant_id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER domain_events_notify AFTER INSERT ON domain_events
+        FOR EACH ROW EXECUTE FUNCTION notify_domain_event()
+    """)
+
+    op.create_table(
+        "event_consumer_checkpoints",
+        sa.Column("consumer", sa.String(100), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("last_event_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("consumer", "tenant_id"),
+    )
+    op.execute("ALTER TABLE event_consumer_checkpoints ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_event_consumer_checkpoints ON event_consumer_checkpoints
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP POLICY IF EXISTS tenant_isolation_event_consumer_checkpoints ON event_consumer_checkpoints"
+    )
+    op.drop_table("event_consumer_checkpoints")
+    op.execute("DROP TRIGGER IF EXISTS domain_events_notify ON domain_events")
+    op.execute("DROP FUNCTION IF EXISTS notify_domain_event()")
@@ -0,0 +1,84 @@
+"""Hourly KPI rollups: usage_hourly, chats_created_hourly.
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-19
+
+One row per (tenant, hour, user, assist_mode, model) with request and token sums, and one per
+(tenant, hour, owner) with the number of chats created. Maintained on write by
+app/services/kpi_rollups.py; /admin/kpis/* read whole hours from here. NULL assist_mode and
+model_version are stored as '' so they can be part of the primary key. Backfilled from the
+existing rows.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "020"
+down_revision: Union[str, None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"""
+        CREATE POLICY tenant_isolation_{table} ON {table}
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usage_hourly",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("hour", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("assist_mode", sa.Text(), nullable=False),
+        sa.Column("model_name", sa.Text(), nullable=False),
+        sa.Column("model_version", sa.Text(), nullable=False),
+        sa.Column("request_count", sa.BigInteger(), nullable=False),
+        sa.Column("input_tokens", sa.BigInteger(), nullable=False),
+        sa.Column("output_tokens", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "hour", "user_id", "assist_mode", "model_name", "model_version"),
+    )
+    op.create_index("ix_usage_hourly_tenant_user_hour", "usage_hourly", ["tenant_id", "user_id", "hour"], unique=False)
+    _rls("usage_hourly")
+
+    op.create_table(
+        "chats_created_hourly",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("hour", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("owner_user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("chats_created", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "hour", "owner_user_id"),
+    )
+    op.create_index(
+        "ix_chats_created_hourly_tenant_owner_hour", "chats_created_hourly", ["tenant_id", "owner_user_id", "hour"], unique=False
+    )
+    _rls("chats_created_hourly")
+
+    op.execute("""
+        INSERT INTO usage_hourly
+        (tenant_id, hour, user_id, assist_mode, model_name, model_version, request_count, input_tokens, output_tokens)
+        SELECT tenant_id, date_trunc('hour', ts), user_id, COALESCE(assist_mode, ''), model_name,
+               COALESCE(model_version, ''), COUNT(*), SUM(input_tokens), SUM(output_tokens)
+        FROM usage_records
+        GROUP BY 1, 2, 3, 4, 5, 6
+    """)
+    op.execute("""
+        INSERT INTO chats_created_hourly (tenant_id, hour, owner_user_id, chats_created)
+        SELECT tenant_id, date_trunc('hour', created_at), owner_user_id, COUNT(*)
+        FROM chats
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    for table in ("chats_created_hourly", "usage_hourly"):
+        op.execute(f"DROP POLICY IF EXISTS tenant_isolation_{table} ON {table}")
+        op.drop_table(table)
@@ -0,0 +1,41 @@
+"""KPI cache invalidation: kpi_cache_generations.
+
+Revision ID: 021
+Revises: 020
+Create Date: 2026-10-19
+
+One counter per tenant, bumped by writes that land in an already closed day (late commits,
+deleted chats). API processes compare it on each /admin/kpis/* request and drop the tenant's
+cached day slices when it changed (app/services/kpi_cache.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "021"
+down_revision: Union[str, None] = "020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "kpi_cache_generations",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id"),
+    )
+    op.execute("ALTER TABLE kpi_cache_generations ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_kpi_cache_generations ON kpi_cache_generations
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_kpi_cache_generations ON kpi_cache_generations")
+    op.drop_table("kpi_cache_generations")
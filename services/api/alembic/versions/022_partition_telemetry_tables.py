@@ -0,0 +1,126 @@
+"""Monthly range partitions for usage_records, audit_logs, llm_audit_logs (online conversion).
+
+Revision ID: 022
+Revises: 021
+Create Date: 2026-10-19
+
+Existing rows are not copied. Each table becomes the first partition of its new partitioned
+parent (<table>_legacy, FOR VALUES FROM (MINVALUE) TO (cutover)); monthly partitions
+<table>_yYYYYmMM start at cutover (first of the month after next), plus <table>_default.
+
+Online: the expensive steps run outside the migration transaction and do not block writes
+(CREATE UNIQUE INDEX CONCURRENTLY on (id, <ts>) for the new primary key; a NOT VALID check
+constraint <ts> < cutover, then VALIDATE). With the validated constraint ATTACH PARTITION skips
+its scan, and the existing indexes and foreign keys match the parent's, so they are attached
+instead of rebuilt: the swap (rename, create parent, attach) only holds locks briefly.
+
+Later months are created and expired ones detached by scripts/manage_partitions.py; the legacy
+partition is detached as a whole once its newest month is past retention.
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "022"
+down_revision: Union[str, None] = "021"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+# table, partition column, RLS policy, foreign keys, indexes (name, columns)
+TABLES = (
+    (
+        "usage_records",
+        "ts",
+        "tenant_isolation_usage_records",
+        [("tenant_id", "tenants")],
+        [("idx_usage_records_tenant_ts", "tenant_id, ts"), ("idx_usage_records_tenant_user_ts", "tenant_id, user_id, ts")],
+    ),
+    (
+        "audit_logs",
+        "ts",
+        "tenant_isolation_audit",
+        [("tenant_id", "tenants")],
+        [("idx_audit_tenant_ts", "tenant_id, ts"), ("idx_audit_logs_tenant_actor_ts", "tenant_id, actor_id, ts")],
+    ),
+    (
+        "llm_audit_logs",
+        "timestamp",
+        "tenant_isolation_llm_audit",
+        [("tenant_id", "tenants"), ("user_id", "users")],
+        [("ix_llm_audit_logs_tenant_id", "tenant_id"), ("idx_llm_audit_tenant_ts", "tenant_id, timestamp")],
+    ),
+)
+
+
+def _add_months(month: date, n: int) -> date:
+    y, m = divmod(month.month - 1 + n, 12)
+    return date(month.year + y, m + 1, 1)
+
+
+def _rls(table: str, policy: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    op.execute(f"""
+        CREATE POLICY {policy} ON {table}
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+
+def upgrade() -> None:
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    cutover = _add_months(this_month, 2)
+
+    # Online preparation: no long locks, commits per statement
+    with op.get_context().autocommit_block():
+        for table, column, *_ in TABLES:
+            op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {table}_legacy_id_key ON {table} (id, {column})")
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_bound CHECK ({column} < '{cutover.isoformat()}') NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_bound")
+
+    for table, column, policy, foreign_keys, indexes in TABLES:
+        legacy = f"{table}_legacy"
+        # The parent's primary key only adopts an index that backs a constraint
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_id_key UNIQUE USING INDEX {table}_legacy_id_key")
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey")
+        for name, _ in indexes:
+            op.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})")
+        for fk_column, ref in foreign_keys:
+            op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY ({fk_column}) REFERENCES {ref}(id) ON DELETE CASCADE")
+        for name, columns in indexes:
+            op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+
+        op.execute(f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')")
+        month = cutover
+        while month <= _add_months(this_month, MONTHS_AHEAD):
+            nxt = _add_months(month, 1)
+            op.execute(f"""
+                CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table}
+                FOR VALUES FROM ('{month.isoformat()}') TO ('{nxt.isoformat()}')
+            """)
+            month = nxt
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        _rls(table, policy)
+
+
+def downgrade() -> None:
+    # Detached (archived) partitions are not copied back
+    for table, _, policy, foreign_keys, indexes in TABLES:
+        op.execute(f"DROP POLICY IF EXISTS {policy} ON {table}")
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        op.execute(f"CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_partitioned")
+        op.execute(f"DROP TABLE {table}_partitioned")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        for fk_column, ref in foreign_keys:
+            op.execute(f"ALTER TABLE {table} ADD FOREIGN KEY ({fk_column}) REFERENCES {ref}(id) ON DELETE CASCADE")
+        for name, columns in indexes:
+            op.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        _rls(table, policy)
@@ -0,0 +1,44 @@
+"""Composite index (tenant_id, ts DESC, id DESC) on audit_logs for keyset pages and streaming export.
+
+Revision ID: 023
+Revises: 022
+Create Date: 2026-10-19
+
+Serves ORDER BY ts DESC, id DESC (GET /admin/audit-logs and /admin/audit-logs/export) straight
+from the index. audit_logs is partitioned (022), where CREATE INDEX CONCURRENTLY is not available
+on the parent: the parent index is created ON ONLY (invalid, no build), each partition's index
+is built concurrently and attached; the parent index becomes valid once all are attached.
+Partitions created later get the index automatically.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+revision: str = "023"
+down_revision: Union[str, None] = "022"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_audit_logs_tenant_ts_id"
+COLUMNS = "tenant_id, ts DESC, id DESC"
+
+
+def upgrade() -> None:
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY audit_logs ({COLUMNS})")
+    partitions = op.get_bind().execute(
+        text("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'audit_logs'::regclass
+            ORDER BY c.relname
+        """)
+    ).scalars().all()
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_tenant_ts_id_idx ON {partition} ({COLUMNS})")
+            op.execute(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_tenant_ts_id_idx")
+
+
+def downgrade() -> None:
+    op.execute(f"DROP INDEX IF EXISTS {INDEX}")
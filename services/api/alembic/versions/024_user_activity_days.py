@@ -0,0 +1,53 @@
+"""Per-user daily activity calendar: user_activity_days.
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-19
+
+One row per (tenant, user, UTC day) with usage: request count and total tokens. Maintained on
+write by record_usage (app/services/activity_calendar.py); /admin/kpis/activity and the activity
+heatmap read it instead of usage in range. Backfilled from usage_hourly.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "024"
+down_revision: Union[str, None] = "023"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_activity_days",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("request_count", sa.BigInteger(), nullable=False),
+        sa.Column("total_tokens", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "user_id", "day"),
+    )
+    op.create_index("ix_user_activity_days_tenant_day", "user_activity_days", ["tenant_id", "day"], unique=False)
+    op.execute("ALTER TABLE user_activity_days ENABLE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_user_activity_days ON user_activity_days
+        USING (tenant_id::text = current_setting('app.tenant_id', true))
+    """)
+
+    op.execute("""
+        INSERT INTO user_activity_days (tenant_id, user_id, day, request_count, total_tokens)
+        SELECT tenant_id, user_id, date_trunc('day', hour)::date,
+               SUM(request_count), SUM(input_tokens + output_tokens)
+        FROM usage_hourly
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_user_activity_days ON user_activity_days")
+    op.drop_index("ix_user_activity_days_tenant_day", table_name="user_activity_days")
+    op.drop_table("user_activity_days")
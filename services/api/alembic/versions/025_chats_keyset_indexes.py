@@ -0,0 +1,40 @@
+"""Owner-prefixed covering indexes for the keyset-paginated chat list.
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-19
+
+GET /chats pages by (updated_at, id) DESC per owner. ix_chats_owner_updated serves the full list,
+ix_chats_owner_folder_updated the folder / unfiled filters; both include the listed columns so a
+page is an index-only range scan. They replace ix_chats_updated_at, which was neither tenant- nor
+owner-prefixed. Built CONCURRENTLY (no write lock on chats).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "025"
+down_revision: Union[str, None] = "024"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_owner_updated
+            ON chats (tenant_id, owner_user_id, updated_at DESC, id DESC)
+            INCLUDE (title, is_favorite, folder_id, status)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_owner_folder_updated
+            ON chats (tenant_id, owner_user_id, folder_id, updated_at DESC, id DESC)
+            INCLUDE (title, is_favorite, status)
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_updated_at")
+
+
+def downgrade() -> None:
+    op.create_index("ix_chats_updated_at", "chats", ["updated_at"], unique=False)
+    op.drop_index("ix_chats_owner_folder_updated", table_name="chats")
+    op.drop_index("ix_chats_owner_updated", table_name="chats")
@@ -0,0 +1,49 @@
+"""Per-chat message sequence: chat_messages.seq, chats.last_message_seq.
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-19
+
+seq numbers a chat's messages 1, 2, 3, ... in insert order; unlike created_at it never ties, so it
+is the cursor for paging messages (GET /chats/{id}, GET /chats/{id}/messages). insert_message
+allocates it from chats.last_message_seq under the chat's row lock it already takes;
+uq_chat_messages_chat_seq backs that up and serves the pages (it replaces ix_chat_messages_chat_id).
+Existing messages are numbered by (created_at, id).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "026"
+down_revision: Union[str, None] = "025"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("chats", sa.Column("last_message_seq", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column("chat_messages", sa.Column("seq", sa.BigInteger(), nullable=True))
+    op.execute("""
+        UPDATE chat_messages m SET seq = n.seq
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY chat_id ORDER BY created_at, id) AS seq
+            FROM chat_messages
+        ) n
+        WHERE m.id = n.id
+    """)
+    op.execute("""
+        UPDATE chats c SET last_message_seq = m.last_seq
+        FROM (SELECT chat_id, MAX(seq) AS last_seq FROM chat_messages GROUP BY chat_id) m
+        WHERE c.id = m.chat_id
+    """)
+    op.alter_column("chat_messages", "seq", nullable=False)
+    op.create_index("uq_chat_messages_chat_seq", "chat_messages", ["chat_id", "seq"], unique=True)
+    op.drop_index("ix_chat_messages_chat_id", table_name="chat_messages")
+
+
+def downgrade() -> None:
+    op.create_index("ix_chat_messages_chat_id", "chat_messages", ["chat_id"], unique=False)
+    op.drop_index("uq_chat_messages_chat_seq", table_name="chat_messages")
+    op.drop_column("chat_messages", "seq")
+    op.drop_column("chats", "last_message_seq")
@@ -0,0 +1,99 @@
+"""Denormalized per-chat counters on chats, maintained by insert_message.
+
+Revision ID: 027
+Revises: 026
+Create Date: 2026-10-19
+
+message_count, first_message_at, last_message_at and last_message_preview cover non-system
+messages; input_tokens / output_tokens sum the usage recorded with the chat's assistant messages.
+GET /chats/{id} read the token total by joining audit_logs (no entity_id index) to chat_messages
+on every open, and the timestamps from chat_messages. Backfilled from chat_messages and the
+chat_message_sent audit rows. The chat list's covering indexes (025) are rebuilt CONCURRENTLY
+under the same names to include the list columns, so pages stay index-only scans.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "027"
+down_revision: Union[str, None] = "026"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREVIEW_CHARS = 120  # app.services.chat_history.PREVIEW_CHARS
+
+LIST_INDEXES = {
+    "ix_chats_owner_updated": (
+        "tenant_id, owner_user_id, updated_at DESC, id DESC",
+        "title, is_favorite, folder_id, status",
+    ),
+    "ix_chats_owner_folder_updated": (
+        "tenant_id, owner_user_id, folder_id, updated_at DESC, id DESC",
+        "title, is_favorite, status",
+    ),
+}
+COUNTER_COLUMNS = "message_count, last_message_at, last_message_preview"
+
+
+def _rebuild_list_indexes(with_counters: bool) -> None:
+    """Build each index under a temporary name, drop the old one, rename (no window without it)."""
+    with op.get_context().autocommit_block():
+        for name, (columns, include) in LIST_INDEXES.items():
+            if with_counters:
+                include = f"{include}, {COUNTER_COLUMNS}"
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}_new")
+            op.execute(f"CREATE INDEX CONCURRENTLY {name}_new ON chats ({columns}) INCLUDE ({include})")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+
+def upgrade() -> None:
+    op.add_column("chats", sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("chats", sa.Column("input_tokens", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column("chats", sa.Column("output_tokens", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column("chats", sa.Column("first_message_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("chats", sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("chats", sa.Column("last_message_preview", sa.Text(), nullable=True))
+    op.execute(f"""
+        UPDATE chats c SET
+            message_count = m.message_count,
+            first_message_at = m.first_message_at,
+            last_message_at = m.last_message_at,
+            last_message_preview = m.last_message_preview
+        FROM (
+            SELECT chat_id, COUNT(*) AS message_count, MIN(created_at) AS first_message_at,
+                   MAX(created_at) AS last_message_at,
+                   (array_agg(left(content, {PREVIEW_CHARS}) ORDER BY seq DESC))[1] AS last_message_preview
+            FROM chat_messages
+            WHERE role != 'system'
+            GROUP BY chat_id
+        ) m
+        WHERE c.id = m.chat_id
+    """)
+    op.execute("""
+        UPDATE chats c SET input_tokens = t.input_tokens, output_tokens = t.output_tokens
+        FROM (
+            SELECT cm.chat_id, SUM(COALESCE(a.input_tokens, 0)) AS input_tokens,
+                   SUM(COALESCE(a.output_tokens, 0)) AS output_tokens
+            FROM audit_logs a
+            JOIN chat_messages cm ON cm.id = a.entity_id
+            WHERE a.entity_type = 'chat_message' AND a.action = 'chat_message_sent'
+            GROUP BY cm.chat_id
+        ) t
+        WHERE c.id = t.chat_id
+    """)
+    _rebuild_list_indexes(with_counters=True)
+
+
+def downgrade() -> None:
+    _rebuild_list_indexes(with_counters=False)
+    for column in (
+        "last_message_preview",
+        "last_message_at",
+        "first_message_at",
+        "output_tokens",
+        "input_tokens",
+        "message_count",
+    ):
+        op.drop_column("chats", column)
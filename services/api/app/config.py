@@ -22,6 +22,21 @@ class Settings(BaseSettings):
     # AI Response confidence threshold (below = route to review)
     ai_confidence_threshold: float = 0.85
 
+    # POST /ai-responses/batch: max documents per request; render processes (<= 1: thread pool)
+    max_batch_documents: int = 500
+    render_workers: int = 0
+
+    # Monthly partitions older than this are detached by scripts/manage_partitions.py (0 = keep all)
+    domain_event_retention_months: int = 0
+    usage_record_retention_months: int = 0
+    audit_log_retention_months: int = 0  # audit_logs and llm_audit_logs
+
+    # /admin/kpis/*: closed day slices kept in memory per process (app/services/kpi_cache.py)
+    kpi_cache_max_entries: int = 50000
+    # /admin/kpis/query: usage_records columns in memory per process (app/services/usage_analytics.py)
+    usage_analytics_max_tenants: int = 20
+    usage_analytics_max_rows_per_tenant: int = 2000000  # 40 bytes per row
+
     # B2C (production)
     b2c_tenant: str | None = None
     b2c_client_id: str | None = None
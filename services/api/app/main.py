@@ -8,8 +8,10 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 
 from app.config import settings
-from app.routers import health, prompts, chats, ai_responses, folders, admin, cases, interventions
+from app.routers import health, prompts, chats, ai_responses, folders, admin, cases, interventions, events
 from app.middleware.auth import auth_middleware, get_request_id
+from app.services.ai_rendering_service import shutdown_render_pool
+from app.services.event_subscriptions import notifier
 
 structlog.configure(
     processors=[
@@ -66,6 +68,12 @@ async def startup():
     log.info("startup", auth_bypass=settings.auth_bypass_local)
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_render_pool()
+    await notifier.close()
+
+
 app.include_router(health.router, tags=["health"])
 app.include_router(prompts.router, prefix="/prompts", tags=["prompts"])
 app.include_router(chats.router, prefix="/chats", tags=["chats"])
@@ -74,3 +82,4 @@ app.include_router(ai_responses.router, prefix="/ai-responses", tags=["ai-respon
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
 app.include_router(cases.router, prefix="/cases", tags=["cases"])
 app.include_router(interventions.router, prefix="/interventions", tags=["interventions"])
+app.include_router(events.router, prefix="/events", tags=["events"])
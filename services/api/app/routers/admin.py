@@ -1,15 +1,29 @@
 """Admin KPIs and audit logs. Role-scoped: admin sees tenant, user sees own."""
-from datetime import datetime, timedelta
+import asyncio
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from sqlalchemy import text
 
-from app.db import get_session
+from app.db import get_session, session_scope
 from app.dependencies import require_auth, get_tenant_id, get_user_uuid
+from app.services.activity_calendar import ActivityDay, load_calendar, streak_stats
+from app.services.kpi_cache import (
+    DaySlice,
+    bucket_slices,
+    cache as kpi_cache,
+    day_slices,
+    merge_slices,
+)
+from app.services.usage_analytics import DIMENSIONS, TEXT_COLUMNS, analytics
 
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
@@ -69,6 +83,28 @@ class ActivitySummary(BaseModel):
     avg_tokens_per_request: float
 
 
+class ActivityHeatmapDay(BaseModel):
+    day: str
+    active_users: int
+    request_count: int
+    total_tokens: int
+
+
+class KPIQueryResponse(BaseModel):
+    group_by: list[str]
+    rows: list[dict]
+    complete: bool
+
+
+class KPIDashboard(BaseModel):
+    summary: KPISummary
+    tokens: list[TokenBucket]
+    chats_created: list[ChatsBucket]
+    assist_modes: list[AssistModeRow]
+    models: list[ModelRow]
+    activity: ActivitySummary
+
+
 class AuditLogRow(BaseModel):
     model_config = {"protected_namespaces": ()}
     id: str
@@ -111,73 +147,126 @@ def _parse_granularity(gran: str) -> str:
     return "day"
 
 
-# --- KPI Endpoints ---
+# --- KPIs: folded from day slices (closed days cached, app/services/kpi_cache.py) ---
 
 
-@router.get("/kpis/summary", response_model=KPISummary)
-@limiter.limit("60/minute")
-async def get_kpis_summary(
-    request: Request,
-    range_val: str = Query("month", alias="range"),
-    scope: str = Query("me", description="tenant (admin) or me"),
-    _auth=Depends(require_auth),
-):
+def _kpi_request(request: Request, scope: str) -> tuple[UUID, UUID]:
     tenant_id = get_tenant_id(request)
     user_uuid = get_user_uuid(request)
     if not tenant_id or not user_uuid:
         raise HTTPException(status_code=401, detail="Auth required")
-
     if scope == "tenant" and not _is_admin(request):
         raise HTTPException(status_code=403, detail="Admin role required for tenant scope")
+    return tenant_id, user_uuid
+
+
+def _kpi_params(request: Request, scope: str, range_val: str) -> tuple[UUID, str | None, datetime, datetime]:
+    tenant_id, user_uuid = _kpi_request(request, scope)
+    from_ts, to_ts = _parse_range(range_val)
+    user_id = None if scope == "tenant" else str(user_uuid)
+    return tenant_id, user_id, from_ts, to_ts
+
+
+async def _kpi_slices(
+    tenant_id: UUID, user_id: str | None, from_ts: datetime, to_ts: datetime
+) -> dict[date, DaySlice]:
+    async for session in _session_gen(tenant_id):
+        slices = await day_slices(session, tenant_id, user_id, from_ts, to_ts)
+    return slices
 
-    from_ts, to_ts = _parse_range(range_val if range_val in ("last30d", "last12w", "last12m") else "last30d")
 
+async def _kpi_calendar(
+    tenant_id: UUID, user_id: str | None, from_ts: datetime, to_ts: datetime
+) -> list[ActivityDay]:
     async for session in _session_gen(tenant_id):
-        user_filter = "" if scope == "tenant" else "AND user_id = :user_id"
-        params = {
-            "tenant_id": str(tenant_id),
-            "from_ts": from_ts,
-            "to_ts": to_ts,
-        }
-        if scope == "me":
-            params["user_id"] = str(user_uuid)
-
-        sql_usage = f"""
-            SELECT COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0), COUNT(*)
-            FROM usage_records
-            WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts {user_filter}
-        """
-        res = await session.execute(text(sql_usage), params)
-        row = res.fetchone()
-        input_tok = row[0] or 0
-        output_tok = row[1] or 0
-        request_count = row[2] or 0
-
-        user_filter_chats = "" if scope == "tenant" else "AND owner_user_id = :owner_user_id"
-        params_chats = {
-            "tenant_id": str(tenant_id),
-            "from_ts": from_ts,
-            "to_ts": to_ts,
-        }
-        if scope == "me":
-            params_chats["owner_user_id"] = str(user_uuid)
-
-        sql_chats = f"""
-            SELECT COUNT(*) FROM chats
-            WHERE tenant_id = :tenant_id AND created_at >= :from_ts AND created_at <= :to_ts {user_filter_chats}
-        """
-        res_chats = await session.execute(text(sql_chats), params_chats)
-        chats_count = res_chats.fetchone()[0] or 0
+        calendar = await load_calendar(session, tenant_id, user_id, from_ts.date(), to_ts.date())
+    return calendar
 
+
+def _bucket_start(bucket: date) -> str:
+    return datetime.combine(bucket, time(), tzinfo=timezone.utc).isoformat()
+
+
+def _summary(slices: dict[date, DaySlice]) -> KPISummary:
+    total = merge_slices(slices.values())
     return KPISummary(
-        input_tokens=input_tok,
-        output_tokens=output_tok,
-        total_tokens=input_tok + output_tok,
-        request_count=request_count,
-        chats_created_count=chats_count,
+        input_tokens=total.input_tokens,
+        output_tokens=total.output_tokens,
+        total_tokens=total.input_tokens + total.output_tokens,
+        request_count=total.request_count,
+        chats_created_count=total.chats_created,
     )
 
 
+def _tokens(slices: dict[date, DaySlice], granularity: str) -> list[TokenBucket]:
+    return [
+        TokenBucket(
+            bucket_start=_bucket_start(bucket),
+            input_tokens=s.input_tokens,
+            output_tokens=s.output_tokens,
+            total_tokens=s.input_tokens + s.output_tokens,
+        )
+        for bucket, s in bucket_slices(slices, granularity)
+        if s.request_count
+    ]
+
+
+def _chats_created(slices: dict[date, DaySlice], granularity: str) -> list[ChatsBucket]:
+    return [
+        ChatsBucket(bucket_start=_bucket_start(bucket), chats_created=s.chats_created)
+        for bucket, s in bucket_slices(slices, granularity)
+        if s.chats_created > 0
+    ]
+
+
+def _assist_modes(slices: dict[date, DaySlice]) -> list[AssistModeRow]:
+    total = merge_slices(slices.values())
+    return [
+        AssistModeRow(assist_mode=mode, request_count=requests, total_tokens=tokens)
+        for mode, (requests, tokens) in sorted(total.assist_modes.items(), key=lambda kv: -kv[1][0])
+    ]
+
+
+def _models(slices: dict[date, DaySlice]) -> list[ModelRow]:
+    total = merge_slices(slices.values())
+    return [
+        ModelRow(
+            model_name=model_name or "unknown",
+            model_version=model_version,
+            request_count=requests,
+            total_tokens=tokens,
+        )
+        for (model_name, model_version), (requests, tokens) in sorted(total.models.items(), key=lambda kv: -kv[1][0])
+    ]
+
+
+def _activity(calendar: list[ActivityDay]) -> ActivitySummary:
+    """Whole UTC days of the range, from the activity calendar."""
+    active_days, streak = streak_stats([d.day for d in calendar])
+    requests = sum(d.request_count for d in calendar)
+    avg_tokens = sum(d.total_tokens for d in calendar) / requests if requests else 0
+    return ActivitySummary(
+        active_days_count=active_days,
+        current_streak_days=streak,
+        avg_tokens_per_request=round(float(avg_tokens), 1),
+    )
+
+
+# --- KPI Endpoints ---
+
+
+@router.get("/kpis/summary", response_model=KPISummary)
+@limiter.limit("60/minute")
+async def get_kpis_summary(
+    request: Request,
+    range_val: str = Query("month", alias="range"),
+    scope: str = Query("me", description="tenant (admin) or me"),
+    _auth=Depends(require_auth),
+):
+    range_val = range_val if range_val in ("last30d", "last12w", "last12m") else "last30d"
+    return _summary(await _kpi_slices(*_kpi_params(request, scope, range_val)))
+
+
 @router.get("/kpis/tokens", response_model=list[TokenBucket])
 @limiter.limit("60/minute")
 async def get_kpis_tokens(
@@ -187,43 +276,7 @@ async def get_kpis_tokens(
     scope: str = Query("me"),
     _auth=Depends(require_auth),
 ):
-    tenant_id = get_tenant_id(request)
-    user_uuid = get_user_uuid(request)
-    if not tenant_id or not user_uuid:
-        raise HTTPException(status_code=401, detail="Auth required")
-    if scope == "tenant" and not _is_admin(request):
-        raise HTTPException(status_code=403, detail="Admin role required for tenant scope")
-
-    from_ts, to_ts = _parse_range(range_val)
-    gran = _parse_granularity(granularity)
-    date_trunc = {"day": "day", "week": "week", "month": "month", "year": "year"}.get(gran, "day")
-    user_filter = "" if scope == "tenant" else "AND user_id = :user_id"
-    params = {"tenant_id": str(tenant_id), "from_ts": from_ts, "to_ts": to_ts}
-    if scope == "me":
-        params["user_id"] = str(user_uuid)
-
-    async for session in _session_gen(tenant_id):
-        sql = f"""
-            SELECT date_trunc(:date_trunc, ts) AS bucket_start,
-                   COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0)
-            FROM usage_records
-            WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts {user_filter}
-            GROUP BY date_trunc(:date_trunc, ts)
-            ORDER BY bucket_start
-        """
-        params["date_trunc"] = date_trunc
-        res = await session.execute(text(sql), params)
-        rows = res.fetchall()
-
-    return [
-        TokenBucket(
-            bucket_start=r[0].isoformat() if r[0] else "",
-            input_tokens=r[1] or 0,
-            output_tokens=r[2] or 0,
-            total_tokens=(r[1] or 0) + (r[2] or 0),
-        )
-        for r in rows
-    ]
+    return _tokens(await _kpi_slices(*_kpi_params(request, scope, range_val)), _parse_granularity(granularity))
 
 
 @router.get("/kpis/chats-created", response_model=list[ChatsBucket])
@@ -235,36 +288,7 @@ async def get_kpis_chats_created(
     scope: str = Query("me"),
     _auth=Depends(require_auth),
 ):
-    tenant_id = get_tenant_id(request)
-    user_uuid = get_user_uuid(request)
-    if not tenant_id or not user_uuid:
-        raise HTTPException(status_code=401, detail="Auth required")
-    if scope == "tenant" and not _is_admin(request):
-        raise HTTPException(status_code=403, detail="Admin role required for tenant scope")
-
-    from_ts, to_ts = _parse_range(range_val)
-    gran = _parse_granularity(granularity)
-    date_trunc = {"day": "day", "week": "week", "month": "month", "year": "year"}.get(gran, "day")
-    user_filter = "" if scope == "tenant" else "AND owner_user_id = :owner_user_id"
-    params = {"tenant_id": str(tenant_id), "from_ts": from_ts, "to_ts": to_ts, "date_trunc": date_trunc}
-    if scope == "me":
-        params["owner_user_id"] = str(user_uuid)
-
-    async for session in _session_gen(tenant_id):
-        sql = f"""
-            SELECT date_trunc(:date_trunc, created_at) AS bucket_start, COUNT(*)
-            FROM chats
-            WHERE tenant_id = :tenant_id AND created_at >= :from_ts AND created_at <= :to_ts {user_filter}
-            GROUP BY date_trunc(:date_trunc, created_at)
-            ORDER BY bucket_start
-        """
-        res = await session.execute(text(sql), params)
-        rows = res.fetchall()
-
-    return [
-        ChatsBucket(bucket_start=r[0].isoformat() if r[0] else "", chats_created=r[1] or 0)
-        for r in rows
-    ]
+    return _chats_created(await _kpi_slices(*_kpi_params(request, scope, range_val)), _parse_granularity(granularity))
 
 
 @router.get("/kpis/assist-modes", response_model=list[AssistModeRow])
@@ -275,34 +299,7 @@ async def get_kpis_assist_modes(
     scope: str = Query("me"),
     _auth=Depends(require_auth),
 ):
-    tenant_id = get_tenant_id(request)
-    user_uuid = get_user_uuid(request)
-    if not tenant_id or not user_uuid:
-        raise HTTPException(status_code=401, detail="Auth required")
-    if scope == "tenant" and not _is_admin(request):
-        raise HTTPException(status_code=403, detail="Admin role required for tenant scope")
-
-    from_ts, to_ts = _parse_range(range_val)
-    user_filter = "" if scope == "tenant" else "AND user_id = :user_id"
-    params = {"tenant_id": str(tenant_id), "from_ts": from_ts, "to_ts": to_ts}
-    if scope == "me":
-        params["user_id"] = str(user_uuid)
-
-    async for session in _session_gen(tenant_id):
-        sql = f"""
-            SELECT assist_mode, COUNT(*), COALESCE(SUM(input_tokens + output_tokens), 0)
-            FROM usage_records
-            WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts {user_filter}
-            GROUP BY assist_mode
-            ORDER BY COUNT(*) DESC
-        """
-        res = await session.execute(text(sql), params)
-        rows = res.fetchall()
-
-    return [
-        AssistModeRow(assist_mode=r[0], request_count=r[1] or 0, total_tokens=r[2] or 0)
-        for r in rows
-    ]
+    return _assist_modes(await _kpi_slices(*_kpi_params(request, scope, range_val)))
 
 
 @router.get("/kpis/models", response_model=list[ModelRow])
@@ -313,118 +310,144 @@ async def get_kpis_models(
     scope: str = Query("me"),
     _auth=Depends(require_auth),
 ):
-    tenant_id = get_tenant_id(request)
-    user_uuid = get_user_uuid(request)
-    if not tenant_id or not user_uuid:
-        raise HTTPException(status_code=401, detail="Auth required")
-    if scope == "tenant" and not _is_admin(request):
-        raise HTTPException(status_code=403, detail="Admin role required for tenant scope")
+    return _models(await _kpi_slices(*_kpi_params(request, scope, range_val)))
 
-    from_ts, to_ts = _parse_range(range_val)
-    user_filter = "" if scope == "tenant" else "AND user_id = :user_id"
-    params = {"tenant_id": str(tenant_id), "from_ts": from_ts, "to_ts": to_ts}
-    if scope == "me":
-        params["user_id"] = str(user_uuid)
 
-    async for session in _session_gen(tenant_id):
-        sql = f"""
-            SELECT model_name, model_version, COUNT(*), COALESCE(SUM(input_tokens + output_tokens), 0)
-            FROM usage_records
-            WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts {user_filter}
-            GROUP BY model_name, model_version
-            ORDER BY COUNT(*) DESC
-        """
-        res = await session.execute(text(sql), params)
-        rows = res.fetchall()
+@router.get("/kpis/activity", response_model=ActivitySummary)
+@limiter.limit("60/minute")
+async def get_kpis_activity(
+    request: Request,
+    range_val: str = Query("month", alias="range"),
+    scope: str = Query("me"),
+    _auth=Depends(require_auth),
+):
+    return _activity(await _kpi_calendar(*_kpi_params(request, scope, range_val)))
+
 
+@router.get("/kpis/activity/heatmap", response_model=list[ActivityHeatmapDay])
+@limiter.limit("60/minute")
+async def get_kpis_activity_heatmap(
+    request: Request,
+    range_val: str = Query("last12m", alias="range"),
+    scope: str = Query("me"),
+    _auth=Depends(require_auth),
+):
+    """Active users, requests and tokens per active day (days without usage are omitted)."""
     return [
-        ModelRow(
-            model_name=r[0] or "unknown",
-            model_version=r[1],
-            request_count=r[2] or 0,
-            total_tokens=r[3] or 0,
+        ActivityHeatmapDay(
+            day=d.day.isoformat(),
+            active_users=d.active_users,
+            request_count=d.request_count,
+            total_tokens=d.total_tokens,
         )
-        for r in rows
+        for d in await _kpi_calendar(*_kpi_params(request, scope, range_val))
     ]
 
 
-@router.get("/kpis/activity", response_model=ActivitySummary)
+@router.get("/kpis/dashboard", response_model=KPIDashboard)
 @limiter.limit("60/minute")
-async def get_kpis_activity(
+async def get_kpis_dashboard(
     request: Request,
-    range_val: str = Query("month", alias="range"),
+    granularity: str = Query("day"),
+    range_val: str = Query("last30d", alias="range"),
     scope: str = Query("me"),
     _auth=Depends(require_auth),
 ):
-    tenant_id = get_tenant_id(request)
-    user_uuid = get_user_uuid(request)
-    if not tenant_id or not user_uuid:
-        raise HTTPException(status_code=401, detail="Auth required")
-    if scope == "tenant" and not _is_admin(request):
-        raise HTTPException(status_code=403, detail="Admin role required for tenant scope")
+    """
+    All KPI panels in one response for one range and scope, folded from one set of day slices
+    (activity: calendar). Slices and calendar load concurrently, each in its own session.
+    """
+    # Auth, scope and range are resolved once and shared by both loads
+    tenant_id, user_id, from_ts, to_ts = _kpi_params(request, scope, range_val)
+    slices, calendar = await asyncio.gather(
+        _kpi_slices(tenant_id, user_id, from_ts, to_ts),
+        _kpi_calendar(tenant_id, user_id, from_ts, to_ts),
+    )
+    gran = _parse_granularity(granularity)
+    return KPIDashboard(
+        summary=_summary(slices),
+        tokens=_tokens(slices, gran),
+        chats_created=_chats_created(slices, gran),
+        assist_modes=_assist_modes(slices),
+        models=_models(slices),
+        activity=_activity(calendar),
+    )
+
 
+@router.get("/kpis/query", response_model=KPIQueryResponse)
+@limiter.limit("60/minute")
+async def get_kpis_query(
+    request: Request,
+    group_by: list[str] = Query([], description="Dimensions (up to 3)"),
+    assist_mode: list[str] = Query([]),
+    model_name: list[str] = Query([]),
+    model_version: list[str] = Query([]),
+    user_id_param: list[str] = Query([], alias="user_id"),
+    range_val: str = Query("last30d", alias="range"),
+    scope: str = Query("me"),
+    _auth=Depends(require_auth),
+):
+    """
+    Ad-hoc usage slice: request and token totals grouped by any dimensions (user_id, assist_mode,
+    model_name, model_version, hour_of_day, weekday, day, week, month), filtered by the text
+    dimensions. Answered in memory from the tenant's usage columns (app/services/usage_analytics.py).
+    """
+    tenant_id, user_uuid = _kpi_request(request, scope)
+    unknown = [d for d in group_by if d not in DIMENSIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by: {', '.join(unknown)}")
+    if len(group_by) > 3 or len(set(group_by)) != len(group_by):
+        raise HTTPException(status_code=400, detail="group_by takes up to 3 distinct dimensions")
+
+    filters = dict(zip(TEXT_COLUMNS, (user_id_param, assist_mode, model_name, model_version)))
+    if scope != "tenant":
+        filters["user_id"] = [str(user_uuid)]
+    filters = {column: values for column, values in filters.items() if values}
     from_ts, to_ts = _parse_range(range_val)
-    user_filter = "" if scope == "tenant" else "AND user_id = :user_id"
-    params = {"tenant_id": str(tenant_id), "from_ts": from_ts, "to_ts": to_ts}
-    if scope == "me":
-        params["user_id"] = str(user_uuid)
 
     async for session in _session_gen(tenant_id):
-        sql = f"""
-            SELECT COUNT(DISTINCT date_trunc('day', ts)::date) AS active_days,
-                   COALESCE(SUM(input_tokens + output_tokens), 0) / NULLIF(COUNT(*), 0) AS avg_tokens
-            FROM usage_records
-            WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts {user_filter}
-        """
-        res = await session.execute(text(sql), params)
-        row = res.fetchone()
-        active_days = row[0] or 0
-        avg_tokens = float(row[1] or 0)
-
-        sql_streak = f"""
-            WITH days AS (
-                SELECT DISTINCT date_trunc('day', ts)::date AS d
-                FROM usage_records
-                WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts {user_filter}
-                ORDER BY d DESC
-            ),
-            ranked AS (
-                SELECT d, d - ROW_NUMBER() OVER (ORDER BY d)::int AS grp FROM days
-            ),
-            streaks AS (
-                SELECT grp, COUNT(*) AS cnt FROM ranked GROUP BY grp
-            )
-            SELECT COALESCE((SELECT cnt FROM streaks ORDER BY grp DESC LIMIT 1), 0)
-        """
-        res_streak = await session.execute(text(sql_streak), params)
-        streak = res_streak.fetchone()[0] or 0
+        rows, complete = await analytics.query(
+            session, tenant_id, from_ts=from_ts, to_ts=to_ts, group_by=group_by, filters=filters
+        )
+    return KPIQueryResponse(group_by=group_by, rows=rows, complete=complete)
 
-    return ActivitySummary(
-        active_days_count=active_days,
-        current_streak_days=streak,
-        avg_tokens_per_request=round(avg_tokens, 1),
-    )
+
+@router.get("/kpis/cache-stats", response_model=dict)
+@limiter.limit("60/minute")
+async def get_kpis_cache_stats(
+    request: Request,
+    _auth=Depends(require_auth),
+):
+    """KPI day-slice cache and usage analytics counters of this API process (admin)."""
+    _kpi_request(request, "tenant")
+    return {**kpi_cache.stats(), "analytics": analytics.stats()}
 
 
 # --- Audit Logs ---
 
 
-@router.get("/audit-logs", response_model=AuditLogsResponse)
-@limiter.limit("100/minute")
-async def get_audit_logs(
+_AUDIT_LOG_COLUMNS = """
+    id, actor_id, tenant_id, ts, action, assist_mode,
+    COALESCE(input_tokens, 0), COALESCE(output_tokens, 0),
+    model_name, model_version, entity_type, entity_id
+"""
+
+AUDIT_EXPORT_CHUNK_ROWS = 1000
+
+
+def _audit_log_filters(
     request: Request,
-    from_ts: datetime | None = Query(None, description="From timestamp (ISO)"),
-    to_ts: datetime | None = Query(None, description="To timestamp (ISO)"),
-    assist_mode: str | None = Query(None),
-    action: str | None = Query(None),
-    model_name: str | None = Query(None),
-    user_id_param: str | None = Query(None, alias="user_id"),
-    q: str | None = Query(None, description="Search safe fields"),
-    limit: int = Query(50, ge=1, le=200),
-    cursor: str | None = Query(None),
-    scope: str = Query("me"),
-    _auth=Depends(require_auth),
-):
+    *,
+    from_ts: datetime | None,
+    to_ts: datetime | None,
+    assist_mode: str | None,
+    action: str | None,
+    model_name: str | None,
+    user_id_param: str | None,
+    q: str | None,
+    scope: str,
+) -> tuple[str, dict, str]:
+    """WHERE clause and params shared by the audit-log list and export. Returns (where, params, scope)."""
     tenant_id = get_tenant_id(request)
     user_uuid = get_user_uuid(request)
     if not tenant_id or not user_uuid:
@@ -441,10 +464,7 @@ async def get_audit_logs(
         user_id_param = None
         params_user = {"actor_id": str(user_uuid)}
 
-    params: dict = {
-        "tenant_id": str(tenant_id),
-        "limit": limit + 1,
-    }
+    params: dict = {"tenant_id": str(tenant_id)}
     params.update(params_user)
 
     filters = ["tenant_id = :tenant_id", actor_filter.lstrip("AND ") if actor_filter else "1=1"]
@@ -467,42 +487,100 @@ async def get_audit_logs(
         filters.append("actor_id = :filter_user_id")
         params["filter_user_id"] = user_id_param
 
-    q_filter = ""
     if q and q.strip():
         safe_q = q.strip().replace("%", "\\%").replace("_", "\\_")
         params["q_pattern"] = f"%{safe_q}%"
-        q_filter = """
-            AND (
+        filters.append("""(
                 action ILIKE :q_pattern
                 OR COALESCE(assist_mode, '') ILIKE :q_pattern
                 OR COALESCE(model_name, '') ILIKE :q_pattern
                 OR COALESCE(model_version, '') ILIKE :q_pattern
                 OR COALESCE(entity_type, '') ILIKE :q_pattern
                 OR COALESCE(entity_id::text, '') ILIKE :q_pattern
-            )
-        """
+            )""")
+
+    return " AND ".join(filters), params, scope
+
+
+def _audit_log_row(r) -> AuditLogRow:
+    return AuditLogRow(
+        id=str(r[0]),
+        user_id=str(r[1]),
+        tenant_id=str(r[2]),
+        timestamp=r[3].isoformat() if r[3] else "",
+        action=r[4] or "",
+        assist_mode=r[5],
+        input_tokens=r[6] or 0,
+        output_tokens=r[7] or 0,
+        total_tokens=(r[6] or 0) + (r[7] or 0),
+        model_name=r[8],
+        model_version=r[9],
+        entity_type=r[10],
+        entity_id=str(r[11]) if r[11] else None,
+    )
+
+
+def _audit_log_ndjson(rows: list[AuditLogRow]) -> str:
+    return "".join(row.model_dump_json() + "\n" for row in rows)
+
+
+def _audit_log_csv(rows: list[AuditLogRow], *, header: bool = False) -> str:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(AuditLogRow.model_fields), lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(row.model_dump() for row in rows)
+    return buf.getvalue()
+
+
+@router.get("/audit-logs", response_model=AuditLogsResponse)
+@limiter.limit("100/minute")
+async def get_audit_logs(
+    request: Request,
+    from_ts: datetime | None = Query(None, description="From timestamp (ISO)"),
+    to_ts: datetime | None = Query(None, description="To timestamp (ISO)"),
+    assist_mode: str | None = Query(None),
+    action: str | None = Query(None),
+    model_name: str | None = Query(None),
+    user_id_param: str | None = Query(None, alias="user_id"),
+    q: str | None = Query(None, description="Search safe fields"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+    scope: str = Query("me"),
+    _auth=Depends(require_auth),
+):
+    where_clause, params, scope = _audit_log_filters(
+        request,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        assist_mode=assist_mode,
+        action=action,
+        model_name=model_name,
+        user_id_param=user_id_param,
+        q=q,
+        scope=scope,
+    )
+    tenant_id = get_tenant_id(request)
+    params["limit"] = limit + 1
 
     cursor_clause = ""
     if cursor:
         parts = cursor.split("|")
         if len(parts) == 2:
             try:
-                cursor_ts = parts[0]
-                cursor_id = parts[1]
-                cursor_clause = "AND (ts, id) < (:cursor_ts::timestamptz, :cursor_id::uuid)"
+                cursor_ts = datetime.fromisoformat(parts[0])
+                cursor_id = str(UUID(parts[1]))
+                # Scalar bound first: row comparisons do not prune audit_logs partitions
+                cursor_clause = "AND ts <= :cursor_ts AND (ts, id) < (:cursor_ts, CAST(:cursor_id AS uuid))"
                 params["cursor_ts"] = cursor_ts
                 params["cursor_id"] = cursor_id
-            except Exception:
+            except ValueError:
                 pass
 
-    where_clause = " AND ".join(filters)
-
     sql = f"""
-        SELECT id, actor_id, tenant_id, ts, action, assist_mode,
-               COALESCE(input_tokens, 0), COALESCE(output_tokens, 0),
-               model_name, model_version, entity_type, entity_id
+        SELECT {_AUDIT_LOG_COLUMNS}
         FROM audit_logs
-        WHERE {where_clause} {q_filter}
+        WHERE {where_clause} {cursor_clause}
         ORDER BY ts DESC, id DESC
         LIMIT :limit
     """
@@ -511,28 +589,84 @@ async def get_audit_logs(
         res = await session.execute(text(sql), params)
         rows = res.fetchall()
 
-    items = []
     next_cursor = None
-    for i, r in enumerate(rows):
-        if i == limit:
-            next_cursor = f"{r[3].isoformat()}|{r[0]}"
-            break
-        items.append(
-            AuditLogRow(
-                id=str(r[0]),
-                user_id=str(r[1]),
-                tenant_id=str(r[2]),
-                timestamp=r[3].isoformat() if r[3] else "",
-                action=r[4] or "",
-                assist_mode=r[5],
-                input_tokens=r[6] or 0,
-                output_tokens=r[7] or 0,
-                total_tokens=(r[6] or 0) + (r[7] or 0),
-                model_name=r[8],
-                model_version=r[9],
-                entity_type=r[10],
-                entity_id=str(r[11]) if r[11] else None,
-            )
-        )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][3].isoformat()}|{rows[-1][0]}"
+    items = [_audit_log_row(r) for r in rows]
 
     return AuditLogsResponse(items=items, next_cursor=next_cursor)
+
+
+@router.get("/audit-logs/export")
+@limiter.limit("10/minute")
+async def export_audit_logs(
+    request: Request,
+    format: str = Query("ndjson", description="Export format: ndjson or csv"),
+    from_ts: datetime | None = Query(None, description="From timestamp (ISO)"),
+    to_ts: datetime | None = Query(None, description="To timestamp (ISO)"),
+    assist_mode: str | None = Query(None),
+    action: str | None = Query(None),
+    model_name: str | None = Query(None),
+    user_id_param: str | None = Query(None, alias="user_id"),
+    q: str | None = Query(None, description="Search safe fields"),
+    scope: str = Query("me"),
+    _auth=Depends(require_auth),
+):
+    """
+    Stream all matching audit logs (same filters as /audit-logs, newest first) as NDJSON or CSV.
+    Rows are read through a server-side cursor and written in chunks, so memory stays constant
+    regardless of the range. Audit: audit_logs_export_requested with metadata only.
+    """
+    fmt = format.lower()
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+    where_clause, params, scope = _audit_log_filters(
+        request,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        assist_mode=assist_mode,
+        action=action,
+        model_name=model_name,
+        user_id_param=user_id_param,
+        q=q,
+        scope=scope,
+    )
+    tenant_id = get_tenant_id(request)
+
+    async with session_scope(tenant_id=tenant_id) as session:
+        await session.execute(
+            text("""
+                INSERT INTO audit_logs (tenant_id, actor_id, action, entity_type, input_tokens, output_tokens, metadata)
+                VALUES (:tenant_id, :actor_id, 'audit_logs_export_requested', 'audit_logs', 0, 0,
+                        CAST(:metadata AS jsonb))
+            """),
+            {
+                "tenant_id": str(tenant_id),
+                "actor_id": str(get_user_uuid(request)),
+                "metadata": json.dumps({"format": fmt, "scope": scope}),
+            },
+        )
+
+    sql = text(f"""
+        SELECT {_AUDIT_LOG_COLUMNS}
+        FROM audit_logs
+        WHERE {where_clause}
+        ORDER BY ts DESC, id DESC
+    """).execution_options(yield_per=AUDIT_EXPORT_CHUNK_ROWS)
+
+    async def _stream():
+        if fmt == "csv":
+            yield _audit_log_csv([], header=True)
+        async with session_scope(tenant_id=tenant_id) as session:
+            result = await session.stream(sql, params)
+            async for chunk in result.partitions():
+                rows = [_audit_log_row(r) for r in chunk]
+                yield _audit_log_csv(rows) if fmt == "csv" else _audit_log_ndjson(rows)
+
+    export_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    return StreamingResponse(
+        _stream(),
+        media_type="text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="audit-logs-{export_date}.{fmt}"'},
+    )
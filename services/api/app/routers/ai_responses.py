@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.config import settings
 from app.db import get_session
 from app.dependencies import require_auth, get_tenant_id, get_user_uuid
 from app.services.ai_rendering_service import AIRenderingService
@@ -24,6 +25,10 @@ class ProcessMarkdownBody(BaseModel):
     confidence: float = 1.0
 
 
+class ProcessMarkdownBatchBody(BaseModel):
+    items: list[ProcessMarkdownBody]
+
+
 class ExecuteActionBody(BaseModel):
     command: str
     label: str
@@ -69,6 +74,38 @@ async def process_markdown(
     return result
 
 
+@router.post("/batch", response_model=list)
+@limiter.limit("10/minute")
+async def process_markdown_batch(
+    request: Request,
+    body: ProcessMarkdownBatchBody,
+    _auth=Depends(require_auth),
+):
+    """
+    Process many AI markdown documents in one transaction (imports). One result per item, in order;
+    items rejected by sanitization carry an error instead of failing the batch.
+    """
+    tenant_id = get_tenant_id(request)
+    user_uuid = get_user_uuid(request)
+    if not tenant_id or not user_uuid:
+        raise HTTPException(status_code=401, detail="Auth required")
+    if not body.items:
+        raise HTTPException(status_code=400, detail="items required")
+    if len(body.items) > settings.max_batch_documents:
+        raise HTTPException(status_code=400, detail=f"At most {settings.max_batch_documents} items per batch")
+    for i, item in enumerate(body.items):
+        if not item.raw_markdown.strip():
+            raise HTTPException(status_code=400, detail=f"items[{i}]: raw_markdown required")
+        if not item.entity_type or not item.entity_id:
+            raise HTTPException(status_code=400, detail=f"items[{i}]: entity_type and entity_id required")
+
+    result = None
+    async for session in _session_gen(tenant_id, user_uuid):
+        service = AIRenderingService(session, tenant_id, str(user_uuid))
+        result = await service.process_markdown_batch([item.model_dump() for item in body.items])
+    return result
+
+
 @router.get("", response_model=list)
 @limiter.limit("100/minute")
 async def list_ai_responses(
@@ -18,8 +18,11 @@ from app.config import settings
 from app.db import get_session, session_scope
 from app.dependencies import require_auth, get_tenant_id, get_user_uuid
 from app.services.event_store import append_event
-from app.services.anonymization import anonymize
-from app.services.prompt_injection import sanitize_user_message
+from app.services.anonymization import StreamingReidentifier
+from app.services.ai_rendering_service import SanitizedBlockStream
+from app.services.chat_history import fetch_llm_history, get_pseudonyms, insert_message
+from app.services.kpi_rollups import record_chat_created, record_chat_deleted, record_usage
+from app.services.prompt_injection import get_tenant_matcher, sanitize_user_message
 from app.services.prompt_registry import get_system_prompt, ASSIST_KEYS
 from app.services.azure_openai import stream_chat
 from app.services.structured_document_service import (
@@ -45,13 +48,24 @@ class ChatSummary(BaseModel):
     is_favorite: bool
     folder_id: str | None = None
     status: str = "active"
+    message_count: int = 0
+    last_message_at: str | None = None
+    last_message_preview: str | None = None
+
+
+class ChatListResponse(BaseModel):
+    items: list[ChatSummary]
+    next_cursor: str | None
 
 
 class MessageOut(BaseModel):
     id: str
+    seq: int
     role: str
     content: str
     created_at: str
+    # Sanitized structured blocks (assistant messages); None -> render content as markdown
+    blocks: list[dict] | None = None
 
 
 class ChatDetail(BaseModel):
@@ -62,7 +76,9 @@ class ChatDetail(BaseModel):
     status: str = "active"
     created_at: str
     updated_at: str
+    # Newest page of messages, oldest first; older pages: GET /chats/{id}/messages?cursor=messages_next_cursor
     messages: list[MessageOut]
+    messages_next_cursor: str | None = None
     # Session context for Smart Context Banner
     last_message_at: str | None = None
     first_message_at: str | None = None
@@ -71,6 +87,11 @@ class ChatDetail(BaseModel):
     metadata: dict | None = None
 
 
+class MessagePage(BaseModel):
+    items: list[MessageOut]
+    next_cursor: str | None
+
+
 class PatchChatBody(BaseModel):
     title: str | None = None
     is_favorite: bool | None = None
@@ -138,6 +159,7 @@ async def create_chat(
             },
         )
         row = result.fetchone()
+        await record_chat_created(session, tenant_id, user_uuid, row[2])
         created = {
             "id": str(row[0]),
             "title": row[1],
@@ -150,14 +172,33 @@ async def create_chat(
     return created
 
 
-@router.get("", response_model=list[ChatSummary])
+CHAT_PAGE_MAX = 200
+
+
+def _parse_chat_cursor(cursor: str) -> tuple[datetime, str]:
+    """Cursor "<updated_at ISO>|<id>" of the last chat on the previous page."""
+    try:
+        updated_at, chat_id = cursor.split("|")
+        return datetime.fromisoformat(updated_at), str(UUID(chat_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("", response_model=ChatListResponse)
 @limiter.limit("100/minute")
 async def list_chats(
     request: Request,
     folder_id: UUID | None = Query(None, description="Filter by folder; omit for all"),
     unfiled_only: bool = Query(False, description="If true, only chats with folder_id IS NULL"),
+    limit: int = Query(50, ge=1, le=CHAT_PAGE_MAX),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     _auth=Depends(require_auth),
 ):
+    """
+    Chats by updated_at DESC, id DESC, one page at a time (keyset on (updated_at, id)). Served from
+    ix_chats_owner_updated / ix_chats_owner_folder_updated, so a page costs the same however many
+    chats the user has.
+    """
     tenant_id = get_tenant_id(request)
     user_uuid = get_user_uuid(request)
     if not tenant_id or not user_uuid:
@@ -165,36 +206,38 @@ async def list_chats(
     if unfiled_only and folder_id is not None:
         raise HTTPException(status_code=400, detail="Use folder_id or unfiled_only, not both")
 
+    params: dict = {"tenant_id": str(tenant_id), "owner_user_id": str(user_uuid), "limit": limit + 1}
+    folder_filter = cursor_filter = ""
+    if unfiled_only:
+        folder_filter = "AND folder_id IS NULL"
+    elif folder_id is not None:
+        folder_filter = "AND folder_id = :folder_id"
+        params["folder_id"] = str(folder_id)
+    if cursor:
+        params["cursor_updated_at"], params["cursor_id"] = _parse_chat_cursor(cursor)
+        cursor_filter = "AND (updated_at, id) < (:cursor_updated_at, CAST(:cursor_id AS uuid))"
+
     async for session in _session_gen(tenant_id, user_uuid):
-        params: dict = {"tenant_id": str(tenant_id), "owner_user_id": str(user_uuid)}
-        if unfiled_only:
-            sql = """
-                SELECT id, title, updated_at, is_favorite, folder_id, COALESCE(status, 'active') AS status
-                FROM chats
-                WHERE tenant_id = :tenant_id AND owner_user_id = :owner_user_id
-                AND folder_id IS NULL
-                ORDER BY updated_at DESC
-            """
-        elif folder_id is None:
-            sql = """
-                SELECT id, title, updated_at, is_favorite, folder_id, COALESCE(status, 'active') AS status
-                FROM chats
-                WHERE tenant_id = :tenant_id AND owner_user_id = :owner_user_id
-                ORDER BY updated_at DESC
-            """
-        else:
-            sql = """
-                SELECT id, title, updated_at, is_favorite, folder_id, COALESCE(status, 'active') AS status
+        result = await session.execute(
+            text(f"""
+                SELECT id, title, updated_at, is_favorite, folder_id, COALESCE(status, 'active') AS status,
+                       message_count, last_message_at, last_message_preview
                 FROM chats
                 WHERE tenant_id = :tenant_id AND owner_user_id = :owner_user_id
-                AND folder_id = :folder_id
-                ORDER BY updated_at DESC
-            """
-            params["folder_id"] = str(folder_id)
-
-        result = await session.execute(text(sql), params)
+                {folder_filter} {cursor_filter}
+                ORDER BY updated_at DESC, id DESC
+                LIMIT :limit
+            """),
+            params,
+        )
         rows = result.fetchall()
-        return [
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][2].isoformat()}|{rows[-1][0]}"
+    return ChatListResponse(
+        items=[
             ChatSummary(
                 id=str(r[0]),
                 title=r[1],
@@ -202,9 +245,54 @@ async def list_chats(
                 is_favorite=r[3],
                 folder_id=str(r[4]) if r[4] else None,
                 status=r[5] if len(r) > 5 else "active",
+                message_count=r[6],
+                last_message_at=r[7].isoformat() if r[7] else None,
+                last_message_preview=r[8],
             )
             for r in rows
-        ]
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+MESSAGE_PAGE_MAX = 200
+
+
+async def _message_page(
+    session, chat_id: UUID, limit: int, cursor: str | None = None
+) -> tuple[list[MessageOut], str | None]:
+    """
+    The newest `limit` non-system messages before the cursor (a seq), oldest first, and the cursor
+    for the page before them (None when there is none). Served by uq_chat_messages_chat_seq.
+    """
+    params: dict = {"chat_id": str(chat_id), "limit": limit + 1}
+    seq_filter = ""
+    if cursor is not None:
+        try:
+            params["before_seq"] = int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        seq_filter = "AND seq < :before_seq"
+    result = await session.execute(
+        text(f"""
+            SELECT id, seq, role, content, created_at, blocks
+            FROM chat_messages
+            WHERE chat_id = :chat_id AND role != 'system' {seq_filter}
+            ORDER BY seq DESC
+            LIMIT :limit
+        """),
+        params,
+    )
+    rows = result.fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1][1])
+    messages = [
+        MessageOut(id=str(m[0]), seq=m[1], role=m[2], content=m[3], created_at=m[4].isoformat(), blocks=m[5])
+        for m in reversed(rows)
+    ]
+    return messages, next_cursor
 
 
 @router.get("/{chat_id}", response_model=ChatDetail)
@@ -212,6 +300,7 @@ async def list_chats(
 async def get_chat(
     request: Request,
     chat_id: UUID,
+    limit: int = Query(50, ge=1, le=MESSAGE_PAGE_MAX, description="Newest messages to include"),
     _auth=Depends(require_auth),
 ):
     tenant_id = get_tenant_id(request)
@@ -220,9 +309,11 @@ async def get_chat(
         raise HTTPException(status_code=401, detail="Auth required")
 
     async for session in _session_gen(tenant_id, user_uuid):
+        # Session context (first/last message, tokens) from the chat's counters, kept by insert_message
         chat = await session.execute(
             text("""
-                SELECT id, title, is_favorite, folder_id, COALESCE(status, 'active') AS status, created_at, updated_at, metadata
+                SELECT id, title, is_favorite, folder_id, COALESCE(status, 'active') AS status, created_at, updated_at, metadata,
+                       first_message_at, last_message_at, input_tokens + output_tokens AS total_tokens
                 FROM chats WHERE id = :chat_id AND tenant_id = :tenant_id
                 AND owner_user_id = :owner_user_id
             """),
@@ -236,47 +327,7 @@ async def get_chat(
         if not row:
             raise HTTPException(status_code=404, detail="Chat not found")
 
-        msgs = await session.execute(
-            text("""
-                SELECT id, role, content, created_at
-                FROM chat_messages WHERE chat_id = :chat_id
-                ORDER BY created_at ASC
-            """),
-            {"chat_id": str(chat_id)},
-        )
-        msg_rows = msgs.fetchall()
-        messages = [
-            MessageOut(
-                id=str(m[0]),
-                role=m[1],
-                content=m[2],
-                created_at=m[3].isoformat(),
-            )
-            for m in msg_rows
-            if m[1] != "system"
-        ]  # hide system from client
-
-        # Session context: first/last message timestamps (exclude system)
-        first_at: str | None = None
-        last_at: str | None = None
-        non_system = [m for m in msg_rows if m[1] != "system"]
-        if non_system:
-            first_at = min(m[3] for m in non_system).isoformat()
-            last_at = max(m[3] for m in non_system).isoformat()
-
-        # Session context: total tokens from audit_logs for this chat's messages
-        tok = await session.execute(
-            text("""
-                SELECT COALESCE(SUM(COALESCE(a.input_tokens, 0) + COALESCE(a.output_tokens, 0)), 0)
-                FROM audit_logs a
-                JOIN chat_messages cm ON cm.id = a.entity_id
-                WHERE a.entity_type = 'chat_message' AND a.action = 'chat_message_sent'
-                  AND cm.chat_id = :chat_id
-                  AND a.tenant_id = :tenant_id
-            """),
-            {"chat_id": str(chat_id), "tenant_id": str(tenant_id)},
-        )
-        total_tokens = int(tok.fetchone()[0] or 0)
+        messages, messages_next_cursor = await _message_page(session, chat_id, limit)
 
         meta = row[7] if len(row) > 7 and row[7] else None
         return ChatDetail(
@@ -288,13 +339,36 @@ async def get_chat(
             created_at=row[5].isoformat(),
             updated_at=row[6].isoformat(),
             messages=messages,
-            last_message_at=last_at,
-            first_message_at=first_at,
-            total_tokens_in_session=total_tokens,
+            messages_next_cursor=messages_next_cursor,
+            last_message_at=row[9].isoformat() if row[9] else None,
+            first_message_at=row[8].isoformat() if row[8] else None,
+            total_tokens_in_session=row[10],
             metadata=meta,
         )
 
 
+@router.get("/{chat_id}/messages", response_model=MessagePage)
+@limiter.limit("100/minute")
+async def list_messages(
+    request: Request,
+    chat_id: UUID,
+    cursor: str | None = Query(None, description="messages_next_cursor / next_cursor of the newer page"),
+    limit: int = Query(50, ge=1, le=MESSAGE_PAGE_MAX),
+    _auth=Depends(require_auth),
+):
+    """Older messages, one page at a time (backwards from the cursor), oldest first within the page."""
+    tenant_id = get_tenant_id(request)
+    user_uuid = get_user_uuid(request)
+    if not tenant_id or not user_uuid:
+        raise HTTPException(status_code=401, detail="Auth required")
+
+    async for session in _session_gen(tenant_id, user_uuid):
+        if await _get_chat_status(session, chat_id, tenant_id, user_uuid) is None:
+            raise HTTPException(status_code=404, detail="Chat not found")
+        items, next_cursor = await _message_page(session, chat_id, limit, cursor)
+    return MessagePage(items=items, next_cursor=next_cursor)
+
+
 @router.patch("/{chat_id}", response_model=dict)
 @limiter.limit("50/minute")
 async def patch_chat(
@@ -479,12 +553,14 @@ async def delete_chat(
             text("""
                 DELETE FROM chats
                 WHERE id = :chat_id AND tenant_id = :tenant_id AND owner_user_id = :owner_user_id
-                RETURNING id
+                RETURNING id, created_at
             """),
             {"chat_id": str(chat_id), "tenant_id": str(tenant_id), "owner_user_id": str(user_uuid)},
         )
-        if not result.fetchone():
+        deleted = result.fetchone()
+        if not deleted:
             raise HTTPException(status_code=404, detail="Chat not found")
+        await record_chat_deleted(session, tenant_id, user_uuid, deleted[1])
     return None
 
 
@@ -600,38 +676,24 @@ async def _sse_stream(
             system_prompt = system_prompt + _SAFE_MODE_MODIFIER
 
         # 2. Sanitize + check injection
-        sanitized, refusal = sanitize_user_message(user_message)
+        sanitized, refusal = sanitize_user_message(user_message, await get_tenant_matcher(session, tenant_id))
         if refusal:
             yield f"event: error\ndata: {json.dumps({'message': refusal})}\n\n"
             return
 
-        # 3. Anonymize if enabled (only for LLM; store original in DB)
-        msg_for_llm = anonymize(sanitized) if anonymization_enabled else sanitized
-
-        # 4. Save user message (original content)
-        await session.execute(
-            text("""
-                INSERT INTO chat_messages (tenant_id, chat_id, role, content)
-                VALUES (:tenant_id, :chat_id, 'user', :content)
-            """),
-            {"tenant_id": str(tenant_id), "chat_id": str(chat_id), "content": user_message},
-        )
+        # 3-4. Save user message (original content) with its pseudonymized shadow for the LLM
+        await insert_message(session, tenant_id, chat_id, "user", user_message, llm_content=sanitized)
         await session.commit()
 
-    # 5. Build history for LLM (fetch messages)
+    # 5. Build history for LLM: stored shadows (stable per-chat pseudonyms) when anonymization is on
     async for session in _session_gen(tenant_id, user_uuid):
-        hist = await session.execute(
-            text("""
-                SELECT role, content FROM chat_messages
-                WHERE chat_id = :chat_id AND role != 'system'
-                ORDER BY created_at ASC
-            """),
-            {"chat_id": str(chat_id)},
-        )
-        history = [{"role": r[0], "content": r[1]} for r in hist.fetchall()]
-        # Last one is the user msg we just inserted; ensure we use msg_for_llm for this turn
-        if history and history[-1]["role"] == "user":
-            history[-1]["content"] = msg_for_llm
+        history = await fetch_llm_history(session, chat_id, anonymized=anonymization_enabled)
+        # Placeholders in the answer are mapped back to real names as tokens stream out
+        reidentifier = StreamingReidentifier(await get_pseudonyms(session, chat_id)) if anonymization_enabled else None
+        await session.commit()
+        # Last one is the user msg we just inserted; ensure the size-capped text is used for this turn
+        if not anonymization_enabled and history and history[-1]["role"] == "user":
+            history[-1]["content"] = sanitized
 
         if not settings.azure_openai_configured:
             yield f"event: error\ndata: {json.dumps({'message': 'Azure OpenAI not configured'})}\n\n"
@@ -639,32 +701,53 @@ async def _sse_stream(
 
         try:
             buffer: list[str] = []
+            shown: list[str] = []
+            # Sanitized structured blocks of the shown text, pushed as soon as each one is complete
+            block_stream = SanitizedBlockStream()
+            block_index = 0
             async for chunk, usage in stream_chat(
                 system_prompt=system_prompt,
                 messages=history,
             ):
                 if chunk:
                     buffer.append(chunk)
-                    yield f"event: token\ndata: {json.dumps({'text': chunk})}\n\n"
+                    out = reidentifier.feed(chunk) if reidentifier else chunk
+                    if out:
+                        shown.append(out)
+                        yield f"event: token\ndata: {json.dumps({'text': out})}\n\n"
+                        for block in block_stream.feed(out):
+                            yield f"event: block\ndata: {json.dumps({'index': block_index, 'block': block})}\n\n"
+                            block_index += 1
                 if usage is not None:
                     break
+            tail = reidentifier.flush() if reidentifier else ""
+            if tail:
+                shown.append(tail)
+                yield f"event: token\ndata: {json.dumps({'text': tail})}\n\n"
+            for block in block_stream.feed(tail) + block_stream.close():
+                yield f"event: block\ndata: {json.dumps({'index': block_index, 'block': block})}\n\n"
+                block_index += 1
 
             full_content = "".join(buffer)
 
-            # 6. Save assistant message
+            # 6. Save assistant message as shown to the user; the model's pseudonymized text is its shadow.
+            # The blocks stored are the sanitized blocks streamed above, so clients do not re-parse the markdown.
+            shown_content = "".join(shown)
+            blocks = block_stream.blocks or None
             async for session in _session_gen(tenant_id, user_uuid):
-                result = await session.execute(
-                    text("""
-                        INSERT INTO chat_messages (tenant_id, chat_id, role, content)
-                        VALUES (:tenant_id, :chat_id, 'assistant', :content)
-                        RETURNING id
-                    """),
-                    {"tenant_id": str(tenant_id), "chat_id": str(chat_id), "content": full_content},
-                )
-                msg_id = str(result.fetchone()[0])
-
                 prompt_tokens = usage.get("prompt_tokens", 0) if usage else 0
                 completion_tokens = usage.get("completion_tokens", 0) if usage else 0
+                msg_id = await insert_message(
+                    session,
+                    tenant_id,
+                    chat_id,
+                    "assistant",
+                    shown_content,
+                    llm_content=full_content,
+                    blocks=blocks,
+                    input_tokens=prompt_tokens,
+                    output_tokens=completion_tokens,
+                )
 
                 # 7. Audit log (metadata only) — llm_audit_logs (legacy)
                 await session.execute(
@@ -685,22 +768,16 @@ async def _sse_stream(
                     },
                 )
 
-                # 8. usage_records for KPI aggregation
-                await session.execute(
-                    text("""
-                        INSERT INTO usage_records
-                        (tenant_id, user_id, assist_mode, model_name, model_version,
-                         input_tokens, output_tokens)
-                        VALUES (:tenant_id, :user_id, :assist_mode, 'gpt-4', NULL,
-                                :input_tokens, :output_tokens)
-                    """),
-                    {
-                        "tenant_id": str(tenant_id),
-                        "user_id": str(user_uuid),
-                        "assist_mode": assist_mode_key,
-                        "input_tokens": prompt_tokens,
-                        "output_tokens": completion_tokens,
-                    },
+                # 8. usage_records (+ hourly rollup) for KPI aggregation
+                await record_usage(
+                    session,
+                    tenant_id,
+                    str(user_uuid),
+                    assist_mode=assist_mode_key,
+                    model_name="gpt-4",
+                    model_version=None,
+                    input_tokens=prompt_tokens,
+                    output_tokens=completion_tokens,
                 )
 
                 # 9. audit_logs for Admin Logs UI
@@ -906,7 +983,7 @@ async def export_chat(
                 SELECT role, content, created_at
                 FROM chat_messages
                 WHERE chat_id = :chat_id AND role != 'system'
-                ORDER BY created_at ASC, id ASC
+                ORDER BY seq ASC
             """),
             {"chat_id": str(chat_id)},
         )
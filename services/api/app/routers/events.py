@@ -0,0 +1,172 @@
+"""Domain event subscriptions: long-poll, SSE and consumer checkpoints. Admin only (tenant-wide)."""
+import json
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.db import session_scope
+from app.dependencies import require_auth, get_tenant_id
+from app.services.event_subscriptions import (
+    Cursor,
+    ack,
+    fetch_events,
+    latest_cursor,
+    load_checkpoint,
+    notifier,
+    wait_for,
+)
+
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+MAX_WAIT_SECONDS = 30
+HEARTBEAT_SECONDS = 15
+POLL_INTERVAL_SECONDS = 1.0
+
+
+class AckBody(BaseModel):
+    consumer: str
+    cursor: str
+
+
+def _is_admin(request: Request) -> bool:
+    roles = getattr(request.state, "roles", None) or []
+    return "admin" in roles
+
+
+def _require_admin(request: Request):
+    tenant_id = get_tenant_id(request)
+    if not tenant_id:
+        raise HTTPException(status_code=401, detail="Auth required")
+    if not _is_admin(request):
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return tenant_id
+
+
+def _parse_cursor(value: str | None) -> Cursor | None:
+    if not value:
+        return None
+    try:
+        return Cursor.decode(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_types(types: str | None) -> list[str] | None:
+    return [t.strip() for t in types.split(",") if t.strip()] if types else None
+
+
+async def _start_cursor(tenant_id, cursor: Cursor | None, consumer: str | None, from_start: bool) -> Cursor | None:
+    """Explicit cursor > consumer checkpoint > oldest event (from_start) > only new events."""
+    if cursor:
+        return cursor
+    async with session_scope(tenant_id=tenant_id) as session:
+        if consumer and (checkpoint := await load_checkpoint(session, consumer, tenant_id)):
+            return checkpoint
+        return None if from_start else await latest_cursor(session)
+
+
+@router.get("", response_model=dict)
+@limiter.limit("120/minute")
+async def poll_events(
+    request: Request,
+    cursor: str | None = None,
+    consumer: str | None = None,
+    types: str | None = Query(None, description="Comma-separated event types"),
+    limit: int = Query(500, ge=1, le=1000),
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="Long-poll seconds when no events"),
+    from_start: bool = False,
+    _auth=Depends(require_auth),
+):
+    """
+    Events after cursor (or the consumer's checkpoint). Returns { events, cursor }; pass cursor back
+    on the next call and ack it (POST /events/ack) once handled. With wait > 0 the request blocks
+    until events arrive (NOTIFY) or wait expires.
+    """
+    tenant_id = _require_admin(request)
+    current = await _start_cursor(tenant_id, _parse_cursor(cursor), consumer, from_start)
+    event_types = _parse_types(types)
+    deadline = time.monotonic() + wait
+    async with notifier.listen(tenant_id) as woken:
+        while True:
+            woken.clear()
+            async with session_scope(tenant_id=tenant_id) as session:
+                events, next_cursor = await fetch_events(session, tenant_id, current, limit=limit, event_types=event_types)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0:
+                break
+            current = next_cursor
+            await wait_for(woken, min(remaining, POLL_INTERVAL_SECONDS))
+    return {"events": events, "cursor": next_cursor.encode() if next_cursor else None}
+
+
+@router.post("/ack", response_model=dict)
+@limiter.limit("600/minute")
+async def ack_events(
+    request: Request,
+    body: AckBody,
+    _auth=Depends(require_auth),
+):
+    """Checkpoint a consumer: all events up to cursor are handled. Never moves a checkpoint backwards."""
+    tenant_id = _require_admin(request)
+    if not body.consumer.strip():
+        raise HTTPException(status_code=400, detail="consumer required")
+    cursor = _parse_cursor(body.cursor)
+    if cursor is None:
+        raise HTTPException(status_code=400, detail="cursor required")
+    async with session_scope(tenant_id=tenant_id) as session:
+        await ack(session, body.consumer, tenant_id, cursor)
+    return {"ok": True}
+
+
+@router.get("/stream")
+@limiter.limit("30/minute")
+async def stream_events(
+    request: Request,
+    cursor: str | None = None,
+    consumer: str | None = None,
+    types: str | None = Query(None, description="Comma-separated event types"),
+    from_start: bool = False,
+    _auth=Depends(require_auth),
+):
+    """
+    SSE: `event: domain_event` per event with `id:` = cursor after it, so EventSource reconnects
+    resume from Last-Event-ID. Heartbeat comments keep idle connections open. Acks stay explicit.
+    """
+    tenant_id = _require_admin(request)
+    start = _parse_cursor(request.headers.get("Last-Event-ID") or cursor)
+    current = await _start_cursor(tenant_id, start, consumer, from_start)
+    event_types = _parse_types(types)
+
+    async def _sse():
+        nonlocal current
+        last_sent = time.monotonic()
+        async with notifier.listen(tenant_id) as woken:
+            while not await request.is_disconnected():
+                woken.clear()
+                async with session_scope(tenant_id=tenant_id) as session:
+                    events, next_cursor = await fetch_events(session, tenant_id, current, event_types=event_types)
+                for event in events:
+                    yield f"id: {Cursor.of(event).encode()}\nevent: domain_event\ndata: {json.dumps(event)}\n\n"
+                if next_cursor != current:
+                    current = next_cursor
+                    last_sent = time.monotonic()
+                    continue
+                if time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+                    yield ": heartbeat\n\n"
+                    last_sent = time.monotonic()
+                await wait_for(woken, POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        _sse(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
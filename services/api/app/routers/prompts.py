@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import get_session
 from app.dependencies import require_auth, get_tenant_id
 from app.services.prompt_registry import ASSIST_KEYS
+from app.services.version_allocator import insert_prompt_version
 
 router = APIRouter()
 limiter = Limiter(key_func=get_remote_address)
@@ -118,20 +119,16 @@ async def update_prompt(
             raise HTTPException(status_code=404, detail="Prompt not found")
 
         prompt_id = row[0]
-        res = await session.execute(
-            text(
-                "SELECT COALESCE(MAX(version), 0) + 1 FROM prompt_versions WHERE prompt_id = :pid"
-            ),
-            {"pid": prompt_id},
-        )
-        new_version = res.scalar() or 1
 
-        await session.execute(
-            text(
-                "INSERT INTO prompt_versions (prompt_id, version, body) VALUES (:pid, :ver, :body)"
-            ),
-            {"pid": prompt_id, "ver": new_version, "body": body},
-        )
+        async def insert(version: int) -> None:
+            await session.execute(
+                text(
+                    "INSERT INTO prompt_versions (prompt_id, version, body) VALUES (:pid, :ver, :body)"
+                ),
+                {"pid": prompt_id, "ver": version, "body": body},
+            )
+
+        new_version = await insert_prompt_version(session, prompt_id, insert)
 
         result = PromptDetail(
             key=key,
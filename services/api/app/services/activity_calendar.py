@@ -0,0 +1,61 @@
+"""Per-user daily activity calendar: user_activity_days, maintained on write.
+
+One row per (tenant, user, UTC day) with usage, upserted by kpi_rollups.record_usage in the same
+statement as the usage row. Active days, the current streak and tenant heatmaps read one row per
+day (per user) instead of scanning usage in range.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_DAY = timedelta(days=1)
+
+# CTE body for record_usage: count the inserted usage row (rec) on its user's day
+UPSERT_FROM_REC = """
+    INSERT INTO user_activity_days (tenant_id, user_id, day, request_count, total_tokens)
+    SELECT tenant_id, user_id, date_trunc('day', ts)::date, 1, input_tokens + output_tokens FROM rec
+    ON CONFLICT (tenant_id, user_id, day) DO UPDATE SET
+        request_count = user_activity_days.request_count + 1,
+        total_tokens = user_activity_days.total_tokens + EXCLUDED.total_tokens
+"""
+
+
+@dataclass
+class ActivityDay:
+    day: date
+    active_users: int
+    request_count: int
+    total_tokens: int
+
+
+def streak_stats(days: list[date]) -> tuple[int, int]:
+    """(number of days, length of the most recent run of consecutive days). days must be sorted."""
+    streak = 0
+    for i, day in enumerate(days):
+        streak = streak + 1 if i and day - days[i - 1] == _DAY else 1
+    return len(days), streak
+
+
+async def load_calendar(
+    session: AsyncSession, tenant_id: UUID, user_id: str | None, first_day: date, last_day: date
+) -> list[ActivityDay]:
+    """Active days in [first_day, last_day], oldest first; user_id None = whole tenant (active_users per day)."""
+    params = {"tenant_id": str(tenant_id), "first_day": first_day, "last_day": last_day}
+    user_filter = ""
+    if user_id:
+        params["user_id"] = user_id
+        user_filter = "AND user_id = :user_id"
+    r = await session.execute(
+        text(f"""
+            SELECT day, COUNT(*), SUM(request_count), SUM(total_tokens)
+            FROM user_activity_days
+            WHERE tenant_id = :tenant_id AND day >= :first_day AND day <= :last_day {user_filter}
+            GROUP BY day
+            ORDER BY day
+        """),
+        params,
+    )
+    return [ActivityDay(day, int(users), int(requests), int(tokens or 0)) for day, users, requests, tokens in r.fetchall()]
@@ -1,5 +1,7 @@
 """AI Response Rendering Service. Parses, sanitizes, stores AI markdown."""
+from concurrent.futures import Executor, ProcessPoolExecutor
 from uuid import UUID, uuid4
+import asyncio
 import json
 
 from sqlalchemy import text
@@ -7,8 +9,123 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.services.markdown_sanitizer import sanitize_markdown
-from app.services.block_extractor import extract_blocks
-from app.services.event_store import append_event
+from app.services.block_extractor import BlockStream, extract_blocks
+from app.services.event_store import (
+    REFERENCE_SCHEMA_VERSION,
+    ai_response_created_payload,
+    append_event,
+    append_events,
+)
+from app.services.version_allocator import insert_ai_response_version, insert_ai_response_versions
+
+
+def render_blocks(markdown: str) -> list[dict] | None:
+    """Sanitize + extract structured blocks. None if sanitization rejects the markdown."""
+    result = sanitize_markdown(markdown)
+    if result.failed:
+        return None
+    return extract_blocks(result.sanitized)
+
+
+def _sanitize_text(value: str) -> str | None:
+    result = sanitize_markdown(value)
+    return None if result.failed else result.sanitized
+
+
+def sanitize_block(block: dict) -> dict | None:
+    """
+    Block with every text field passed through sanitize_markdown(). None if a field is rejected
+    or a paragraph / heading / quote is left empty.
+    """
+    out = dict(block)
+    for key in ("content", "label", "command"):
+        if isinstance(out.get(key), str):
+            if (value := _sanitize_text(out[key])) is None:
+                return None
+            out[key] = value
+    if "items" in out:
+        items = []
+        for item in out["items"]:
+            cells = item if isinstance(item, list) else [item]
+            clean = [_sanitize_text(c) for c in cells]
+            if None in clean:
+                return None
+            items.append(clean if isinstance(item, list) else clean[0])
+        out["items"] = items
+    if language := (out.get("metadata") or {}).get("language"):
+        if (value := _sanitize_text(language)) is None:
+            return None
+        out["metadata"] = {**out["metadata"], "language": value}
+    if out["type"] in ("paragraph", "heading", "quote") and not out["content"]:
+        return None
+    return out
+
+
+class SanitizedBlockStream:
+    """
+    BlockStream for streamed answers whose blocks pass sanitize_block() before they are sent;
+    rejected blocks are dropped. blocks collects everything emitted, so what is stored for the
+    message is exactly what the client received.
+    """
+
+    def __init__(self) -> None:
+        self._stream = BlockStream()
+        self.blocks: list[dict] = []
+
+    def feed(self, chunk: str) -> list[dict]:
+        return self._keep(self._stream.feed(chunk))
+
+    def close(self) -> list[dict]:
+        return self._keep(self._stream.close())
+
+    def _keep(self, blocks: list[dict]) -> list[dict]:
+        kept = [b for b in map(sanitize_block, blocks) if b is not None]
+        self.blocks += kept
+        return kept
+
+
+def render_documents(documents: list[str]) -> list[tuple[str, list[dict] | None, str | None]]:
+    """Worker side: each markdown -> (sanitized, blocks, failure reason). blocks is None on failure."""
+    out = []
+    for raw in documents:
+        result = sanitize_markdown(raw)
+        if result.failed:
+            out.append(("", None, result.reason or "Sanitization failed"))
+        else:
+            out.append((result.sanitized, extract_blocks(result.sanitized), None))
+    return out
+
+
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def _render_executor() -> Executor | None:
+    """Shared process pool (settings.render_workers > 1); else the loop's default thread pool."""
+    global _render_pool
+    if settings.render_workers > 1 and _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=settings.render_workers)
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+
+async def render_documents_parallel(documents: list[str]) -> list[tuple[str, list[dict] | None, str | None]]:
+    """render_documents() off the event loop, split across the render workers. Keeps input order."""
+    if not documents:
+        return []
+    loop = asyncio.get_running_loop()
+    chunks = max(1, min(settings.render_workers, len(documents)))
+    size = -(-len(documents) // chunks)
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(_render_executor(), render_documents, documents[i:i + size])
+        for i in range(0, len(documents), size)
+    ))
+    return [item for part in parts for item in part]
 
 
 class AIRenderingService:
@@ -48,38 +165,31 @@ class AIRenderingService:
 
         blocks = extract_blocks(sanitized_result.sanitized)
 
-        # Get next version for this entity
-        version_result = await self.session.execute(
-            text("""
-                SELECT COALESCE(MAX(version), 0) + 1
-                FROM ai_responses
-                WHERE tenant_id = :tenant_id AND entity_id = :entity_id
-            """),
-            {"tenant_id": str(self.tenant_id), "entity_id": entity_id},
-        )
-        version = version_result.scalar() or 1
-
         response_id = uuid4()
         blocks_json = json.dumps(blocks)
 
-        await self.session.execute(
-            text("""
-                INSERT INTO ai_responses
-                (id, tenant_id, entity_type, entity_id, raw_markdown, structured_blocks, model, confidence, version)
-                VALUES (:id, :tenant_id, :entity_type, :entity_id, :raw_markdown, CAST(:structured_blocks AS jsonb), :model, :confidence, :version)
-            """),
-            {
-                "id": str(response_id),
-                "tenant_id": str(self.tenant_id),
-                "entity_type": entity_type,
-                "entity_id": entity_id,
-                "raw_markdown": sanitized_result.sanitized,
-                "structured_blocks": blocks_json,
-                "model": model,
-                "confidence": confidence,
-                "version": version,
-            },
-        )
+        async def insert(version: int) -> None:
+            await self.session.execute(
+                text("""
+                    INSERT INTO ai_responses
+                    (id, tenant_id, entity_type, entity_id, raw_markdown, structured_blocks, model, confidence, version)
+                    VALUES (:id, :tenant_id, :entity_type, :entity_id, :raw_markdown, CAST(:structured_blocks AS jsonb), :model, :confidence, :version)
+                """),
+                {
+                    "id": str(response_id),
+                    "tenant_id": str(self.tenant_id),
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "raw_markdown": sanitized_result.sanitized,
+                    "structured_blocks": blocks_json,
+                    "model": model,
+                    "confidence": confidence,
+                    "version": version,
+                },
+            )
+
+        # Next version for this entity (counter row, locked until commit)
+        version = await insert_ai_response_version(self.session, self.tenant_id, entity_id, insert)
 
         await append_event(
             self.session,
@@ -88,15 +198,9 @@ class AIRenderingService:
             entity_type=entity_type,
             entity_id=entity_id,
             event_type="ai_response.created",
-            payload={
-                "raw_markdown": sanitized_result.sanitized,
-                "structured_blocks": blocks,
-                "model": model,
-                "confidence": confidence,
-                "version": version,
-                "response_id": str(response_id),
-            },
+            payload=ai_response_created_payload(response_id, sanitized_result.sanitized, model, confidence, version),
             source="ai-rendering-service",
+            schema_version=REFERENCE_SCHEMA_VERSION,
             confidence=confidence,
             model=model,
         )
@@ -112,3 +216,91 @@ class AIRenderingService:
             "version": version,
             "needs_review": needs_review,
         }
+
+    async def process_markdown_batch(self, items: list[dict]) -> list[dict]:
+        """
+        Batch process_markdown(): items are dicts with raw_markdown, entity_type, entity_id, model, confidence.
+        Renders in the worker pool, allocates all versions in one statement, bulk-inserts ai_responses
+        and domain_events. Returns one result per item, in order; items rejected by sanitization get
+        { entity_type, entity_id, error } (plus an ai_response.sanitization_failed event) instead.
+        """
+        rendered = await render_documents_parallel([item["raw_markdown"] for item in items])
+        accepted = [(item, r) for item, r in zip(items, rendered) if r[1] is not None]
+        response_ids = [uuid4() for _ in accepted]
+
+        async def insert(versions: list[int]) -> None:
+            await self.session.execute(
+                text("""
+                    INSERT INTO ai_responses
+                    (id, tenant_id, entity_type, entity_id, raw_markdown, structured_blocks, model, confidence, version)
+                    SELECT r.id, CAST(:tenant_id AS uuid), r.entity_type, r.entity_id, r.raw_markdown,
+                           CAST(r.structured_blocks AS jsonb), r.model, r.confidence, r.version
+                    FROM unnest(
+                        CAST(:ids AS uuid[]), CAST(:entity_types AS text[]), CAST(:entity_ids AS text[]),
+                        CAST(:raw_markdowns AS text[]), CAST(:structured_blocks AS text[]), CAST(:models AS text[]),
+                        CAST(:confidences AS float8[]), CAST(:versions AS int[])
+                    ) AS r(id, entity_type, entity_id, raw_markdown, structured_blocks, model, confidence, version)
+                """),
+                {
+                    "tenant_id": str(self.tenant_id),
+                    "ids": [str(rid) for rid in response_ids],
+                    "entity_types": [item["entity_type"] for item, _ in accepted],
+                    "entity_ids": [item["entity_id"] for item, _ in accepted],
+                    "raw_markdowns": [r[0] for _, r in accepted],
+                    "structured_blocks": [json.dumps(r[1]) for _, r in accepted],
+                    "models": [item["model"] for item, _ in accepted],
+                    "confidences": [item["confidence"] for item, _ in accepted],
+                    "versions": versions,
+                },
+            )
+
+        versions = (
+            await insert_ai_response_versions(
+                self.session, self.tenant_id, [item["entity_id"] for item, _ in accepted], insert
+            )
+            if accepted
+            else []
+        )
+        created = iter(zip(response_ids, versions))
+
+        results: list[dict] = []
+        events: list[dict] = []
+        for item, (sanitized, blocks, reason) in zip(items, rendered):
+            if blocks is None:
+                results.append({"entity_type": item["entity_type"], "entity_id": item["entity_id"], "error": reason})
+                events.append({
+                    "actor": "system",
+                    "entity_type": item["entity_type"],
+                    "entity_id": item["entity_id"],
+                    "event_type": "ai_response.sanitization_failed",
+                    "payload": {"reason": reason},
+                    "source": "ai-rendering-service",
+                })
+                continue
+            response_id, version = next(created)
+            events.append({
+                "actor": "ai_model",
+                "entity_type": item["entity_type"],
+                "entity_id": item["entity_id"],
+                "event_type": "ai_response.created",
+                "payload": ai_response_created_payload(
+                    response_id, sanitized, item["model"], item["confidence"], version
+                ),
+                "source": "ai-rendering-service",
+                "schema_version": REFERENCE_SCHEMA_VERSION,
+                "confidence": item["confidence"],
+                "model": item["model"],
+            })
+            results.append({
+                "id": str(response_id),
+                "entity_type": item["entity_type"],
+                "entity_id": item["entity_id"],
+                "structured_blocks": blocks,
+                "model": item["model"],
+                "confidence": item["confidence"],
+                "version": version,
+                "needs_review": item["confidence"] < settings.ai_confidence_threshold,
+            })
+
+        await append_events(self.session, self.tenant_id, events)
+        return results
@@ -0,0 +1,207 @@
+"""Bulk reprocessing of stored ai_responses after sanitizer/extractor changes. Resumable, batched, throttled."""
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.services import block_extractor, markdown_sanitizer
+from app.services.ai_rendering_service import render_blocks
+
+# Keyset start: sorts before every uuid
+_START_ID = "00000000-0000-0000-0000-000000000000"
+
+
+@dataclass
+class ReprocessStats:
+    processed: int = 0
+    updated: int = 0  # rows whose structured_blocks changed
+    failed: int = 0  # rows the sanitizer now rejects (left unchanged)
+
+
+def processor_fingerprint() -> str:
+    """Short hash of sanitizer + extractor source. Default job name: a code change starts a new run."""
+    digest = hashlib.sha256()
+    for module in (markdown_sanitizer, block_extractor):
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()[:12]
+
+
+def render_batch(rows: list[tuple[str, str]]) -> list[tuple[str, list[dict] | None]]:
+    """Worker side: (id, raw_markdown) -> (id, blocks or None if sanitization rejects it)."""
+    return [(row_id, render_blocks(raw)) for row_id, raw in rows]
+
+
+class Throttle:
+    """Caps throughput at max_rows_per_second (0 = unlimited) by sleeping between batches."""
+
+    def __init__(self, max_rows_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.max_rows_per_second = max_rows_per_second
+        self._clock = clock
+        self._next: float | None = None
+
+    def delay(self, rows: int) -> float:
+        """Seconds to wait after a batch of rows. Time lost while behind schedule is not made up."""
+        if self.max_rows_per_second <= 0:
+            return 0.0
+        now = self._clock()
+        start = now if self._next is None or self._next < now else self._next
+        self._next = start + rows / self.max_rows_per_second
+        return self._next - now
+
+    async def wait(self, rows: int) -> None:
+        seconds = self.delay(rows)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+
+async def _set_tenant(conn: AsyncConnection, tenant_id: UUID) -> None:
+    await conn.execute(text(f"SET LOCAL app.tenant_id = '{tenant_id}'"))
+
+
+async def _load_checkpoint(
+    engine: AsyncEngine, job: str, tenant_id: UUID
+) -> tuple[str | None, ReprocessStats, bool]:
+    """Returns (last processed id, counters so far, finished)."""
+    async with engine.begin() as conn:
+        await _set_tenant(conn, tenant_id)
+        r = await conn.execute(
+            text("""
+                SELECT last_id, processed, updated, failed, finished_at IS NOT NULL
+                FROM reprocess_checkpoints WHERE job = :job AND tenant_id = :tenant_id
+            """),
+            {"job": job, "tenant_id": str(tenant_id)},
+        )
+        row = r.fetchone()
+    if not row:
+        return None, ReprocessStats(), False
+    return (str(row[0]) if row[0] else None), ReprocessStats(row[1], row[2], row[3]), bool(row[4])
+
+
+async def _save_checkpoint(
+    conn: AsyncConnection,
+    job: str,
+    tenant_id: UUID,
+    last_id: str | None,
+    stats: ReprocessStats,
+    *,
+    finished: bool = False,
+) -> None:
+    await conn.execute(
+        text("""
+            INSERT INTO reprocess_checkpoints
+            (job, tenant_id, last_id, processed, updated, failed, finished_at, updated_at)
+            VALUES (:job, :tenant_id, CAST(:last_id AS uuid), :processed, :updated, :failed,
+                    CASE WHEN :finished THEN now() END, now())
+            ON CONFLICT (job, tenant_id) DO UPDATE SET
+                last_id = COALESCE(EXCLUDED.last_id, reprocess_checkpoints.last_id),
+                processed = EXCLUDED.processed,
+                updated = EXCLUDED.updated,
+                failed = EXCLUDED.failed,
+                finished_at = EXCLUDED.finished_at,
+                updated_at = now()
+        """),
+        {
+            "job": job,
+            "tenant_id": str(tenant_id),
+            "last_id": last_id,
+            "processed": stats.processed,
+            "updated": stats.updated,
+            "failed": stats.failed,
+            "finished": finished,
+        },
+    )
+
+
+async def _render(
+    executor: Executor | None, rows: list[tuple[str, str]], chunks: int
+) -> list[tuple[str, list[dict] | None]]:
+    """Spread a batch over the executor's workers."""
+    loop = asyncio.get_running_loop()
+    chunks = max(1, min(chunks, len(rows)))
+    parts = await asyncio.gather(
+        *(loop.run_in_executor(executor, render_batch, rows[i::chunks]) for i in range(chunks))
+    )
+    return [item for part in parts for item in part]
+
+
+async def reprocess_tenant(
+    engine: AsyncEngine,
+    tenant_id: UUID,
+    *,
+    job: str,
+    executor: Executor | None = None,
+    workers: int = 1,
+    batch_size: int = 500,
+    throttle: Throttle | None = None,
+    dry_run: bool = False,
+) -> ReprocessStats:
+    """
+    Re-run sanitize + extract over one tenant's ai_responses, in id order.
+    Rows are streamed with a server-side cursor; each batch's changed blocks are written with one
+    UPDATE, in the same transaction as the checkpoint, so an interrupted run resumes after the last
+    committed batch. dry_run: count only, write nothing.
+    """
+    last_id, stats, finished = await _load_checkpoint(engine, job, tenant_id)
+    if finished:
+        return stats
+
+    async with engine.connect() as reader, engine.connect() as writer:
+        await _set_tenant(reader, tenant_id)
+        result = await reader.stream(
+            text("""
+                SELECT id, raw_markdown, structured_blocks FROM ai_responses
+                WHERE tenant_id = :tenant_id AND id > CAST(:after AS uuid)
+                ORDER BY id
+            """),
+            {"tenant_id": str(tenant_id), "after": last_id or _START_ID},
+        )
+        async for batch in result.partitions(batch_size):
+            current = {str(row[0]): row[2] for row in batch}
+            rendered = await _render(executor, [(str(row[0]), row[1]) for row in batch], workers)
+            changed = [(row_id, blocks) for row_id, blocks in rendered if blocks is not None and blocks != current[row_id]]
+            stats.processed += len(batch)
+            stats.updated += len(changed)
+            stats.failed += sum(1 for _, blocks in rendered if blocks is None)
+            last_id = str(batch[-1][0])
+
+            if not dry_run:
+                async with writer.begin():
+                    await _set_tenant(writer, tenant_id)
+                    if changed:
+                        await writer.execute(
+                            text("""
+                                UPDATE ai_responses AS r
+                                SET structured_blocks = CAST(v.blocks AS jsonb)
+                                FROM unnest(CAST(:ids AS text[]), CAST(:blocks AS text[])) AS v(id, blocks)
+                                WHERE r.id = CAST(v.id AS uuid) AND r.tenant_id = :tenant_id
+                            """),
+                            {
+                                "tenant_id": str(tenant_id),
+                                "ids": [row_id for row_id, _ in changed],
+                                "blocks": [json.dumps(blocks) for _, blocks in changed],
+                            },
+                        )
+                    await _save_checkpoint(writer, job, tenant_id, last_id, stats)
+            if throttle:
+                await throttle.wait(len(batch))
+        await reader.rollback()  # read-only snapshot
+
+        if not dry_run:
+            async with writer.begin():
+                await _set_tenant(writer, tenant_id)
+                await _save_checkpoint(writer, job, tenant_id, last_id, stats, finished=True)
+    return stats
+
+
+async def list_tenant_ids(engine: AsyncEngine) -> list[UUID]:
+    async with engine.connect() as conn:
+        r = await conn.execute(text("SELECT id FROM tenants ORDER BY id"))
+        return [UUID(str(row[0])) for row in r.fetchall()]
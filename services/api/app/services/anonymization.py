@@ -1,29 +1,124 @@
 """Basic PII anonymization via regex masking. MVP only - not perfect de-identification."""
 import re
 
-# Patterns: order matters (more specific first)
-_PATTERNS: list[tuple[re.Pattern[str], str]] = [
-    # Emails
-    (re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"), "[EMAIL]"),
+# Emails are masked in their own pass first, as in the original sequential rules: an address
+# directly after a salutation ("Herr Max@example.com") must become [EMAIL], not a [PERSON] that
+# leaves the rest of the address behind.
+_EMAIL_AT = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+# Search only from the start of a local-part run, so runs without '@' are scanned once (linear)
+_EMAIL_SEARCH = re.compile(r"(?<![a-zA-Z0-9._%+-])" + _EMAIL_AT.pattern)
+
+
+def _mask_emails(text: str) -> str:
+    """Same matches as _EMAIL_AT.sub(): an address may also start right where the previous one ended."""
+    parts, pos = [], 0
+    match = _EMAIL_SEARCH.search(text)
+    while match:
+        parts += (text[pos : match.start()], "[EMAIL]")
+        pos = match.end()
+        match = _EMAIL_AT.match(text, pos) or _EMAIL_SEARCH.search(text, pos)
+    if not parts:
+        return text
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+# Remaining rules: order matters (more specific first). At any position the first matching rule wins.
+_RULES: list[tuple[str, str, str]] = [
     # German phone numbers (simplified)
-    (re.compile(r"\+49[- ]?[0-9]{2,4}[- ]?[0-9]{4,10}"), "[PHONE]"),
-    (re.compile(r"0[0-9]{2,4}[- ]?[0-9]{4,10}"), "[PHONE]"),
+    ("phone_intl", r"\+49[- ]?[0-9]{2,4}[- ]?[0-9]{4,10}", "[PHONE]"),
+    ("phone", r"0[0-9]{2,4}[- ]?[0-9]{4,10}", "[PHONE]"),
     # Date of birth patterns (DD.MM.YYYY, DD/MM/YYYY, YYYY-MM-DD)
-    (re.compile(r"\b\d{1,2}\.\d{1,2}\.\d{4}\b"), "[DATE_OF_BIRTH]"),
-    (re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}\b"), "[DATE_OF_BIRTH]"),
-    (re.compile(r"\b\d{4}-\d{2}-\d{2}\b"), "[DATE_OF_BIRTH]"),
+    ("dob_dotted", r"\b\d{1,2}\.\d{1,2}\.\d{4}\b", "[DATE_OF_BIRTH]"),
+    ("dob_slashed", r"\b\d{1,2}/\d{1,2}/\d{4}\b", "[DATE_OF_BIRTH]"),
+    ("dob_iso", r"\b\d{4}-\d{2}-\d{2}\b", "[DATE_OF_BIRTH]"),
     # ID-like (long digit sequences)
-    (re.compile(r"\b\d{10,}\b"), "[ID_NUMBER]"),
+    ("id_number", r"\b\d{10,}\b", "[ID_NUMBER]"),
     # Herr/Frau + Word -> [PERSON]
-    (re.compile(r"\b(?:Herr|Frau)\s+[A-ZÄÖÜa-zäöüß]+\b"), "[PERSON]"),
+    ("person_salutation", r"\b(?:Herr|Frau)\s+[A-ZÄÖÜa-zäöüß]+\b", "[PERSON]"),
     # Dr. + Word -> [PERSON]
-    (re.compile(r"\bDr\.\s*[A-ZÄÖÜa-zäöüß]+\b"), "[PERSON]"),
+    ("person_title", r"\bDr\.\s*[A-ZÄÖÜa-zäöüß]+\b", "[PERSON]"),
 ]
 
+# Cheap guard so the alternation is only tried where some rule can start:
+# '+', a digit or H/F/D (salutations, titles).
+_START_GUARD = r"(?=[+\dDFH])"
+
+_SCANNER = re.compile(
+    _START_GUARD + "(?:" + "|".join(f"(?P<{name}>{source})" for name, source, _ in _RULES) + ")"
+)
+_REPLACEMENTS = {name: replacement for name, _, replacement in _RULES}
+
+
+def _replace(match: re.Match[str]) -> str:
+    return _REPLACEMENTS[match.lastgroup]
+
 
 def anonymize(text: str) -> str:
-    """Apply deterministic regex masking. Returns masked text for LLM; original stored in DB."""
-    result = text
-    for pattern, replacement in _PATTERNS:
-        result = pattern.sub(replacement, result)
-    return result
+    """Apply deterministic regex masking (email pass, then one left-to-right scan). Returns masked text for LLM; original stored in DB."""
+    return _SCANNER.sub(_replace, _mask_emails(text))
+
+
+_PERSON_RULES = frozenset({"person_salutation", "person_title"})
+
+
+def pseudonymize(text: str, pseudonyms: dict[str, str]) -> str:
+    """
+    Mask like anonymize(), but give each person a stable per-conversation pseudonym ([PERSON_1], ...).
+    pseudonyms maps original name -> placeholder and is extended in place with newly seen names.
+    """
+
+    def replace(match: re.Match[str]) -> str:
+        if match.lastgroup not in _PERSON_RULES:
+            return _REPLACEMENTS[match.lastgroup]
+        original = " ".join(match.group().split())
+        placeholder = pseudonyms.get(original)
+        if placeholder is None:
+            placeholder = f"[PERSON_{len(pseudonyms) + 1}]"
+            pseudonyms[original] = placeholder
+        return placeholder
+
+    return _SCANNER.sub(replace, _mask_emails(text))
+
+
+_PLACEHOLDER = re.compile(r"\[PERSON_\d+\]")
+_PLACEHOLDER_HEAD = "[PERSON_"
+
+
+def _could_become_placeholder(tail: str) -> bool:
+    """True if tail (starting with '[') is an unfinished placeholder such as '[PERS' or '[PERSON_1'."""
+    head = tail[: len(_PLACEHOLDER_HEAD)]
+    rest = tail[len(head):]
+    return _PLACEHOLDER_HEAD.startswith(head) and (not rest or rest.isdigit())
+
+
+class StreamingReidentifier:
+    """
+    Maps pseudonym placeholders in streamed LLM output back to the original names.
+    Holds back at most one unfinished placeholder (bounded look-ahead); everything else passes through.
+    """
+
+    def __init__(self, pseudonyms: dict[str, str]):
+        self._originals = {placeholder: original for original, placeholder in pseudonyms.items()}
+        self._max_len = max((len(p) for p in self._originals), default=0)
+        self._pending = ""
+
+    def _restore(self, match: re.Match[str]) -> str:
+        return self._originals.get(match.group(), match.group())
+
+    def feed(self, chunk: str) -> str:
+        """Return the text that is safe to emit now."""
+        if not self._originals:
+            return chunk
+        text = self._pending + chunk
+        self._pending = ""
+        cut = text.rfind("[")
+        if cut != -1 and len(text) - cut < self._max_len and _could_become_placeholder(text[cut:]):
+            self._pending = text[cut:]
+            text = text[:cut]
+        return _PLACEHOLDER.sub(self._restore, text)
+
+    def flush(self) -> str:
+        """Return whatever is still held back (end of stream)."""
+        text, self._pending = self._pending, ""
+        return _PLACEHOLDER.sub(self._restore, text)
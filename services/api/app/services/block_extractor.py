@@ -12,47 +12,201 @@ ACTION_LINE = re.compile(r"^ACTION:\s*(.+)$", re.IGNORECASE)
 LABEL_LINE = re.compile(r"^LABEL:\s*(.+)$", re.IGNORECASE)
 CONFIDENCE_LINE = re.compile(r"^CONFIDENCE:\s*([0-9.]+)\s*$", re.IGNORECASE)
 
-
-def _parse_action_block(lines: list[str], start: int) -> tuple[dict[str, Any] | None, int]:
+# One match per (stripped) line decides what it starts; alternatives are in precedence order.
+_LINE = re.compile(
+    r"(?P<divider>[-*_]{3,}\s*$)"
+    r"|(?P<action>(?i:#+\s*Recommended\s+Action\s*)$)"
+    r"|(?P<heading>(?P<hashes>#{1,6})\s+(?P<title>.+)$)"
+    r"|(?P<quote>>)"
+    r"|(?P<code>```)"
+    r"|(?P<table>\|)"
+    r"|(?P<list>[-*+]\s+(?P<bullet_item>.+)$|\d+\.\s+(?P<numbered_item>.+)$)"
+)
+_TABLE_SEPARATOR = re.compile(r"[-:]+")
+# First characters that can start a non-paragraph line (plus decimal digits for numbered lists)
+_MARKERS = frozenset("-*_#>`|+")
+
+
+class BlockStream:
     """
-    Try to parse action block. Returns (block_dict, next_line_index) or (None, start).
+    Incremental extract_blocks() for streamed model output.
+    feed() text chunks as they arrive; each call returns the blocks completed by that chunk.
+    The concatenated feed()/close() results equal extract_blocks() of the full text.
     """
-    i = start
-    if i >= len(lines):
-        return None, start
-
-    # First line should be ### Recommended Action (already consumed by caller)
-    command: str | None = None
-    label: str | None = None
-    confidence: float = 0.0
 
-    while i < len(lines):
-        line = lines[i]
+    def __init__(self) -> None:
+        self._partial = ""  # text after the last newline
+        self._paragraph: list[str] = []
+        self._mode: str | None = None  # open multi-line block: quote, code, table, list, action
+        self._lines: list[str] = []  # quote / code / action body lines
+        self._items: list[Any] = []  # list items / table rows
+        self._language = ""
+        self._action: dict[str, Any] = {}
+        self._out: list[dict[str, Any]] = []
+
+    def feed(self, chunk: str) -> list[dict[str, Any]]:
+        """Consume a chunk; return the blocks it completed (in order)."""
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        line_fn = self._line
+        for line in lines:
+            line_fn(line)
+        return self._take()
+
+    def close(self) -> list[dict[str, Any]]:
+        """End of stream: finalize the last line and any open block."""
+        self._line(self._partial)
+        self._partial = ""
+        while self._mode:
+            self._end_block()
+        self._flush_paragraph()
+        return self._take()
+
+    def _take(self) -> list[dict[str, Any]]:
+        out, self._out = self._out, []
+        return out
+
+    def _flush_paragraph(self) -> None:
+        if self._paragraph:
+            text = "\n".join(self._paragraph).strip()
+            if text:
+                self._out.append({"type": "paragraph", "content": text})
+            self._paragraph = []
+
+    def _open(self, mode: str) -> None:
+        self._flush_paragraph()
+        self._mode = mode
+        self._lines, self._items = [], []
+
+    def _end_block(self) -> None:
+        mode, self._mode = self._mode, None
+        lines, items = self._lines, self._items
+        self._lines, self._items = [], []
+        if mode == "quote":
+            if lines:
+                self._out.append({"type": "quote", "content": "\n".join(lines)})
+        elif mode == "code":
+            self._out.append({
+                "type": "code",
+                "content": "\n".join(lines),
+                "metadata": {"language": self._language} if self._language else {},
+            })
+        elif mode == "table":
+            if items:
+                self._out.append({"type": "table", "content": "", "items": items, "metadata": {}})
+        elif mode == "list":
+            if items:
+                self._out.append({"type": "list", "content": "", "items": items})
+        elif mode == "action":
+            command, label = self._action.get("command"), self._action.get("label")
+            if command and label:
+                self._out.append({
+                    "type": "action",
+                    "label": label,
+                    "command": command,
+                    "confidence": min(1.0, max(0.0, self._action.get("confidence", 0.0))),
+                })
+            else:
+                # Not an action block: drop the header, parse its body as regular markdown
+                for line in lines:
+                    self._line(line)
+
+    def _line(self, line: str) -> None:
         stripped = line.strip()
-        if not stripped:
-            i += 1
-            continue
-        if stripped.startswith("#") and i > start:
-            break
+        mode = self._mode
+
+        # Fast path: paragraph text and blank lines outside a block
+        if mode is None and not (stripped and (stripped[0] in _MARKERS or stripped[0].isdecimal())):
+            if stripped:
+                self._paragraph.append(line)
+            elif self._paragraph:
+                self._flush_paragraph()
+            return
+
+        # Code and action bodies are not classified
+        if mode == "code":
+            if stripped.startswith("```"):
+                self._end_block()
+            else:
+                self._lines.append(line)
+            return
+        if mode == "action":
+            if not (stripped.startswith("#") and self._lines):
+                self._lines.append(line)
+                self._add_action_line(stripped)
+                return
+            self._end_block()
+            if self._mode:  # replayed body left a block open
+                self._line(line)
+                return
+            mode = None
+        if mode == "table":
+            if "|" in line:
+                self._add_table_row(line)
+                return
+            self._end_block()
+            mode = None
+
+        m = _LINE.match(stripped)
+        kind = m.lastgroup if m else None
+
+        # Continue or end the open quote / list
+        if mode == "quote":
+            if kind == "quote":
+                if q := stripped[1:].strip():
+                    self._lines.append(q)
+                return
+            self._end_block()
+        elif mode == "list":
+            if kind == "list":
+                self._items.append(m.group("bullet_item") or m.group("numbered_item"))
+                return
+            self._end_block()
+
+        # Start a new block (or extend the paragraph)
+        if kind is None:
+            if stripped:
+                self._paragraph.append(line)
+            else:
+                self._flush_paragraph()
+        elif kind == "list":
+            self._open("list")
+            self._items.append(m.group("bullet_item") or m.group("numbered_item"))
+        elif kind == "heading":
+            self._flush_paragraph()
+            self._out.append({"type": "heading", "content": m.group("title").strip(), "level": len(m.group("hashes"))})
+        elif kind == "table":
+            self._open("table")
+            self._add_table_row(line)
+        elif kind == "quote":
+            self._open("quote")
+            if q := stripped[1:].strip():
+                self._lines.append(q)
+        elif kind == "code":
+            self._open("code")
+            self._language = stripped[3:].strip()
+        elif kind == "divider":
+            self._flush_paragraph()
+            self._out.append({"type": "divider", "content": ""})
+        else:  # action
+            self._open("action")
+            self._action = {}
+
+    def _add_table_row(self, line: str) -> None:
+        row = [c.strip() for c in line.split("|")[1:-1]]
+        if row and not all(_TABLE_SEPARATOR.fullmatch(c) for c in row):
+            self._items.append(row)
+
+    def _add_action_line(self, stripped: str) -> None:
         if am := ACTION_LINE.match(stripped):
-            command = am.group(1).strip()
+            self._action["command"] = am.group(1).strip()
         elif lb := LABEL_LINE.match(stripped):
-            label = lb.group(1).strip()
+            self._action["label"] = lb.group(1).strip()
         elif cf := CONFIDENCE_LINE.match(stripped):
             try:
-                confidence = float(cf.group(1))
+                self._action["confidence"] = float(cf.group(1))
             except ValueError:
                 pass
-        i += 1
-
-    if command and label:
-        return {
-            "type": "action",
-            "label": label,
-            "command": command,
-            "confidence": min(1.0, max(0.0, confidence)),
-        }, i
-    return None, start + 1
 
 
 def extract_blocks(markdown: str) -> list[dict[str, Any]]:
@@ -60,125 +214,5 @@ def extract_blocks(markdown: str) -> list[dict[str, Any]]:
     Convert markdown into structured blocks.
     Supports: heading, paragraph, list, table, code, divider, quote, action.
     """
-    blocks: list[dict[str, Any]] = []
-    lines = markdown.split("\n")
-    i = 0
-    buffer: list[str] = []
-
-    def flush_paragraph():
-        nonlocal buffer
-        if buffer:
-            text = "\n".join(buffer).strip()
-            if text:
-                blocks.append({"type": "paragraph", "content": text})
-            buffer = []
-
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        # Empty line - flush paragraph
-        if not stripped:
-            flush_paragraph()
-            i += 1
-            continue
-
-        # Horizontal rule
-        if re.match(r"^[-*_]{3,}\s*$", stripped):
-            flush_paragraph()
-            blocks.append({"type": "divider", "content": ""})
-            i += 1
-            continue
-
-        # Action block: ### Recommended Action (must check before generic heading)
-        if ACTION_HEADER.match(stripped):
-            flush_paragraph()
-            action_block, next_i = _parse_action_block(lines, i + 1)
-            if action_block:
-                blocks.append(action_block)
-                i = next_i
-                continue
-            i += 1
-            continue
-
-        # Heading
-        if m := re.match(r"^(#{1,6})\s+(.+)$", stripped):
-            flush_paragraph()
-            level = len(m.group(1))
-            blocks.append({"type": "heading", "content": m.group(2).strip(), "level": level})
-            i += 1
-            continue
-
-        # Blockquote
-        if stripped.startswith(">"):
-            flush_paragraph()
-            quote_lines = []
-            while i < len(lines) and lines[i].strip().startswith(">"):
-                q = lines[i].strip()[1:].strip()
-                if q:
-                    quote_lines.append(q)
-                i += 1
-            if quote_lines:
-                blocks.append({"type": "quote", "content": "\n".join(quote_lines)})
-            continue
-
-        # Code block
-        if stripped.startswith("```"):
-            flush_paragraph()
-            lang = stripped[3:].strip() or ""
-            code_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith("```"):
-                code_lines.append(lines[i])
-                i += 1
-            if i < len(lines):
-                i += 1
-            blocks.append({
-                "type": "code",
-                "content": "\n".join(code_lines),
-                "metadata": {"language": lang} if lang else {},
-            })
-            continue
-
-        # Table (simple: | a | b |)
-        if "|" in stripped and stripped.startswith("|"):
-            flush_paragraph()
-            table_rows = []
-            while i < len(lines) and "|" in lines[i]:
-                row = [c.strip() for c in lines[i].split("|")[1:-1]]
-                is_separator = row and all(re.match(r"^[-:]+$", c) for c in row)
-                if row and not is_separator:
-                    table_rows.append(row)
-                i += 1
-            if table_rows:
-                blocks.append({"type": "table", "content": "", "items": table_rows, "metadata": {}})
-            continue
-
-        # Unordered list
-        if re.match(r"^[-*+]\s+", stripped) or re.match(r"^\d+\.\s+", stripped):
-            flush_paragraph()
-            list_items = []
-            while i < len(lines):
-                li = lines[i]
-                um = re.match(r"^[-*+]\s+(.+)$", li.strip())
-                om = re.match(r"^(\d+)\.\s+(.+)$", li.strip())
-                if um:
-                    list_items.append(um.group(1))
-                    i += 1
-                elif om:
-                    list_items.append(om.group(2))
-                    i += 1
-                elif li.strip() and not li.strip().startswith("#"):
-                    break
-                else:
-                    break
-            if list_items:
-                blocks.append({"type": "list", "content": "", "items": list_items})
-            continue
-
-        # Regular paragraph line
-        buffer.append(line)
-        i += 1
-
-    flush_paragraph()
-    return blocks
+    stream = BlockStream()
+    return stream.feed(markdown) + stream.close()
@@ -61,7 +61,7 @@ async def fetch_messages_for_chats(
                 SELECT role, content, created_at
                 FROM chat_messages
                 WHERE chat_id = :cid AND role != 'system'
-                ORDER BY created_at ASC
+                ORDER BY seq ASC
             """),
             {"cid": str(cid)},
         )
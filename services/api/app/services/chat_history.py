@@ -0,0 +1,148 @@
+"""Chat message persistence and LLM history. Stores a pseudonymized shadow of every message."""
+import json
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.anonymization import pseudonymize
+
+PREVIEW_CHARS = 120  # chats.last_message_preview
+
+# chats counters for a non-system message (migration 027); now() is the message's created_at
+_COUNTERS = """,
+    message_count = message_count + 1,
+    input_tokens = input_tokens + :input_tokens,
+    output_tokens = output_tokens + :output_tokens,
+    first_message_at = COALESCE(first_message_at, now()),
+    last_message_at = now(),
+    last_message_preview = left(CAST(:content AS text), :preview_chars)"""
+
+
+async def get_pseudonyms(session: AsyncSession, chat_id: UUID) -> dict[str, str]:
+    """Read the chat's pseudonym map (original -> placeholder) without locking."""
+    r = await session.execute(
+        text("SELECT pseudonyms FROM chats WHERE id = :chat_id"),
+        {"chat_id": str(chat_id)},
+    )
+    row = r.fetchone()
+    return dict(row[0]) if row and row[0] else {}
+
+
+async def lock_pseudonyms(session: AsyncSession, chat_id: UUID) -> dict[str, str]:
+    """Load the chat's pseudonym map (original -> placeholder). Row-locks the chat until commit."""
+    r = await session.execute(
+        text("SELECT pseudonyms FROM chats WHERE id = :chat_id FOR UPDATE"),
+        {"chat_id": str(chat_id)},
+    )
+    row = r.fetchone()
+    return dict(row[0]) if row and row[0] else {}
+
+
+async def store_pseudonyms(session: AsyncSession, chat_id: UUID, pseudonyms: dict[str, str]) -> None:
+    await session.execute(
+        text("UPDATE chats SET pseudonyms = CAST(:pseudonyms AS jsonb) WHERE id = :chat_id"),
+        {"chat_id": str(chat_id), "pseudonyms": json.dumps(pseudonyms)},
+    )
+
+
+async def insert_message(
+    session: AsyncSession,
+    tenant_id: UUID,
+    chat_id: UUID,
+    role: str,
+    content: str,
+    *,
+    llm_content: str | None = None,
+    blocks: list[dict] | None = None,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+) -> str:
+    """
+    Insert a chat message (original content) with its pseudonymized shadow. Its seq is the chat's
+    next message number, allocated under the chat row lock taken for the pseudonyms; the chat's
+    counters (message count, tokens, first/last message time, preview) are updated in the same
+    statement, except for system messages.
+    llm_content: text the model should see for this turn (e.g. size-capped); defaults to content.
+    blocks: pre-rendered sanitized structured blocks (assistant messages, see ai_rendering_service.SanitizedBlockStream).
+    input_tokens / output_tokens: model usage of the turn (assistant messages).
+    Returns message id.
+    """
+    pseudonyms = await lock_pseudonyms(session, chat_id)
+    known = len(pseudonyms)
+    shadow = pseudonymize(llm_content if llm_content is not None else content, pseudonyms)
+    if len(pseudonyms) != known:
+        await store_pseudonyms(session, chat_id, pseudonyms)
+
+    result = await session.execute(
+        text(f"""
+            WITH next AS (
+                UPDATE chats SET last_message_seq = last_message_seq + 1{_COUNTERS if role != "system" else ""}
+                WHERE id = :chat_id
+                RETURNING last_message_seq
+            )
+            INSERT INTO chat_messages (tenant_id, chat_id, role, content, content_anonymized, blocks, seq)
+            SELECT CAST(:tenant_id AS uuid), CAST(:chat_id AS uuid), CAST(:role AS chat_message_role), :content,
+                   :content_anonymized, CAST(:blocks AS jsonb), last_message_seq
+            FROM next
+            RETURNING id
+        """),
+        {
+            "tenant_id": str(tenant_id),
+            "chat_id": str(chat_id),
+            "role": role,
+            "content": content,
+            "content_anonymized": shadow,
+            "blocks": json.dumps(blocks) if blocks is not None else None,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "preview_chars": PREVIEW_CHARS,
+        },
+    )
+    return str(result.fetchone()[0])
+
+
+async def fetch_llm_history(
+    session: AsyncSession,
+    chat_id: UUID,
+    *,
+    anonymized: bool,
+) -> list[dict[str, str]]:
+    """
+    Build the LLM message list for a chat (no system rows), oldest first.
+    anonymized=True returns the stored shadows; rows written before shadows existed are
+    pseudonymized once here and written back.
+    """
+    r = await session.execute(
+        text("""
+            SELECT id, role, content, content_anonymized FROM chat_messages
+            WHERE chat_id = :chat_id AND role != 'system'
+            ORDER BY seq ASC
+        """),
+        {"chat_id": str(chat_id)},
+    )
+    rows = r.fetchall()
+    if not anonymized:
+        return [{"role": row[1], "content": row[2]} for row in rows]
+
+    missing = [row for row in rows if row[3] is None]
+    backfilled: dict[str, str] = {}
+    if missing:
+        pseudonyms = await lock_pseudonyms(session, chat_id)
+        known = len(pseudonyms)
+        for row in missing:
+            backfilled[str(row[0])] = pseudonymize(row[2], pseudonyms)
+        if len(pseudonyms) != known:
+            await store_pseudonyms(session, chat_id, pseudonyms)
+        await session.execute(
+            text("""
+                UPDATE chat_messages SET content_anonymized = :content_anonymized
+                WHERE id = :id AND content_anonymized IS NULL
+            """),
+            [{"id": mid, "content_anonymized": shadow} for mid, shadow in backfilled.items()],
+        )
+
+    return [
+        {"role": row[1], "content": row[3] if row[3] is not None else backfilled[str(row[0])]}
+        for row in rows
+    ]
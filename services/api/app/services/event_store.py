@@ -1,10 +1,48 @@
-"""Event store: append-only domain events. Tenant-isolated."""
-import json
+"""Event store: append-only domain events. Tenant-isolated.
+
+Large content is not copied into payloads: events whose content lives in a read model (schema_version
+REFERENCE_SCHEMA_VERSION) carry the row id plus a content hash, and read_events() hydrates them.
+
+Handlers that emit several events can enqueue_event() instead of append_event(): events are buffered
+on the session (the request's unit of work) and written with one multi-row INSERT when it commits,
+or dropped with it on rollback.
+
+Event timestamps come from the database clock (clock_timestamp() at insert, increasing within a
+multi-row insert). A transaction still open can therefore hold an event older than committed ones;
+settled_horizon() bounds the events that can no longer be overtaken like that, for subscription
+delivery (event_subscriptions.py) and projection snapshots (projections.py).
+"""
+import hashlib
 from uuid import UUID, uuid4
-from datetime import datetime, timezone
+from datetime import datetime
 
-from sqlalchemy import text
+import orjson
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+REFERENCE_SCHEMA_VERSION = "2"
+
+_OUTBOX = "event_outbox"  # session.info key: [(tenant_id, event kwargs), ...]
+
+_INSERT_EVENTS = text("""
+    INSERT INTO domain_events
+    (tenant_id, event_id, timestamp, actor, entity_type, entity_id, event_type, payload, source, schema_version, confidence, model)
+    SELECT CAST(:tenant_id AS uuid), e.event_id, clock_timestamp(), e.actor, e.entity_type, e.entity_id, e.event_type,
+           CAST(e.payload AS jsonb), e.source, e.schema_version, e.confidence, e.model
+    FROM unnest(
+        CAST(:event_ids AS uuid[]), CAST(:actors AS text[]),
+        CAST(:entity_types AS text[]), CAST(:entity_ids AS text[]), CAST(:event_types AS text[]),
+        CAST(:payloads AS text[]), CAST(:sources AS text[]), CAST(:schema_versions AS text[]),
+        CAST(:confidences AS float8[]), CAST(:models AS text[])
+    ) WITH ORDINALITY AS e(event_id, actor, entity_type, entity_id, event_type, payload, source, schema_version, confidence, model, n)
+    ORDER BY e.n
+""")
+
+
+def dumps(obj) -> str:
+    """JSON-encode an event payload (orjson: several times faster than json.dumps on large payloads)."""
+    return orjson.dumps(obj).decode()
 
 
 async def append_event(
@@ -24,22 +62,20 @@ async def append_event(
 ) -> UUID:
     """Append immutable domain event. Returns event_id."""
     eid = event_id or uuid4()
-    now = datetime.now(timezone.utc)
     await session.execute(
         text("""
             INSERT INTO domain_events
             (tenant_id, event_id, timestamp, actor, entity_type, entity_id, event_type, payload, source, schema_version, confidence, model)
-            VALUES (:tenant_id, :event_id, :timestamp, :actor, :entity_type, :entity_id, :event_type, CAST(:payload AS jsonb), :source, :schema_version, :confidence, :model)
+            VALUES (:tenant_id, :event_id, clock_timestamp(), :actor, :entity_type, :entity_id, :event_type, CAST(:payload AS jsonb), :source, :schema_version, :confidence, :model)
         """),
         {
             "tenant_id": str(tenant_id),
             "event_id": str(eid),
-            "timestamp": now,
             "actor": actor,
             "entity_type": entity_type,
             "entity_id": entity_id,
             "event_type": event_type,
-            "payload": json.dumps(payload),
+            "payload": dumps(payload),
             "source": source,
             "schema_version": schema_version,
             "confidence": confidence,
@@ -47,3 +83,205 @@ async def append_event(
         },
     )
     return eid
+
+
+def _insert_params(tenant_id: UUID, events: list[dict]) -> dict:
+    """Column arrays for _INSERT_EVENTS. Each event must have event_id set."""
+    return {
+        "tenant_id": str(tenant_id),
+        "event_ids": [str(e["event_id"]) for e in events],
+        "actors": [e["actor"] for e in events],
+        "entity_types": [e["entity_type"] for e in events],
+        "entity_ids": [e["entity_id"] for e in events],
+        "event_types": [e["event_type"] for e in events],
+        "payloads": [dumps(e["payload"]) for e in events],
+        "sources": [e.get("source", "praxis-pilot-api") for e in events],
+        "schema_versions": [e.get("schema_version", "1") for e in events],
+        "confidences": [e.get("confidence") for e in events],
+        "models": [e.get("model") for e in events],
+    }
+
+
+async def append_events(session: AsyncSession, tenant_id: UUID, events: list[dict]) -> list[UUID]:
+    """
+    Append many immutable domain events with one INSERT. Each item takes append_event()'s keyword
+    arguments (actor, entity_type, entity_id, event_type, payload, ...). Returns event_ids in order.
+    """
+    if not events:
+        return []
+    events = [{**e, "event_id": e.get("event_id") or uuid4()} for e in events]
+    await session.execute(_INSERT_EVENTS, _insert_params(tenant_id, events))
+    return [e["event_id"] for e in events]
+
+
+def enqueue_event(session: AsyncSession, tenant_id: UUID, **event_kwargs) -> UUID:
+    """
+    Outbox variant of append_event() (same keyword arguments): buffer the event on the session;
+    it is written at commit together with all other buffered events. Returns event_id.
+    """
+    eid = event_kwargs.pop("event_id", None) or uuid4()
+    event_kwargs["event_id"] = eid
+    session.info.setdefault(_OUTBOX, []).append((tenant_id, event_kwargs))
+    return eid
+
+
+@event.listens_for(Session, "before_commit")
+def _flush_outbox(session: Session) -> None:
+    """Write buffered events in the committing transaction: one INSERT per tenant."""
+    outbox = session.info.pop(_OUTBOX, None)
+    if not outbox:
+        return
+    by_tenant: dict[UUID, list[dict]] = {}
+    for tenant_id, e in outbox:
+        by_tenant.setdefault(tenant_id, []).append(e)
+    for tenant_id, events in by_tenant.items():
+        session.execute(_INSERT_EVENTS, _insert_params(tenant_id, events))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_outbox(session: Session) -> None:
+    session.info.pop(_OUTBOX, None)
+
+
+def content_hash(content: str) -> str:
+    return "sha256:" + hashlib.sha256(content.encode()).hexdigest()
+
+
+def ai_response_created_payload(
+    response_id: UUID, raw_markdown: str, model: str, confidence: float, version: int
+) -> dict:
+    """Reference payload for ai_response.created; content stays in ai_responses."""
+    return {
+        "response_id": str(response_id),
+        "raw_markdown_sha256": content_hash(raw_markdown),
+        "model": model,
+        "confidence": confidence,
+        "version": version,
+    }
+
+
+def hydrate_ai_response_created(payload: dict, raw_markdown: str, structured_blocks: list) -> dict | None:
+    """
+    Full (schema 1) payload from a reference payload and its ai_responses row; None if the stored
+    markdown no longer matches the hash. structured_blocks are derived from raw_markdown and come
+    as currently stored (i.e. after any reprocessing).
+    """
+    if content_hash(raw_markdown) != payload.get("raw_markdown_sha256"):
+        return None
+    hydrated = {k: v for k, v in payload.items() if k != "raw_markdown_sha256"}
+    hydrated["raw_markdown"] = raw_markdown
+    hydrated["structured_blocks"] = structured_blocks
+    return hydrated
+
+
+async def _hydrate_ai_responses_created(session: AsyncSession, events: list[dict]) -> None:
+    r = await session.execute(
+        text("SELECT id, raw_markdown, structured_blocks FROM ai_responses WHERE id = ANY(CAST(:ids AS uuid[]))"),
+        {"ids": list({e["payload"]["response_id"] for e in events})},
+    )
+    rows = {str(row[0]): row for row in r.fetchall()}
+    for event in events:
+        row = rows.get(event["payload"]["response_id"])
+        hydrated = hydrate_ai_response_created(event["payload"], row[1], row[2]) if row else None
+        if hydrated is None:
+            event["content_missing"] = True
+        else:
+            event["payload"] = hydrated
+
+
+# event_type -> bulk hydrator for reference payloads
+_HYDRATORS = {
+    "ai_response.created": _hydrate_ai_responses_created,
+}
+
+
+async def settled_horizon(session: AsyncSession) -> datetime:
+    """
+    Exclusive upper timestamp bound of settled events: the database clock, or the start of the oldest
+    transaction that has written and not yet committed, whichever is earlier. No event committed
+    later can have a timestamp before it.
+    """
+    await session.execute(text("SELECT pg_stat_clear_snapshot()"))  # fresh pg_stat_activity
+    r = await session.execute(
+        text("""
+            SELECT LEAST(clock_timestamp(), (
+                SELECT min(xact_start) FROM pg_stat_activity
+                WHERE backend_xid IS NOT NULL AND datname = current_database() AND pid <> pg_backend_pid()
+            ))
+        """)
+    )
+    return r.scalar_one()
+
+
+async def read_events(
+    session: AsyncSession,
+    tenant_id: UUID,
+    *,
+    entity_type: str | None = None,
+    entity_id: str | None = None,
+    event_type: str | None = None,
+    after: datetime | None = None,
+    after_event_id: UUID | str | None = None,
+    before: datetime | None = None,
+    limit: int = 1000,
+    hydrate: bool = True,
+) -> list[dict]:
+    """
+    Read events in (timestamp, event_id) order (replay). after / after_event_id: keyset position of
+    the last event already seen (after alone: strictly later timestamps); before: exclusive upper
+    timestamp bound. Filters are only added when set, so timestamp bounds prune domain_events partitions.
+    hydrate=True resolves reference payloads to their full content (one query per event type);
+    events whose content is gone get content_missing=True.
+    """
+    where = ["tenant_id = :tenant_id"]
+    params: dict = {"tenant_id": str(tenant_id), "limit": limit}
+    for column, value in (("entity_type", entity_type), ("entity_id", entity_id), ("event_type", event_type)):
+        if value is not None:
+            where.append(f"{column} = :{column}")
+            params[column] = value
+    if after is not None:
+        params["after"] = after
+        if after_event_id is not None:
+            where.append("timestamp >= :after AND (timestamp, event_id) > (:after, CAST(:after_event_id AS uuid))")
+            params["after_event_id"] = str(after_event_id)
+        else:
+            where.append("timestamp > :after")
+    if before is not None:
+        where.append("timestamp < :before")
+        params["before"] = before
+    r = await session.execute(
+        text(f"""
+            SELECT event_id, timestamp, actor, entity_type, entity_id, event_type, payload, source,
+                   schema_version, confidence, model
+            FROM domain_events
+            WHERE {" AND ".join(where)}
+            ORDER BY timestamp, event_id
+            LIMIT :limit
+        """),
+        params,
+    )
+    events = [
+        {
+            "event_id": str(row[0]),
+            "timestamp": row[1].isoformat() if row[1] else "",
+            "actor": row[2],
+            "entity_type": row[3],
+            "entity_id": row[4],
+            "event_type": row[5],
+            "payload": row[6],
+            "source": row[7],
+            "schema_version": row[8],
+            "confidence": row[9],
+            "model": row[10],
+        }
+        for row in r.fetchall()
+    ]
+    if hydrate:
+        for event_type_, hydrator in _HYDRATORS.items():
+            refs = [
+                e for e in events
+                if e["event_type"] == event_type_ and e["schema_version"] == REFERENCE_SCHEMA_VERSION
+            ]
+            if refs:
+                await hydrator(session, refs)
+    return events
@@ -0,0 +1,217 @@
+"""Event subscriptions: cursor-based delivery of domain_events with LISTEN/NOTIFY wake-ups.
+
+A cursor is the (timestamp, event_id) of the last delivered event. Delivery is at-least-once:
+consumers acknowledge a cursor after handling the events before it (per-consumer checkpoint);
+anything after the checkpoint is delivered again after a crash.
+
+Events are only delivered up to a horizon (event_store.settled_horizon()): the database clock, or
+the start of the oldest transaction that has written and not yet committed, whichever is earlier. Event timestamps are
+taken from the database clock at insert, so an uncommitted event can never end up behind a
+cursor that was already handed out. A long-running write transaction delays delivery; it
+never causes events to be skipped.
+"""
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+import asyncpg
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import session_scope
+from app.services.event_store import read_events, settled_horizon
+
+log = structlog.get_logger()
+
+CHANNEL = "domain_events"
+_MAX_UUID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    timestamp: datetime
+    event_id: str
+
+    def encode(self) -> str:
+        return f"{self.timestamp.isoformat()}|{self.event_id}"
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """Raises ValueError on malformed cursors."""
+        ts, sep, event_id = value.partition("|")
+        if not sep:
+            raise ValueError("Invalid cursor")
+        timestamp = datetime.fromisoformat(ts)
+        if timestamp.tzinfo is None:
+            raise ValueError("Invalid cursor")
+        return cls(timestamp, str(UUID(event_id)))
+
+    @classmethod
+    def of(cls, event: dict) -> "Cursor":
+        return cls(datetime.fromisoformat(event["timestamp"]), event["event_id"])
+
+
+async def latest_cursor(session: AsyncSession) -> Cursor:
+    """Cursor that skips all events up to now (subscribe to new events only)."""
+    return Cursor(await settled_horizon(session), _MAX_UUID)
+
+
+async def fetch_events(
+    session: AsyncSession,
+    tenant_id: UUID,
+    cursor: Cursor | None,
+    *,
+    limit: int = 500,
+    event_types: list[str] | None = None,
+) -> tuple[list[dict], Cursor | None]:
+    """
+    Next events after cursor (None: from the oldest retained event), hydrated. Returns
+    (events, new cursor). With event_types the cursor still advances past skipped events.
+    """
+    horizon = await settled_horizon(session)
+    events = await read_events(
+        session,
+        tenant_id,
+        after=cursor.timestamp if cursor else None,
+        after_event_id=cursor.event_id if cursor else None,
+        before=horizon,
+        limit=limit,
+    )
+    if not events:
+        return [], cursor
+    next_cursor = Cursor.of(events[-1])
+    if event_types:
+        events = [e for e in events if e["event_type"] in event_types]
+    return events, next_cursor
+
+
+async def load_checkpoint(session: AsyncSession, consumer: str, tenant_id: UUID) -> Cursor | None:
+    r = await session.execute(
+        text("""
+            SELECT last_event_ts, last_event_id FROM event_consumer_checkpoints
+            WHERE consumer = :consumer AND tenant_id = :tenant_id
+        """),
+        {"consumer": consumer, "tenant_id": str(tenant_id)},
+    )
+    row = r.fetchone()
+    return Cursor(row[0], str(row[1])) if row else None
+
+
+async def ack(session: AsyncSession, consumer: str, tenant_id: UUID, cursor: Cursor) -> None:
+    """Store the consumer's checkpoint. Never moves backwards (late or duplicate acks are ignored)."""
+    await session.execute(
+        text("""
+            INSERT INTO event_consumer_checkpoints (consumer, tenant_id, last_event_ts, last_event_id, updated_at)
+            VALUES (:consumer, :tenant_id, :ts, CAST(:event_id AS uuid), now())
+            ON CONFLICT (consumer, tenant_id) DO UPDATE SET
+                last_event_ts = EXCLUDED.last_event_ts,
+                last_event_id = EXCLUDED.last_event_id,
+                updated_at = now()
+            WHERE (event_consumer_checkpoints.last_event_ts, event_consumer_checkpoints.last_event_id)
+                < (EXCLUDED.last_event_ts, EXCLUDED.last_event_id)
+        """),
+        {"consumer": consumer, "tenant_id": str(tenant_id), "ts": cursor.timestamp, "event_id": cursor.event_id},
+    )
+
+
+class EventNotifier:
+    """
+    One LISTEN connection per process; wakes the subscribers of a tenant on NOTIFY.
+    If the connection cannot be opened, subscribers just fall back to their poll interval.
+    """
+
+    def __init__(self, dsn: str):
+        self._dsn = dsn
+        self._conn: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._waiters: dict[str, set[asyncio.Event]] = {}
+
+    async def _connect(self) -> None:
+        async with self._lock:
+            if self._conn is not None and not self._conn.is_closed():
+                return
+            try:
+                self._conn = await asyncpg.connect(self._dsn)
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+            except (OSError, asyncpg.PostgresError) as e:
+                self._conn = None
+                log.warning("event_notifier_unavailable", error=type(e).__name__)
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        for event in self._waiters.get(payload, ()):
+            event.set()
+
+    @asynccontextmanager
+    async def listen(self, tenant_id: UUID) -> AsyncIterator[asyncio.Event]:
+        """Yields an asyncio.Event set on every new event of the tenant. Clear it before each fetch."""
+        await self._connect()
+        key = str(tenant_id)
+        woken = asyncio.Event()
+        self._waiters.setdefault(key, set()).add(woken)
+        try:
+            yield woken
+        finally:
+            self._waiters[key].discard(woken)
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    async def close(self) -> None:
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+
+notifier = EventNotifier(settings.database_url.replace("postgresql+asyncpg://", "postgresql://", 1))
+
+
+async def wait_for(woken: asyncio.Event, timeout: float) -> bool:
+    """Wait for a wake-up; False on timeout."""
+    try:
+        await asyncio.wait_for(woken.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def consume(
+    consumer: str,
+    tenant_id: UUID,
+    handler: Callable[[list[dict]], Awaitable[None]],
+    *,
+    event_types: list[str] | None = None,
+    batch_size: int = 500,
+    poll_interval: float = 1.0,
+    from_start: bool = False,
+    stop: asyncio.Event | None = None,
+) -> None:
+    """
+    In-process consumer: calls handler(events) for each batch, then checkpoints it. Runs until
+    stop is set. A handler error propagates; the batch is delivered again on the next run.
+    Without a checkpoint the consumer starts at new events (from_start: oldest retained event).
+    """
+    async with notifier.listen(tenant_id) as woken:
+        async with session_scope(tenant_id=tenant_id) as session:
+            cursor = await load_checkpoint(session, consumer, tenant_id)
+            if cursor is None and not from_start:
+                cursor = await latest_cursor(session)
+                await ack(session, consumer, tenant_id, cursor)
+        while not (stop and stop.is_set()):
+            woken.clear()
+            async with session_scope(tenant_id=tenant_id) as session:
+                events, next_cursor = await fetch_events(
+                    session, tenant_id, cursor, limit=batch_size, event_types=event_types
+                )
+            if next_cursor == cursor:
+                # Also re-polls on timeout: events held back by the horizon send no second NOTIFY
+                await wait_for(woken, poll_interval)
+                continue
+            if events:
+                await handler(events)
+            async with session_scope(tenant_id=tenant_id) as session:
+                await ack(session, consumer, tenant_id, next_cursor)
+            cursor = next_cursor
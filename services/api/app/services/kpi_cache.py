@@ -0,0 +1,259 @@
+"""KPI cache: per-day KPI slices; closed days are cached in-process, open ones computed live.
+
+Every /admin/kpis/* result except activity (app/services/activity_calendar.py) is folded from day
+slices (tokens, requests, chats, per assist mode and per model) of the requested range. A day is closed once it ended more than GRACE ago; its slice
+never changes after that and stays cached (LRU, settings.kpi_cache_max_entries). The partial
+first day of a range and the days not yet closed are always read from the database.
+
+Writes that still land in a closed day (a transaction that started before midnight, a deleted
+chat) bump the tenant's row in kpi_cache_generations (app/services/kpi_rollups.py). Each request
+reads that generation and drops the tenant's cached days when it changed, so all processes see
+the invalidation.
+"""
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.kpi_rollups import chats_created_source, range_params, usage_source
+
+GRACE = timedelta(minutes=15)  # longest write transaction assumed to straddle midnight
+_DAY = timedelta(days=1)
+_TICK = timedelta(microseconds=1)
+
+
+@dataclass
+class DaySlice:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    request_count: int = 0
+    chats_created: int = 0
+    assist_modes: dict[str | None, list[int]] = field(default_factory=dict)  # mode -> [requests, tokens]
+    models: dict[tuple[str | None, str | None], list[int]] = field(default_factory=dict)
+
+    def add_usage(
+        self,
+        assist_mode: str | None,
+        model_name: str | None,
+        model_version: str | None,
+        request_count: int,
+        input_tokens: int,
+        output_tokens: int,
+    ) -> None:
+        tokens = input_tokens + output_tokens
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.request_count += request_count
+        for totals in (
+            self.assist_modes.setdefault(assist_mode, [0, 0]),
+            self.models.setdefault((model_name, model_version), [0, 0]),
+        ):
+            totals[0] += request_count
+            totals[1] += tokens
+
+    def merge(self, other: "DaySlice") -> None:
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.request_count += other.request_count
+        self.chats_created += other.chats_created
+        for mine, theirs in ((self.assist_modes, other.assist_modes), (self.models, other.models)):
+            for key, (requests, tokens) in theirs.items():
+                totals = mine.setdefault(key, [0, 0])
+                totals[0] += requests
+                totals[1] += tokens
+
+
+def merge_slices(slices: Iterable[DaySlice]) -> DaySlice:
+    """New slice with the totals of slices (inputs are not modified; cached slices are shared)."""
+    total = DaySlice()
+    for day_slice in slices:
+        total.merge(day_slice)
+    return total
+
+
+def bucket_of(day: date, granularity: str) -> date:
+    """First day of the day/week (ISO, Monday)/month/year bucket, as date_trunc."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def bucket_slices(slices: dict[date, DaySlice], granularity: str) -> list[tuple[date, DaySlice]]:
+    """Day slices merged into granularity buckets, ordered by bucket start."""
+    buckets: dict[date, list[DaySlice]] = {}
+    for day, day_slice in slices.items():
+        buckets.setdefault(bucket_of(day, granularity), []).append(day_slice)
+    return [(bucket, merge_slices(parts)) for bucket, parts in sorted(buckets.items())]
+
+
+class KPICache:
+    """LRU of closed day slices per (tenant, user or None for tenant scope, day). Process-local."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str | None, date], DaySlice] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def sync_generation(self, tenant_id: UUID, generation: int) -> None:
+        key = str(tenant_id)
+        if self._generations.get(key, generation) != generation:
+            self.invalidate(tenant_id)
+        self._generations[key] = generation
+
+    def invalidate(self, tenant_id: UUID) -> None:
+        key = str(tenant_id)
+        for entry in [k for k in self._entries if k[0] == key]:
+            del self._entries[entry]
+        self.invalidations += 1
+
+    def get(self, tenant_id: UUID, user_id: str | None, day: date) -> DaySlice | None:
+        key = (str(tenant_id), user_id, day)
+        found = self._entries.get(key)
+        if found is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return found
+
+    def put(self, tenant_id: UUID, user_id: str | None, day: date, day_slice: DaySlice) -> None:
+        self._entries[(str(tenant_id), user_id, day)] = day_slice
+        self._entries.move_to_end((str(tenant_id), user_id, day))
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self._max_entries,
+            "invalidations": self.invalidations,
+        }
+
+
+cache = KPICache(settings.kpi_cache_max_entries)
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time())
+
+
+def cached_days(from_ts: datetime, to_ts: datetime, now: datetime) -> tuple[date, date] | None:
+    """First and last day that lie entirely in [from_ts, to_ts] and are closed at now; None if none."""
+    first = from_ts.date() if from_ts == _midnight(from_ts.date()) else from_ts.date() + _DAY
+    last = min(to_ts.date(), (now - GRACE).date()) - _DAY
+    return (first, last) if first <= last else None
+
+
+async def load_generation(session: AsyncSession, tenant_id: UUID) -> int:
+    r = await session.execute(
+        text("SELECT generation FROM kpi_cache_generations WHERE tenant_id = :tenant_id"),
+        {"tenant_id": str(tenant_id)},
+    )
+    return r.scalar() or 0
+
+
+async def _query_slices(
+    session: AsyncSession, tenant_id: UUID, user_id: str | None, from_ts: datetime, to_ts: datetime
+) -> dict[date, DaySlice]:
+    """Day slices for [from_ts, to_ts] straight from the rollups (+ raw edge hours)."""
+    params = {"tenant_id": str(tenant_id), **range_params(from_ts, to_ts)}
+    user_filter = owner_filter = ""
+    if user_id:
+        params["user_id"] = params["owner_user_id"] = user_id
+        user_filter, owner_filter = "AND user_id = :user_id", "AND owner_user_id = :owner_user_id"
+    slices: dict[date, DaySlice] = {}
+    usage = await session.execute(
+        text(f"""
+            SELECT date_trunc('day', ts)::date, assist_mode, model_name, model_version,
+                   SUM(request_count), SUM(input_tokens), SUM(output_tokens)
+            FROM {usage_source(user_filter)} u
+            GROUP BY 1, 2, 3, 4
+        """),
+        params,
+    )
+    for day, assist_mode, model_name, model_version, requests, input_tok, output_tok in usage.fetchall():
+        slices.setdefault(day, DaySlice()).add_usage(
+            assist_mode, model_name, model_version, int(requests), int(input_tok or 0), int(output_tok or 0)
+        )
+    chats = await session.execute(
+        text(f"""
+            SELECT date_trunc('day', created_at)::date, SUM(chats_created)
+            FROM {chats_created_source(owner_filter)} c
+            GROUP BY 1
+        """),
+        params,
+    )
+    for day, created in chats.fetchall():
+        slices.setdefault(day, DaySlice()).chats_created += int(created or 0)
+    return slices
+
+
+async def day_slices(
+    session: AsyncSession,
+    tenant_id: UUID,
+    user_id: str | None,
+    from_ts: datetime,
+    to_ts: datetime,
+    *,
+    now: datetime | None = None,
+) -> dict[date, DaySlice]:
+    """
+    Day slices covering [from_ts, to_ts] (naive UTC), user_id None = whole tenant. Closed days come
+    from the cache (missing ones are loaded with one query and cached); the rest is read live.
+    Days without usage or chats are absent.
+    """
+    now = now or datetime.utcnow()
+    cache.sync_generation(tenant_id, await load_generation(session, tenant_id))
+    closed = cached_days(from_ts, to_ts, now)
+    if closed is None:
+        return await _query_slices(session, tenant_id, user_id, from_ts, to_ts)
+
+    first, last = closed
+    result: dict[date, DaySlice] = {}
+    missing: list[date] = []
+    day = first
+    while day <= last:
+        found = cache.get(tenant_id, user_id, day)
+        if found is None:
+            missing.append(day)
+        elif found.request_count or found.chats_created:
+            result[day] = found
+        day += _DAY
+    if missing:
+        loaded = await _query_slices(
+            session, tenant_id, user_id, _midnight(missing[0]), _midnight(missing[-1] + _DAY) - _TICK
+        )
+        for day in missing:
+            day_slice = loaded.get(day, DaySlice())
+            cache.put(tenant_id, user_id, day, day_slice)
+            if day in loaded:
+                result[day] = day_slice
+
+    live = []
+    if from_ts < _midnight(first):
+        live.append((from_ts, _midnight(first) - _TICK))
+    live.append((_midnight(last + _DAY), to_ts))
+    for span_from, span_to in live:
+        for day, day_slice in (await _query_slices(session, tenant_id, user_id, span_from, span_to)).items():
+            result.setdefault(day, DaySlice()).merge(day_slice)
+    return result
@@ -0,0 +1,171 @@
+"""Hourly KPI rollups: usage_hourly and chats_created_hourly, maintained on write.
+
+Writers go through record_usage / record_chat_created / record_chat_deleted, which update the
+raw row and its hourly rollup in the same transaction (record_usage also the per-user activity
+calendar, app/services/activity_calendar.py). KPI queries read whole hours from the
+rollups and only the partial first and last hour of a range from the raw tables, so results are
+exact and cost O(hours in range) instead of O(rows in range).
+
+A write whose timestamp falls on an earlier day than the database clock (a transaction that
+started before midnight, a deleted chat) also bumps kpi_cache_generations, which invalidates the
+tenant's cached closed days (app/services/kpi_cache.py).
+"""
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import activity_calendar
+
+HOUR = timedelta(hours=1)
+
+
+def _bump_generation(source: str) -> str:
+    """SQL: bump the tenant's KPI cache generation for source rows (tenant_id, ts) on an earlier day than the DB clock."""
+    return f"""
+        INSERT INTO kpi_cache_generations (tenant_id, generation, updated_at)
+        SELECT tenant_id, 1, now() FROM {source}
+        WHERE date_trunc('day', ts) < date_trunc('day', clock_timestamp())
+        ON CONFLICT (tenant_id) DO UPDATE SET
+            generation = kpi_cache_generations.generation + 1,
+            updated_at = now()
+    """
+
+
+_CHAT_BUMP = _bump_generation("(SELECT CAST(:tenant_id AS uuid) AS tenant_id, CAST(:created_at AS timestamptz) AS ts) c")
+
+
+def floor_hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(ts: datetime) -> datetime:
+    floored = floor_hour(ts)
+    return floored if floored == ts else floored + HOUR
+
+
+def hour_bounds(from_ts: datetime, to_ts: datetime) -> tuple[datetime, datetime]:
+    """
+    Whole hours [from_hour, to_hour) inside [from_ts, to_ts] that the rollups answer; the rest of
+    the range is read raw. Ranges shorter than an hour get an empty rollup span.
+    """
+    from_hour, to_hour = ceil_hour(from_ts), floor_hour(to_ts)
+    if to_hour < from_hour:
+        to_hour = from_hour
+    return from_hour, to_hour
+
+
+def range_params(from_ts: datetime, to_ts: datetime) -> dict:
+    from_hour, to_hour = hour_bounds(from_ts, to_ts)
+    return {"from_ts": from_ts, "to_ts": to_ts, "from_hour": from_hour, "to_hour": to_hour}
+
+
+def usage_source(user_filter: str = "") -> str:
+    """
+    SQL subquery with usage_records columns (ts, user_id, assist_mode, model_name, model_version,
+    request_count, input_tokens, output_tokens) over [:from_ts, :to_ts], one row per rollup hour
+    plus the raw edge rows. Needs range_params() and :tenant_id; user_filter filters user_id.
+    """
+    return f"""(
+        SELECT hour AS ts, user_id, NULLIF(assist_mode, '') AS assist_mode, model_name,
+               NULLIF(model_version, '') AS model_version, request_count, input_tokens, output_tokens
+        FROM usage_hourly
+        WHERE tenant_id = :tenant_id AND hour >= :from_hour AND hour < :to_hour {user_filter}
+        UNION ALL
+        SELECT ts, user_id, assist_mode, model_name, model_version, 1, input_tokens, output_tokens
+        FROM usage_records
+        WHERE tenant_id = :tenant_id AND ts >= :from_ts AND ts <= :to_ts
+          AND (ts < :from_hour OR ts >= :to_hour) {user_filter}
+    )"""
+
+
+def chats_created_source(owner_filter: str = "") -> str:
+    """SQL subquery (created_at, owner_user_id, chats_created) over [:from_ts, :to_ts]; see usage_source."""
+    return f"""(
+        SELECT hour AS created_at, owner_user_id, chats_created
+        FROM chats_created_hourly
+        WHERE tenant_id = :tenant_id AND hour >= :from_hour AND hour < :to_hour {owner_filter}
+        UNION ALL
+        SELECT created_at, owner_user_id, 1
+        FROM chats
+        WHERE tenant_id = :tenant_id AND created_at >= :from_ts AND created_at <= :to_ts
+          AND (created_at < :from_hour OR created_at >= :to_hour) {owner_filter}
+    )"""
+
+
+async def record_usage(
+    session: AsyncSession,
+    tenant_id: UUID,
+    user_id: str,
+    *,
+    assist_mode: str | None,
+    model_name: str,
+    model_version: str | None,
+    input_tokens: int,
+    output_tokens: int,
+) -> None:
+    """
+    Insert a usage_records row, add it to its usage_hourly bucket and the user's activity day, and bump
+    the cache generation if late (one statement).
+    """
+    await session.execute(
+        text(f"""
+            WITH rec AS (
+                INSERT INTO usage_records
+                (tenant_id, user_id, assist_mode, model_name, model_version, input_tokens, output_tokens)
+                VALUES (:tenant_id, :user_id, :assist_mode, :model_name, :model_version,
+                        :input_tokens, :output_tokens)
+                RETURNING tenant_id, user_id, ts, assist_mode, model_name, model_version, input_tokens, output_tokens
+            ),
+            bump AS ({_bump_generation("rec")}),
+            activity AS ({activity_calendar.UPSERT_FROM_REC})
+            INSERT INTO usage_hourly
+            (tenant_id, hour, user_id, assist_mode, model_name, model_version,
+             request_count, input_tokens, output_tokens)
+            SELECT tenant_id, date_trunc('hour', ts), user_id, COALESCE(assist_mode, ''), model_name,
+                   COALESCE(model_version, ''), 1, input_tokens, output_tokens
+            FROM rec
+            ON CONFLICT (tenant_id, hour, user_id, assist_mode, model_name, model_version) DO UPDATE SET
+                request_count = usage_hourly.request_count + 1,
+                input_tokens = usage_hourly.input_tokens + EXCLUDED.input_tokens,
+                output_tokens = usage_hourly.output_tokens + EXCLUDED.output_tokens
+        """),
+        {
+            "tenant_id": str(tenant_id),
+            "user_id": user_id,
+            "assist_mode": assist_mode,
+            "model_name": model_name,
+            "model_version": model_version,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+        },
+    )
+
+
+async def record_chat_created(session: AsyncSession, tenant_id: UUID, owner_user_id: UUID, created_at: datetime) -> None:
+    params = {"tenant_id": str(tenant_id), "owner_user_id": str(owner_user_id), "created_at": created_at}
+    await session.execute(
+        text("""
+            INSERT INTO chats_created_hourly (tenant_id, hour, owner_user_id, chats_created)
+            VALUES (:tenant_id, date_trunc('hour', CAST(:created_at AS timestamptz)), :owner_user_id, 1)
+            ON CONFLICT (tenant_id, hour, owner_user_id) DO UPDATE SET
+                chats_created = chats_created_hourly.chats_created + 1
+        """),
+        params,
+    )
+    await session.execute(text(_CHAT_BUMP), params)
+
+
+async def record_chat_deleted(session: AsyncSession, tenant_id: UUID, owner_user_id: UUID, created_at: datetime) -> None:
+    """Deleted chats no longer count as created (same as counting the chats table)."""
+    params = {"tenant_id": str(tenant_id), "owner_user_id": str(owner_user_id), "created_at": created_at}
+    await session.execute(
+        text("""
+            UPDATE chats_created_hourly SET chats_created = chats_created - 1
+            WHERE tenant_id = :tenant_id AND owner_user_id = :owner_user_id
+              AND hour = date_trunc('hour', CAST(:created_at AS timestamptz))
+        """),
+        params,
+    )
+    await session.execute(text(_CHAT_BUMP), params)
@@ -1,4 +1,8 @@
-"""Markdown sanitizer. Strips dangerous content; allows safe markdown only."""
+"""Markdown sanitizer. Strips dangerous content; allows safe markdown only.
+
+Attributes and tags are removed in one tokenizer pass; detection uses plain forward searches.
+No pattern can fail after scanning far ahead, so the sanitizer is O(n) even on adversarial input.
+"""
 import re
 from typing import NamedTuple
 
@@ -11,15 +15,35 @@ class SanitizeResult(NamedTuple):
     reason: str | None
 
 
-# Patterns to strip (dangerous)
-SCRIPT_PATTERN = re.compile(r"<script[^>]*>.*?</script>", re.DOTALL | re.IGNORECASE)
-IFRAME_PATTERN = re.compile(r"<iframe[^>]*>.*?</iframe>", re.DOTALL | re.IGNORECASE)
-STYLE_ATTR_PATTERN = re.compile(r'\s+style\s*=\s*["\'][^"\']*["\']', re.IGNORECASE)
-ONEVENT_PATTERN = re.compile(r"\s+on\w+\s*=\s*['\"][^'\"]*['\"]", re.IGNORECASE)
+# Block detection (reject the whole document)
+SCRIPT_OPEN = re.compile(r"<script", re.IGNORECASE)
+SCRIPT_CLOSE = re.compile(r"</script>", re.IGNORECASE)
+IFRAME_OPEN = re.compile(r"<iframe", re.IGNORECASE)
+IFRAME_CLOSE = re.compile(r"</iframe>", re.IGNORECASE)
 JAVASCRIPT_URI = re.compile(r"javascript:", re.IGNORECASE)
 DATA_URI_SCRIPT = re.compile(r"data:\s*text/html", re.IGNORECASE)
-# Strip any remaining raw HTML tags (leave markdown symbols)
-HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# style / on* attribute, matched only from the start of a whitespace run (keeps it linear)
+_ATTR_SOURCE = r"\s(?<!\s\s)\s*(?:style|on\w+)\s*=\s*[\"'][^\"']*[\"']"
+_ATTR = re.compile(_ATTR_SOURCE, re.IGNORECASE)
+_ATTR_HINT = re.compile(r"=\s*[\"']")
+# Raw HTML tag: <[^>]+> as seen after attribute removal (a quoted style/on* value may contain '>').
+# A '<' without a later '>' would make every tag attempt rescan to the end; in that case the text
+# is scanned with a sentinel '>' appended, so a tag attempt never fails and is never retried.
+_TAG = re.compile(r"<[^>]+>")
+_TOKEN = re.compile(
+    rf"(?P<attr>{_ATTR_SOURCE})|<(?>{_ATTR_SOURCE}|[^>\s]+|\s)+>",
+    re.IGNORECASE,
+)
+
+
+def _has_block(text: str, opener: re.Pattern[str], closer: re.Pattern[str]) -> bool:
+    """Linear equivalent of <tag[^>]*>.*?</tag> (DOTALL) search: first opener, its '>', any closer after."""
+    m = opener.search(text)
+    if not m:
+        return False
+    gt = text.find(">", m.end())
+    return gt != -1 and closer.search(text, gt + 1) is not None
 
 
 def sanitize_markdown(raw: str) -> SanitizeResult:
@@ -30,35 +54,44 @@ def sanitize_markdown(raw: str) -> SanitizeResult:
     if not isinstance(raw, str):
         return SanitizeResult("", True, "Input must be string")
 
-    text = raw
-
-    # 1. Remove script blocks
-    if SCRIPT_PATTERN.search(text):
+    # 1-2. Script / iframe blocks
+    if _has_block(raw, SCRIPT_OPEN, SCRIPT_CLOSE):
         return SanitizeResult("", True, "Script tag detected")
-    text = SCRIPT_PATTERN.sub("", text)
-
-    # 2. Remove iframes
-    if IFRAME_PATTERN.search(text):
+    if _has_block(raw, IFRAME_OPEN, IFRAME_CLOSE):
         return SanitizeResult("", True, "Iframe detected")
-    text = IFRAME_PATTERN.sub("", text)
 
-    # 3. Remove style attributes
-    text = STYLE_ATTR_PATTERN.sub("", text)
-
-    # 4. Remove on* event handlers
-    text = ONEVENT_PATTERN.sub("", text)
-
-    # 5. Remove javascript: URIs
-    if JAVASCRIPT_URI.search(text):
+    # 3-7. One pass: drop style/on* attributes and raw HTML tags
+    scanner = _TOKEN if _ATTR_HINT.search(raw) else _TAG  # no quoted attribute value: tags only
+    dropped: list[str] = []
+    if raw.find("<", raw.rfind(">") + 1) == -1 and not (
+        JAVASCRIPT_URI.search(raw) or DATA_URI_SCRIPT.search(raw)
+    ):
+        # Common case: every '<' has a later '>' and no stripped tag can hold a dangerous URI
+        text = scanner.sub("", raw)
+    else:
+        end = len(raw) + 1
+        tail: list[str] = []
+
+        def strip(match: re.Match[str]) -> str:
+            if match.lastgroup == "attr":
+                return ""
+            if match.end() == end:  # reached the sentinel: no closing '>', so not a tag
+                tail.append(_ATTR.sub("", match.group()[:-1]))
+            else:
+                dropped.append(match.group())
+            return ""
+
+        text = scanner.sub(strip, raw + ">")
+        text = text + tail[0] if tail else text[:-1]
+
+    # Dangerous URIs: in the stripped tags (minus their style/on* attributes) or in the
+    # remaining text (also catches payloads split by stripped tags)
+    tags = _ATTR.sub("", "\n".join(dropped))
+    js_uri = JAVASCRIPT_URI.search(tags) or JAVASCRIPT_URI.search(text)
+    data_uri = DATA_URI_SCRIPT.search(tags) or DATA_URI_SCRIPT.search(text)
+    if js_uri:
         return SanitizeResult("", True, "javascript: URI detected")
-    text = JAVASCRIPT_URI.sub("", text)
-
-    # 6. Remove data:text/html
-    if DATA_URI_SCRIPT.search(text):
+    if data_uri:
         return SanitizeResult("", True, "data: text/html URI detected")
-    text = DATA_URI_SCRIPT.sub("", text)
-
-    # 7. Strip remaining raw HTML (keep content between tags for simple cases)
-    text = HTML_TAG_PATTERN.sub("", text)
 
     return SanitizeResult(text.strip(), False, None)
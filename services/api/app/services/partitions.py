@@ -0,0 +1,142 @@
+"""Monthly range partitions: create ahead, detach (archive) past retention.
+
+Partitioned tables are split into <table>_yYYYYmMM covering [first of month, first of next month)
+plus <table>_default as a safety net. Tables converted in place (migration 022) also keep their
+pre-partitioning heap as <table>_legacy, attached as [MINVALUE, first monthly partition); it is
+detached as a whole once its newest month is past retention.
+Detached partitions are renamed archive_<name> and stay in the database as plain tables until
+exported and dropped (or are dropped right away with drop=True).
+"""
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    column: str  # partition key (timestamptz)
+
+
+PARTITIONED_TABLES = {
+    t.name: t
+    for t in (
+        PartitionedTable("domain_events", "timestamp"),
+        PartitionedTable("usage_records", "ts"),
+        PartitionedTable("audit_logs", "ts"),
+        PartitionedTable("llm_audit_logs", "timestamp"),
+    )
+}
+
+
+def add_months(month: date, n: int) -> date:
+    y, m = divmod(month.month - 1 + n, 12)
+    return date(month.year + y, m + 1, 1)
+
+
+def partition_name(parent: str, month: date) -> str:
+    return f"{parent}_y{month.year}m{month.month:02d}"
+
+
+def default_partition(parent: str) -> str:
+    return f"{parent}_default"
+
+
+def legacy_partition(parent: str) -> str:
+    return f"{parent}_legacy"
+
+
+def partition_month(parent: str, name: str) -> date | None:
+    m = re.match(rf"^{re.escape(parent)}_y(\d{{4}})m(\d{{2}})$", name)
+    return date(int(m.group(1)), int(m.group(2)), 1) if m else None
+
+
+def months_to_create(existing: list[date], today: date, months_ahead: int, *, legacy: bool = False) -> list[date]:
+    """
+    Missing months from the current one through months_ahead months later. With a legacy partition,
+    months before the first monthly partition are covered by it and never created.
+    """
+    this_month = today.replace(day=1)
+    wanted = [add_months(this_month, i) for i in range(months_ahead + 1)]
+    if legacy and existing:
+        wanted = [m for m in wanted if m >= min(existing)]
+    return [m for m in wanted if m not in set(existing)]
+
+
+def expired_months(existing: list[date], today: date, retain_months: int) -> list[date]:
+    """Months entirely older than the retention window (retain_months <= 0: keep everything)."""
+    if retain_months <= 0:
+        return []
+    cutoff = add_months(today.replace(day=1), -retain_months)
+    return sorted(m for m in existing if m < cutoff)
+
+
+def legacy_expired(existing: list[date], today: date, retain_months: int) -> bool:
+    """The legacy partition ends where the first monthly partition starts; expired once that is past retention."""
+    if retain_months <= 0 or not existing:
+        return False
+    return min(existing) <= add_months(today.replace(day=1), -retain_months)
+
+
+async def _partition_names(conn: AsyncConnection, parent: str) -> list[str]:
+    r = await conn.execute(
+        text("""
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+        """),
+        {"parent": parent},
+    )
+    return [name for (name,) in r.fetchall()]
+
+
+async def list_partitions(conn: AsyncConnection, parent: str) -> tuple[list[date], bool]:
+    """(months with a monthly partition, whether a legacy partition is attached)."""
+    names = await _partition_names(conn, parent)
+    months = sorted(m for name in names if (m := partition_month(parent, name)))
+    return months, legacy_partition(parent) in names
+
+
+async def create_partition(conn: AsyncConnection, parent: str, month: date) -> None:
+    """
+    Create the month's partition. Rows that already landed in the default partition for that range
+    are moved into it first (ATTACH would fail otherwise).
+    """
+    column = PARTITIONED_TABLES[parent].column
+    name, start, end = partition_name(parent, month), month.isoformat(), add_months(month, 1).isoformat()
+    bounds = {"start": start, "end": end}
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    await conn.execute(
+        text(f"""
+            WITH moved AS (
+                DELETE FROM {default_partition(parent)}
+                WHERE {column} >= CAST(:start AS timestamptz) AND {column} < CAST(:end AS timestamptz)
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """),
+        bounds,
+    )
+    await conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+
+
+async def ensure_partitions(conn: AsyncConnection, parent: str, today: date, months_ahead: int = 3) -> list[str]:
+    """Create missing partitions from this month through months_ahead. Returns created names."""
+    existing, legacy = await list_partitions(conn, parent)
+    created = []
+    for month in months_to_create(existing, today, months_ahead, legacy=legacy):
+        await create_partition(conn, parent, month)
+        created.append(partition_name(parent, month))
+    return created
+
+
+async def detach_partition(conn: AsyncConnection, parent: str, name: str, *, drop: bool = False) -> str:
+    """Detach one partition; keep it as archive_<name> (or drop it). Returns the resulting table name."""
+    await conn.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {name}"))
+    if drop:
+        await conn.execute(text(f"DROP TABLE {name}"))
+        return name
+    await conn.execute(text(f"ALTER TABLE {name} RENAME TO archive_{name}"))
+    return f"archive_{name}"
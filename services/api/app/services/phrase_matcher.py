@@ -0,0 +1,76 @@
+"""Multi-phrase matcher (Aho–Corasick over words). Per-text cost is independent of the number of phrases."""
+import re
+from collections import deque
+from collections.abc import Iterable
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_words(text: str) -> list[str]:
+    """Case-fold, transliterate umlauts, treat punctuation and any whitespace as word separators."""
+    return _NON_WORD.sub(" ", text.casefold().translate(_UMLAUTS)).split()
+
+
+def expand_template(template: str) -> list[str]:
+    """Expand optional words: 'show [me] [the] system prompt' -> all 4 variants."""
+    variants = [[]]
+    for word in template.split():
+        if word.startswith("[") and word.endswith("]"):
+            variants = [v + opt for v in variants for opt in ([], [word[1:-1]])]
+        else:
+            variants = [v + [word] for v in variants]
+    return [" ".join(v) for v in variants]
+
+
+class PhraseMatcher:
+    """Compiled automaton over normalized word sequences. Build once, reuse for every message."""
+
+    def __init__(self, phrases: Iterable[str]):
+        goto: list[dict[str, int]] = [{}]
+        terminal: list[bool] = [False]
+        count = 0
+        for phrase in phrases:
+            words = normalize_words(phrase)
+            if not words:
+                continue
+            state = 0
+            for word in words:
+                nxt = goto[state].get(word)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][word] = nxt
+                    goto.append({})
+                    terminal.append(False)
+                state = nxt
+            terminal[state] = True
+            count += 1
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and word not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(word, 0)
+                terminal[nxt] = terminal[nxt] or terminal[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._terminal = terminal
+        self.phrase_count = count
+
+    def search(self, text: str) -> bool:
+        """True if any phrase occurs in text as a contiguous word sequence."""
+        goto, fail, terminal = self._goto, self._fail, self._terminal
+        state = 0
+        for word in normalize_words(text):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if terminal[state]:
+                return True
+        return False
@@ -0,0 +1,181 @@
+"""Projections: entity state rebuilt from domain_events, with periodic snapshots.
+
+project() loads the entity's snapshot (entity_snapshots) and replays only the events after it,
+in (timestamp, event_id) order; a new snapshot is written once the replayed tail is long enough.
+Snapshots only advance over settled events (event_store.settled_horizon()): an event of a
+transaction still open may commit later with an older timestamp and must not end up behind the
+snapshot. Events past the horizon are replayed into the returned state only.
+Apply functions are pure: (state, event) -> new state.
+"""
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.event_store import read_events, settled_horizon
+
+SNAPSHOT_EVERY = 50  # replayed tail length that triggers a new snapshot
+_PAGE = 1000
+
+
+@dataclass(frozen=True)
+class Projection:
+    name: str
+    entity_type: str
+    initial: Callable[[str], dict]
+    apply: Callable[[dict, dict], dict]
+
+
+def _apply_chat(state: dict, event: dict) -> dict:
+    payload = event["payload"]
+    if event["event_type"] == "chat.folder_changed":
+        return {**state, "folder_id": payload.get("new_folder_id")}
+    if event["event_type"] == "chat.finalized":
+        return {**state, "status": "finalized", "finalized_at": event["timestamp"]}
+    return state
+
+
+def _apply_structured_document(state: dict, event: dict) -> dict:
+    payload = event["payload"]
+    kind = event["event_type"].removeprefix("structured_document.")
+    if kind in ("created", "updated", "versioned", "generated"):
+        state = {
+            **state,
+            "conversation_id": payload.get("conversation_id", state["conversation_id"]),
+            "version": max(state["version"], payload.get("version", 0)),
+        }
+        if kind == "generated":
+            state["generated_count"] += 1
+    return state
+
+
+CHAT = Projection(
+    name="chat",
+    entity_type="chat",
+    initial=lambda entity_id: {"chat_id": entity_id, "folder_id": None, "status": "active", "finalized_at": None},
+    apply=_apply_chat,
+)
+STRUCTURED_DOCUMENT = Projection(
+    name="structured_document",
+    entity_type="structured_document",
+    initial=lambda entity_id: {"document_id": entity_id, "conversation_id": None, "version": 0, "generated_count": 0},
+    apply=_apply_structured_document,
+)
+PROJECTIONS = {p.name: p for p in (CHAT, STRUCTURED_DOCUMENT)}
+
+
+def replay(projection: Projection, state: dict, events: list[dict]) -> dict:
+    for event in events:
+        state = projection.apply(state, event)
+    return state
+
+
+async def _load_snapshot(
+    session: AsyncSession, tenant_id: UUID, projection: Projection, entity_id: str
+) -> tuple[dict, datetime | None, str | None, int]:
+    r = await session.execute(
+        text("""
+            SELECT state, last_event_ts, last_event_id, event_count FROM entity_snapshots
+            WHERE tenant_id = :tenant_id AND projection = :projection AND entity_id = :entity_id
+        """),
+        {"tenant_id": str(tenant_id), "projection": projection.name, "entity_id": entity_id},
+    )
+    row = r.fetchone()
+    if not row:
+        return projection.initial(entity_id), None, None, 0
+    return dict(row[0]), row[1], str(row[2]), row[3]
+
+
+async def _save_snapshot(
+    session: AsyncSession,
+    tenant_id: UUID,
+    projection: Projection,
+    entity_id: str,
+    state: dict,
+    last_event_ts: datetime,
+    last_event_id: str,
+    event_count: int,
+) -> None:
+    await session.execute(
+        text("""
+            INSERT INTO entity_snapshots
+            (tenant_id, projection, entity_id, state, last_event_ts, last_event_id, event_count, updated_at)
+            VALUES (:tenant_id, :projection, :entity_id, CAST(:state AS jsonb), :last_event_ts,
+                    CAST(:last_event_id AS uuid), :event_count, now())
+            ON CONFLICT (tenant_id, projection, entity_id) DO UPDATE SET
+                state = EXCLUDED.state,
+                last_event_ts = EXCLUDED.last_event_ts,
+                last_event_id = EXCLUDED.last_event_id,
+                event_count = EXCLUDED.event_count,
+                updated_at = now()
+        """),
+        {
+            "tenant_id": str(tenant_id),
+            "projection": projection.name,
+            "entity_id": entity_id,
+            "state": json.dumps(state),
+            "last_event_ts": last_event_ts,
+            "last_event_id": last_event_id,
+            "event_count": event_count,
+        },
+    )
+
+
+async def _replay_events(
+    session: AsyncSession,
+    tenant_id: UUID,
+    projection: Projection,
+    entity_id: str,
+    state: dict,
+    after: datetime | None,
+    after_id: str | None,
+    before: datetime | None = None,
+) -> tuple[dict, datetime | None, str | None, int]:
+    """Replay the entity's events after (after, after_id) and before `before`. Returns (state, last ts, last id, count)."""
+    count = 0
+    while True:
+        events = await read_events(
+            session,
+            tenant_id,
+            entity_type=projection.entity_type,
+            entity_id=entity_id,
+            after=after,
+            after_event_id=after_id,
+            before=before,
+            limit=_PAGE,
+            hydrate=False,
+        )
+        state = replay(projection, state, events)
+        count += len(events)
+        if events:
+            after, after_id = datetime.fromisoformat(events[-1]["timestamp"]), events[-1]["event_id"]
+        if len(events) < _PAGE:
+            return state, after, after_id, count
+
+
+async def project(
+    session: AsyncSession,
+    tenant_id: UUID,
+    projection: Projection,
+    entity_id: str,
+    *,
+    snapshot_every: int = SNAPSHOT_EVERY,
+) -> dict:
+    """
+    Current state of one entity: snapshot + events after it. Writes a new snapshot when at least
+    snapshot_every settled events were replayed (snapshot_every=1: always, e.g. before detaching partitions).
+    """
+    state, after, after_id, count = await _load_snapshot(session, tenant_id, projection, entity_id)
+    horizon = await settled_horizon(session)
+    state, after, after_id, tail = await _replay_events(
+        session, tenant_id, projection, entity_id, state, after, after_id, before=horizon
+    )
+    if tail and tail >= snapshot_every:
+        await _save_snapshot(session, tenant_id, projection, entity_id, state, after, after_id, count + tail)
+    # Unsettled events: part of the current state, never of the snapshot
+    state, *_ = await _replay_events(session, tenant_id, projection, entity_id, state, after, after_id)
+    return state
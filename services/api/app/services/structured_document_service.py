@@ -6,7 +6,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.azure_openai import chat_completion
-from app.services.event_store import append_event
+from app.services.event_store import enqueue_event
 from app.services.prompt_injection import security_header
 
 # Schema for structured session document content (EPIC 14)
@@ -171,7 +171,7 @@ async def create_or_update(
             """),
             {"content": json.dumps(content), "version": new_version, "id": str(doc_id)},
         )
-        await append_event(
+        enqueue_event(
             session,
             tenant_id,
             actor=actor,
@@ -184,7 +184,7 @@ async def create_or_update(
                 "version": new_version,
             },
         )
-        await append_event(
+        enqueue_event(
             session,
             tenant_id,
             actor=actor,
@@ -224,7 +224,7 @@ async def create_or_update(
                 "content": json.dumps(content),
             },
         )
-        await append_event(
+        enqueue_event(
             session,
             tenant_id,
             actor=actor,
@@ -270,7 +270,7 @@ async def generate_from_conversation(
             JOIN chats c ON c.id = cm.chat_id AND c.tenant_id = cm.tenant_id
             WHERE cm.chat_id = :cid AND c.tenant_id = :tid AND c.owner_user_id = :oid
             AND cm.role != 'system'
-            ORDER BY cm.created_at ASC, cm.id ASC
+            ORDER BY cm.seq ASC
         """),
         {"cid": str(conversation_id), "tid": str(tenant_id), "oid": str(owner_user_id)},
     )
@@ -286,7 +286,7 @@ async def generate_from_conversation(
     )
     parsed = _parse_llm_json(content)
     if not parsed:
-        await append_event(
+        enqueue_event(
             session,
             tenant_id,
             actor=actor,
@@ -307,7 +307,7 @@ async def generate_from_conversation(
         validated,
         is_manual_create=False,
     )
-    await append_event(
+    enqueue_event(
         session,
         tenant_id,
         actor=actor,
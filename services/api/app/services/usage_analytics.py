@@ -0,0 +1,363 @@
+"""Columnar usage analytics: a tenant's usage_records as NumPy arrays for ad-hoc group-by queries.
+
+GET /admin/kpis/query answers any combination of DIMENSIONS (group by and filter) in memory with
+vectorized aggregation instead of one SQL endpoint per slice. Per tenant the rows of the last
+WINDOW are held as columns (epoch seconds, dictionary-encoded text, token counts) and refreshed
+incrementally: each query loads only the rows between the previous and the new watermark
+(now - kpi_cache.GRACE, so transactions still in flight are not skipped). Rows after the
+watermark are read live per query and not kept. A kpi_cache_generations bump (a write landing on
+a closed day) drops the tenant's columns, as it does for the KPI day cache.
+
+Memory is bounded per tenant (settings.usage_analytics_max_rows_per_tenant, newest rows kept, also
+while loading; results report complete=False when older rows of the range were dropped) and by
+the number of tenants held (settings.usage_analytics_max_tenants, LRU). Process-local, like kpi_cache.
+"""
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.kpi_cache import GRACE, load_generation
+
+WINDOW = timedelta(days=366)  # longest /admin/kpis range (last12m) plus the partial first day
+LOAD_CHUNK_ROWS = 50000
+
+TEXT_COLUMNS = ("user_id", "assist_mode", "model_name", "model_version")
+DIMENSIONS = TEXT_COLUMNS + ("hour_of_day", "weekday", "day", "week", "month")
+METRICS = ("request_count", "input_tokens", "output_tokens", "total_tokens")
+
+_SELECT = """
+    SELECT CAST(floor(EXTRACT(EPOCH FROM ts)) AS bigint), user_id, assist_mode, model_name, model_version,
+           input_tokens, output_tokens
+    FROM usage_records
+    WHERE tenant_id = :tenant_id AND ts > :after AND ts <= :until
+    ORDER BY ts
+"""
+
+
+def epoch(ts: datetime) -> int:
+    """Epoch seconds; naive datetimes are UTC."""
+    return int((ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)).timestamp())
+
+
+class Dictionary:
+    """Text value <-> int32 code, shared by all columns of a tenant's table. None is a value."""
+
+    def __init__(self):
+        self.values: list[str | None] = []
+        self._codes: dict[str | None, int] = {}
+
+    def encode(self, value: str | None) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str | None) -> int | None:
+        return self._codes.get(value)
+
+    def copy(self) -> "Dictionary":
+        """Same codes; for encoding rows that are not kept (the live tail) without growing this one."""
+        other = Dictionary()
+        other.values, other._codes = list(self.values), dict(self._codes)
+        return other
+
+
+@dataclass
+class Columns:
+    """Parallel column arrays of usage rows."""
+
+    ts: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))
+    text: dict[str, np.ndarray] = field(
+        default_factory=lambda: {c: np.empty(0, np.int32) for c in TEXT_COLUMNS}
+    )
+    input_tokens: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))
+    output_tokens: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_rows(cls, rows: list, dictionary: Dictionary) -> "Columns":
+        """rows: (epoch, user_id, assist_mode, model_name, model_version, input_tokens, output_tokens)."""
+        if not rows:
+            return cls()
+        ts, user_id, assist_mode, model_name, model_version, input_tokens, output_tokens = zip(*rows)
+        encoded = {
+            column: np.fromiter((dictionary.encode(v) for v in values), np.int32, len(values))
+            for column, values in zip(TEXT_COLUMNS, (user_id, assist_mode, model_name, model_version))
+        }
+        return cls(
+            ts=np.asarray(ts, np.int64),
+            text=encoded,
+            input_tokens=np.asarray([t or 0 for t in input_tokens], np.int64),
+            output_tokens=np.asarray([t or 0 for t in output_tokens], np.int64),
+        )
+
+    @classmethod
+    def concat(cls, parts: list["Columns"]) -> "Columns":
+        parts = [p for p in parts if len(p)]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return cls()
+        return cls(
+            ts=np.concatenate([p.ts for p in parts]),
+            text={c: np.concatenate([p.text[c] for p in parts]) for c in TEXT_COLUMNS},
+            input_tokens=np.concatenate([p.input_tokens for p in parts]),
+            output_tokens=np.concatenate([p.output_tokens for p in parts]),
+        )
+
+    def select(self, index) -> "Columns":
+        """Rows at index (slice or index array), copied so dropped rows are freed."""
+        return Columns(
+            ts=self.ts[index].copy(),
+            text={c: v[index].copy() for c, v in self.text.items()},
+            input_tokens=self.input_tokens[index].copy(),
+            output_tokens=self.output_tokens[index].copy(),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.ts.nbytes + self.input_tokens.nbytes + self.output_tokens.nbytes + sum(
+            v.nbytes for v in self.text.values()
+        )
+
+
+class NewestRows:
+    """
+    The newest max_rows rows (None: all) of chunks added in ts order. A chunk is released as soon as
+    newer chunks hold max_rows rows, so loading keeps at most max_rows plus one chunk in memory.
+    dropped_until: ts of the newest row dropped (None if none was).
+    """
+
+    def __init__(self, max_rows: int | None):
+        self._max_rows = max_rows
+        self._parts: deque[Columns] = deque()
+        self._rows = 0
+        self.dropped_until: int | None = None
+
+    def add(self, part: Columns) -> None:
+        if not len(part):
+            return
+        self._parts.append(part)
+        self._rows += len(part)
+        while self._max_rows is not None and self._rows - len(self._parts[0]) >= self._max_rows:
+            oldest = self._parts.popleft()
+            self._rows -= len(oldest)
+            self.dropped_until = int(oldest.ts[-1])
+
+    def columns(self) -> Columns:
+        columns = Columns.concat(list(self._parts))
+        extra = len(columns) - self._max_rows if self._max_rows is not None else 0
+        if extra > 0:
+            self.dropped_until = int(columns.ts[extra - 1])
+            columns = columns.select(slice(extra, None))
+        return columns
+
+
+@dataclass
+class TenantTable:
+    """Settled rows with ts in (start, watermark], epoch seconds, in ts order. start moves up when rows are dropped."""
+
+    dictionary: Dictionary
+    columns: Columns
+    start: int
+    watermark: int
+    generation: int
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def append(self, part: Columns, start: int, watermark: int, max_rows: int) -> None:
+        """Add rows loaded up to watermark (ts order), drop rows at or before start and beyond max_rows."""
+        columns = Columns.concat([self.columns, part])
+        first = max(int(np.searchsorted(columns.ts, start, side="right")), len(columns) - max_rows)
+        if first > 0:
+            start = max(start, int(columns.ts[first - 1]))
+            columns = columns.select(slice(first, None))
+        self.columns, self.start, self.watermark = columns, start, watermark
+
+
+def _dimension(columns: Columns, dimension: str) -> np.ndarray:
+    """Integer key per row for a dimension (text columns: dictionary codes)."""
+    if dimension in TEXT_COLUMNS:
+        return columns.text[dimension]
+    days = columns.ts // 86400
+    if dimension == "hour_of_day":
+        return (columns.ts // 3600) % 24
+    if dimension == "weekday":  # 0 = Monday (1970-01-01 was a Thursday)
+        return (days + 3) % 7
+    if dimension == "day":
+        return days
+    if dimension == "week":  # days since epoch of the week's Monday
+        return days - (days + 3) % 7
+    return columns.ts.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)  # month
+
+
+def _decode(dimension: str, key: int, dictionary: Dictionary) -> str | int | None:
+    if dimension in TEXT_COLUMNS:
+        return dictionary.values[key]
+    if dimension in ("hour_of_day", "weekday"):
+        return int(key)
+    if dimension == "month":
+        return str(np.datetime64(int(key), "M"))
+    return str(np.datetime64(int(key), "D"))  # day, week: ISO date
+
+
+def aggregate(
+    columns: Columns,
+    dictionary: Dictionary,
+    *,
+    from_ts: int,
+    to_ts: int,
+    group_by: list[str],
+    filters: dict[str, list[str | None]],
+) -> list[dict]:
+    """
+    Group rows with from_ts <= ts <= to_ts matching all filters (text column -> allowed values) by
+    group_by; one dict per group with the dimension values and METRICS, largest request_count first.
+    """
+    mask = (columns.ts >= from_ts) & (columns.ts <= to_ts)
+    for column, values in filters.items():
+        codes = [c for c in (dictionary.lookup(v) for v in values) if c is not None]
+        mask &= np.isin(columns.text[column], np.asarray(codes, np.int32))
+    if not mask.any():
+        return []
+
+    input_tokens, output_tokens = columns.input_tokens[mask], columns.output_tokens[mask]
+    if group_by:
+        keys = np.stack([_dimension(columns, d)[mask].astype(np.int64) for d in group_by], axis=1)
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+    else:
+        groups, inverse = np.zeros((1, 0), np.int64), np.zeros(len(input_tokens), np.int64)
+    n = len(groups)
+    requests = np.bincount(inverse, minlength=n)
+    inputs = np.bincount(inverse, weights=input_tokens, minlength=n).astype(np.int64)
+    outputs = np.bincount(inverse, weights=output_tokens, minlength=n).astype(np.int64)
+
+    rows = []
+    for i in np.argsort(-requests, kind="stable"):
+        row = {d: _decode(d, groups[i][j], dictionary) for j, d in enumerate(group_by)}
+        row.update(
+            request_count=int(requests[i]),
+            input_tokens=int(inputs[i]),
+            output_tokens=int(outputs[i]),
+            total_tokens=int(inputs[i] + outputs[i]),
+        )
+        rows.append(row)
+    return rows
+
+
+class UsageAnalytics:
+    """Per-tenant TenantTable LRU with incremental watermark refresh."""
+
+    def __init__(self, max_tenants: int, max_rows_per_tenant: int):
+        self._max_tenants = max_tenants
+        self._max_rows = max_rows_per_tenant
+        self._tables: OrderedDict[str, TenantTable] = OrderedDict()
+        self.rows_loaded = 0
+        self.invalidations = 0
+
+    async def _load(
+        self,
+        session: AsyncSession,
+        tenant_id: UUID,
+        dictionary: Dictionary,
+        after: int,
+        until: int,
+        max_rows: int | None = None,
+    ) -> tuple[Columns, int | None]:
+        """Rows with ts in (after, until], at most the newest max_rows; and the ts of the newest row dropped."""
+        result = await session.stream(
+            text(_SELECT).execution_options(yield_per=LOAD_CHUNK_ROWS),
+            {
+                "tenant_id": str(tenant_id),
+                "after": datetime.fromtimestamp(after, timezone.utc),
+                "until": datetime.fromtimestamp(until, timezone.utc),
+            },
+        )
+        newest = NewestRows(max_rows)
+        async for chunk in result.partitions():
+            part = Columns.from_rows(list(chunk), dictionary)
+            self.rows_loaded += len(part)
+            newest.add(part)
+        return newest.columns(), newest.dropped_until
+
+    async def table(self, session: AsyncSession, tenant_id: UUID, now: datetime | None = None) -> TenantTable:
+        """The tenant's table, refreshed up to now - GRACE (loaded on first use)."""
+        key = str(tenant_id)
+        now = now or datetime.now(timezone.utc)
+        watermark, generation = epoch(now - GRACE), await load_generation(session, tenant_id)
+        start = watermark - int(WINDOW.total_seconds())
+
+        table = self._tables.get(key)
+        if table is not None and table.generation != generation:
+            self.invalidations += 1
+            table = None
+        if table is None:
+            table = TenantTable(Dictionary(), Columns(), start, start, generation)
+            self._tables[key] = table
+        self._tables.move_to_end(key)
+        while len(self._tables) > self._max_tenants:
+            self._tables.popitem(last=False)
+
+        async with table.lock:
+            if watermark > table.watermark:
+                part, dropped_until = await self._load(
+                    session, tenant_id, table.dictionary, max(table.watermark, start), watermark, self._max_rows
+                )
+                table.append(part, max(table.start, start, dropped_until or start), watermark, self._max_rows)
+        return table
+
+    async def query(
+        self,
+        session: AsyncSession,
+        tenant_id: UUID,
+        *,
+        from_ts: datetime,
+        to_ts: datetime,
+        group_by: list[str],
+        filters: dict[str, list[str | None]],
+        now: datetime | None = None,
+    ) -> tuple[list[dict], bool]:
+        """(rows as in aggregate(), whether the cached columns cover all of [from_ts, to_ts])."""
+        table = await self.table(session, tenant_id, now)
+        columns, start, watermark = table.columns, table.start, table.watermark
+        # Tail rows are not kept: encode them with a copy so the table's dictionary does not grow per query
+        dictionary, tail = table.dictionary, Columns()
+        if epoch(to_ts) > watermark:
+            dictionary = table.dictionary.copy()
+            tail, _ = await self._load(session, tenant_id, dictionary, watermark, epoch(to_ts))
+        rows = aggregate(
+            Columns.concat([columns, tail]),
+            dictionary,
+            from_ts=epoch(from_ts),
+            to_ts=epoch(to_ts),
+            group_by=group_by,
+            filters=filters,
+        )
+        return rows, epoch(from_ts) > start
+
+    def clear(self) -> None:
+        self._tables.clear()
+
+    def stats(self) -> dict:
+        return {
+            "tenants": len(self._tables),
+            "max_tenants": self._max_tenants,
+            "rows": sum(len(t.columns) for t in self._tables.values()),
+            "max_rows_per_tenant": self._max_rows,
+            "bytes": sum(t.columns.nbytes for t in self._tables.values()),
+            "rows_loaded": self.rows_loaded,
+            "invalidations": self.invalidations,
+        }
+
+
+analytics = UsageAnalytics(settings.usage_analytics_max_tenants, settings.usage_analytics_max_rows_per_tenant)
@@ -0,0 +1,143 @@
+"""Race-free version numbers for versioned rows (ai_responses, prompt_versions).
+
+The next version comes from a counter row that is bumped atomically (row lock until commit), so
+allocation is O(1) no matter how long the history is. Unique (…, version) constraints back it up:
+if a counter ever lags behind the table (rows written outside the allocator), the insert conflicts,
+the counter is resynced from the index and the insert is retried.
+"""
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+AI_RESPONSE_VERSION_CONSTRAINT = "uq_ai_responses_tenant_entity_version"
+PROMPT_VERSION_CONSTRAINT = "uq_prompt_versions_prompt_version"
+MAX_ATTEMPTS = 3
+
+T = TypeVar("T")
+
+
+def _is_conflict(exc: IntegrityError, constraint: str) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == "23505" and constraint in str(exc.orig)
+
+
+async def _insert_with_retry(
+    session: AsyncSession,
+    constraint: str,
+    allocate: Callable[[], Awaitable[T]],
+    resync: Callable[[], Awaitable[None]],
+    insert: Callable[[T], Awaitable[None]],
+) -> T:
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        versions = await allocate()
+        try:
+            async with session.begin_nested():
+                await insert(versions)
+            return versions
+        except IntegrityError as e:
+            if attempt == MAX_ATTEMPTS or not _is_conflict(e, constraint):
+                raise
+            await resync()
+    raise AssertionError("unreachable")
+
+
+async def insert_ai_response_versions(
+    session: AsyncSession,
+    tenant_id: UUID,
+    entity_ids: list[str],
+    insert: Callable[[list[int]], Awaitable[None]],
+) -> list[int]:
+    """
+    Allocate the next ai_responses version for each entity_id (one statement for all of them)
+    and run insert(versions). Repeated entity_ids get consecutive versions in list order.
+    """
+    counts = Counter(entity_ids)
+    params = {
+        "tenant_id": str(tenant_id),
+        "entity_ids": list(counts),
+        "counts": list(counts.values()),
+    }
+
+    async def allocate() -> list[int]:
+        # Sorted so concurrent batches lock counter rows in the same order
+        r = await session.execute(
+            text("""
+                INSERT INTO ai_response_version_counters (tenant_id, entity_id, last_version)
+                SELECT CAST(:tenant_id AS uuid), e.entity_id, e.n
+                FROM unnest(CAST(:entity_ids AS text[]), CAST(:counts AS int[])) AS e(entity_id, n)
+                ORDER BY e.entity_id
+                ON CONFLICT (tenant_id, entity_id)
+                DO UPDATE SET last_version = ai_response_version_counters.last_version + EXCLUDED.last_version
+                RETURNING entity_id, last_version
+            """),
+            params,
+        )
+        next_version = {row[0]: row[1] - counts[row[0]] + 1 for row in r.fetchall()}
+        versions = []
+        for entity_id in entity_ids:
+            versions.append(next_version[entity_id])
+            next_version[entity_id] += 1
+        return versions
+
+    async def resync() -> None:
+        await session.execute(
+            text("""
+                UPDATE ai_response_version_counters c SET last_version = GREATEST(c.last_version, m.max_version)
+                FROM (
+                    SELECT entity_id, MAX(version) AS max_version FROM ai_responses
+                    WHERE tenant_id = :tenant_id AND entity_id = ANY(CAST(:entity_ids AS text[]))
+                    GROUP BY entity_id
+                ) m
+                WHERE c.tenant_id = :tenant_id AND c.entity_id = m.entity_id
+            """),
+            params,
+        )
+
+    return await _insert_with_retry(session, AI_RESPONSE_VERSION_CONSTRAINT, allocate, resync, insert)
+
+
+async def insert_ai_response_version(
+    session: AsyncSession,
+    tenant_id: UUID,
+    entity_id: str,
+    insert: Callable[[int], Awaitable[None]],
+) -> int:
+    """Allocate the entity's next ai_responses version and run insert(version). Returns the version."""
+
+    async def insert_one(versions: list[int]) -> None:
+        await insert(versions[0])
+
+    return (await insert_ai_response_versions(session, tenant_id, [entity_id], insert_one))[0]
+
+
+async def insert_prompt_version(
+    session: AsyncSession,
+    prompt_id: UUID | str,
+    insert: Callable[[int], Awaitable[None]],
+) -> int:
+    """Allocate the prompt's next prompt_versions version (prompts.latest_version) and run insert(version)."""
+    params = {"pid": str(prompt_id)}
+
+    async def allocate() -> int:
+        r = await session.execute(
+            text("UPDATE prompts SET latest_version = latest_version + 1 WHERE id = :pid RETURNING latest_version"),
+            params,
+        )
+        return r.scalar_one()
+
+    async def resync() -> None:
+        await session.execute(
+            text("""
+                UPDATE prompts SET latest_version = GREATEST(latest_version, (
+                    SELECT MAX(version) FROM prompt_versions WHERE prompt_id = :pid
+                ))
+                WHERE id = :pid
+            """),
+            params,
+        )
+
+    return await _insert_with_retry(session, PROMPT_VERSION_CONSTRAINT, allocate, resync, insert)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for hot-path services. No DB required.
+
+Usage: .venv/bin/python scripts/benchmark.py [name ...]   (default: all)
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = [("1 KB", 1_000), ("100 KB", 100_000), ("2 MB", 2_000_000)]
+
+_NOTE = (
+    "Herr Müller (user@test.de) rief am 15.03.1980 an. Tel 030-12345678. "
+    "Die Patientin berichtet über Schlafstörungen und Grübeln in der letzten Woche. "
+)
+
+
+def _repeat_to(sample: str, size: int) -> str:
+    return (sample * (size // len(sample) + 1))[:size]
+
+
+def _timeit(fn, arg, min_runs: int = 3, min_seconds: float = 0.2) -> float:
+    """Best-of wall time in seconds for a single call."""
+    best = float("inf")
+    runs = 0
+    started = time.perf_counter()
+    while runs < min_runs or time.perf_counter() - started < min_seconds:
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+        runs += 1
+    return best
+
+
+def _report(label: str, size: int, seconds: float, baseline: float | None = None) -> None:
+    mb_s = size / seconds / 1_000_000 if seconds else float("inf")
+    line = f"  {label:<28} {seconds * 1000:10.2f} ms  {mb_s:8.1f} MB/s"
+    if baseline is not None:
+        line += f"  ({baseline / seconds:.1f}x vs baseline)"
+    print(line)
+
+
+def bench_anonymize() -> None:
+    """Single-pass scanner vs one pattern.sub per rule (previous implementation)."""
+    from app.services.anonymization import _RULES, anonymize
+
+    # Baseline = previous rule set, i.e. without the email start guard.
+    sequential = [
+        (re.compile(source.removeprefix("(?<![a-zA-Z0-9._%+-])")), replacement)
+        for _, source, replacement in _RULES
+    ]
+
+    def anonymize_sequential(text: str) -> str:
+        for pattern, replacement in sequential:
+            text = pattern.sub(replacement, text)
+        return text
+
+    for label, size in SIZES:
+        text = _repeat_to(_NOTE, size)
+        print(f"anonymize, {label} clinical note")
+        base = _timeit(anonymize_sequential, text)
+        _report("sequential (baseline)", size, base)
+        _report("single-pass", size, _timeit(anonymize, text), base)
+
+    # Long token without '@': quadratic for the old email pass.
+    text = "a" * 20_000
+    print("anonymize, 20 KB pathological (no separators)")
+    base = _timeit(anonymize_sequential, text, min_runs=1, min_seconds=0)
+    _report("sequential (baseline)", len(text), base)
+    _report("single-pass", len(text), _timeit(anonymize, text), base)
+
+
+def bench_injection() -> None:
+    """Per-message screening cost as the phrase list grows (10 -> 5,000 phrases)."""
+    import random
+
+    from app.services.phrase_matcher import PhraseMatcher
+    from app.services.prompt_injection import BLOCK_PHRASES
+
+    rng = random.Random(42)
+    vocab = [f"wort{i}" for i in range(5000)]
+    message = _repeat_to(_NOTE, 8000)  # max_user_message_length
+    print(f"prompt injection screening, {len(message)} char message")
+    for n in (10, 100, 1000, 5000):
+        synthetic = [" ".join(rng.choice(vocab) for _ in range(3)) for _ in range(max(0, n - len(BLOCK_PHRASES)))]
+        matcher = PhraseMatcher([*BLOCK_PHRASES[:n], *synthetic])
+        _report(f"{matcher.phrase_count} phrases", len(message), _timeit(matcher.search, message))
+
+
+def bench_sanitize() -> None:
+    """Single-pass tokenizer vs one search/sub per pattern (previous implementation)."""
+    from app.services.markdown_sanitizer import sanitize_markdown
+
+    flags = re.DOTALL | re.IGNORECASE
+    script = re.compile(r"<script[^>]*>.*?</script>", flags)
+    iframe = re.compile(r"<iframe[^>]*>.*?</iframe>", flags)
+    style = re.compile(r'\s+style\s*=\s*["\'][^"\']*["\']', re.IGNORECASE)
+    onevent = re.compile(r"\s+on\w+\s*=\s*['\"][^'\"]*['\"]", re.IGNORECASE)
+    js_uri = re.compile(r"javascript:", re.IGNORECASE)
+    data_uri = re.compile(r"data:\s*text/html", re.IGNORECASE)
+    html_tag = re.compile(r"<[^>]+>")
+
+    def sanitize_sequential(text: str) -> str:
+        if script.search(text) or iframe.search(text):
+            return ""
+        text = onevent.sub("", style.sub("", text))
+        if js_uri.search(text) or data_uri.search(text):
+            return ""
+        return html_tag.sub("", text).strip()
+
+    answer = (
+        "## Einschätzung\n\n**Befund:** Die Patientin berichtet über <b>Schlafstörungen</b>.\n"
+        "- Grübeln\n- Antriebsminderung\n\n| Skala | Wert |\n|---|---|\n| PHQ-9 | 14 |\n\n"
+        "a < b, c > d\n\n"
+    )
+    inline_html = '<span style="color:red">Hinweis</span> <a href="#" onclick="x()">mehr</a>\n\n'
+    for kind, sample in [("model answer", answer), ("answer with inline HTML", answer + inline_html)]:
+        for label, size in SIZES:
+            text = _repeat_to(sample, size)
+            print(f"sanitize, {label} {kind}")
+            base = _timeit(sanitize_sequential, text)
+            _report("sequential (baseline)", size, base)
+            _report("single-pass", size, _timeit(sanitize_markdown, text), base)
+
+    # Many openers without a closer / '>' / quote: quadratic for the old patterns.
+    for label, text in [
+        ("'<script>' x 2,500", "<script>" * 2_500),
+        ("'<' x 20,000", "<" * 20_000),
+        ("20,000 spaces", " " * 20_000 + "x"),
+    ]:
+        print(f"sanitize, pathological {label}")
+        base = _timeit(sanitize_sequential, text, min_runs=1, min_seconds=0)
+        _report("sequential (baseline)", len(text), base)
+        _report("single-pass", len(text), _timeit(sanitize_markdown, text), base)
+
+
+def bench_blocks() -> None:
+    """Precompiled single-classification extractor vs the previous per-line re.match loop."""
+    from app.services.block_extractor import extract_blocks
+    from tests.test_block_extractor import _extract_blocks_reference
+
+    report = (
+        "## Wochenbericht\n\nDie Patientin berichtet über **Schlafstörungen** und Grübeln.\n"
+        "Die Stimmung ist gedrückt, der Antrieb vermindert.\n\n"
+        "### Kernpunkte\n- Sitzungen regelmäßig wahrgenommen\n- Dokumentation zu 94 %\n"
+        "1. Schlafhygiene besprechen\n2. Aktivitätenplan\n\n"
+        "| Skala | Wert |\n| --- | --- |\n| PHQ-9 | 14 |\n\n> Zitat der Patientin\n\n"
+        "```\nICD-10: F32.1\n```\n---\n"
+    )
+    for label, size in [("10 KB", 10_000), ("100 KB", 100_000), ("1 MB", 1_000_000)]:
+        text = _repeat_to(report, size)
+        print(f"extract_blocks, {label} report")
+        base = _timeit(_extract_blocks_reference, text)
+        _report("per-line re.match (baseline)", size, base)
+        _report("precompiled", size, _timeit(extract_blocks, text), base)
+
+
+def bench_event_payload() -> None:
+    """ai_response.created write volume: full content copy (previous) vs reference payload."""
+    import json
+    from uuid import uuid4
+
+    from app.services.ai_rendering_service import render_blocks
+    from app.services.event_store import ai_response_created_payload
+
+    for label, size in SIZES:
+        markdown = _repeat_to("## Befund\n\n" + _NOTE + "\n- Grübeln\n- Schlafstörungen\n\n", size)
+        blocks = render_blocks(markdown)
+        response_id = uuid4()
+        row = len(markdown.encode()) + len(json.dumps(blocks))  # ai_responses content, written either way
+
+        def full_event(_: object) -> str:
+            return json.dumps({
+                "raw_markdown": markdown,
+                "structured_blocks": blocks,
+                "model": "gpt-4",
+                "confidence": 0.9,
+                "version": 1,
+                "response_id": str(response_id),
+            })
+
+        def reference_event(_: object) -> str:
+            return json.dumps(ai_response_created_payload(response_id, markdown, "gpt-4", 0.9, 1))
+
+        print(f"ai_response.created, {label} response (ai_responses row: {row:,} bytes)")
+        for name, fn in [("full payload (baseline)", full_event), ("reference payload", reference_event)]:
+            payload = len(fn(None).encode())
+            seconds = _timeit(fn, None)
+            print(
+                f"  {name:<28} {payload:>12,} B event  {(row + payload) / row:5.2f}x write amplification"
+                f"  {seconds * 1000:8.2f} ms encode"
+            )
+
+
+def bench_event_append() -> None:
+    """Client-side cost per event: one parameter set + json.dumps per event vs one multi-row orjson batch."""
+    import json
+    from datetime import datetime, timezone
+    from uuid import uuid4
+
+    from app.services.event_store import _insert_params
+
+    tenant_id = uuid4()
+    now = datetime.now(timezone.utc)
+    payload = {"document_id": str(uuid4()), "conversation_id": str(uuid4()), "version": 3, "note": _NOTE}
+    for n in (10, 1_000, 10_000):
+        events = [
+            {"event_id": uuid4(), "timestamp": now, "actor": "system", "entity_type": "structured_document",
+             "entity_id": str(i), "event_type": "structured_document.updated", "payload": payload}
+            for i in range(n)
+        ]
+
+        def per_event(batch: list[dict]) -> list[dict]:
+            return [
+                {**e, "tenant_id": str(tenant_id), "event_id": str(e["event_id"]), "payload": json.dumps(e["payload"])}
+                for e in batch
+            ]
+
+        def multi_row(batch: list[dict]) -> dict:
+            return _insert_params(tenant_id, batch)
+
+        print(f"event append, {n:,} events")
+        base = _timeit(per_event, events)
+        for label, seconds in [("per-event json (baseline)", base), ("multi-row orjson", _timeit(multi_row, events))]:
+            print(f"  {label:<28} {n / seconds:12,.0f} events/s  ({base / seconds:.1f}x vs baseline)")
+    print("  (encoding only; the multi-row path also saves n-1 statement round trips)")
+
+
+BENCHMARKS = {
+    "anonymize": bench_anonymize,
+    "injection": bench_injection,
+    "sanitize": bench_sanitize,
+    "blocks": bench_blocks,
+    "events": bench_event_payload,
+    "append": bench_event_append,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Maintain monthly partitions: create upcoming months, archive expired ones.
+
+Tables: domain_events, usage_records, audit_logs, llm_audit_logs (app/services/partitions.py).
+Run daily (cron / scheduled job). Retention per table comes from DOMAIN_EVENT_RETENTION_MONTHS,
+USAGE_RECORD_RETENTION_MONTHS and AUDIT_LOG_RETENTION_MONTHS (audit_logs, llm_audit_logs).
+Before a domain_events partition is detached, every projected entity with events in it gets a
+fresh snapshot, so projections stay correct without the archived history.
+
+Usage: .venv/bin/python scripts/manage_partitions.py [--table NAME ...] [--months-ahead N]
+       [--retain-months N] [--drop] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.db import session_scope
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    detach_partition,
+    ensure_partitions,
+    expired_months,
+    legacy_expired,
+    legacy_partition,
+    list_partitions,
+    months_to_create,
+    partition_name,
+)
+from app.services.projections import PROJECTIONS, project
+
+RETENTION_MONTHS = {
+    "domain_events": settings.domain_event_retention_months,
+    "usage_records": settings.usage_record_retention_months,
+    "audit_logs": settings.audit_log_retention_months,
+    "llm_audit_logs": settings.audit_log_retention_months,
+}
+
+
+async def snapshot_partition(conn, name: str) -> int:
+    """Snapshot every projected entity that has events in the partition. Returns entity count."""
+    by_type = {p.entity_type: p for p in PROJECTIONS.values()}
+    r = await conn.execute(
+        text(f"SELECT DISTINCT tenant_id, entity_type, entity_id FROM {name} WHERE entity_type = ANY(:types)"),
+        {"types": list(by_type)},
+    )
+    rows = r.fetchall()
+    for tenant_id, entity_type, entity_id in rows:
+        async with session_scope(tenant_id=UUID(str(tenant_id))) as session:
+            await project(session, UUID(str(tenant_id)), by_type[entity_type], entity_id, snapshot_every=1)
+    return len(rows)
+
+
+async def manage_table(engine, parent: str, args: argparse.Namespace) -> None:
+    today = datetime.now(timezone.utc).date()
+    retain = args.retain_months if args.retain_months is not None else RETENTION_MONTHS[parent]
+
+    async with engine.begin() as conn:
+        existing, legacy = await list_partitions(conn, parent)
+        if args.dry_run:
+            months = months_to_create(existing, today, args.months_ahead, legacy=legacy)
+            created = [partition_name(parent, m) for m in months]
+        else:
+            created = await ensure_partitions(conn, parent, today, args.months_ahead)
+    print(f"{parent}: partitions created: {', '.join(created) or 'none'}")
+
+    expired = [partition_name(parent, m) for m in expired_months(existing, today, retain)]
+    if legacy and legacy_expired(existing, today, retain):
+        expired.insert(0, legacy_partition(parent))
+    for name in expired:
+        if args.dry_run:
+            print(f"  would {'drop' if args.drop else 'archive'} {name}")
+            continue
+        note = ""
+        if parent == "domain_events":
+            async with engine.connect() as conn:
+                note = f"{await snapshot_partition(conn, name)} entities snapshotted, "
+        async with engine.begin() as conn:
+            table = await detach_partition(conn, parent, name, drop=args.drop)
+        print(f"  {name}: {note}{'dropped' if args.drop else f'archived as {table}'}")
+
+
+async def manage(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.database_url)
+    for parent in args.table or list(PARTITIONED_TABLES):
+        await manage_table(engine, parent, args)
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--table", action="append", choices=list(PARTITIONED_TABLES), help="only this table (repeatable)"
+    )
+    parser.add_argument("--months-ahead", type=int, default=3, help="future months to keep partitioned")
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=None,
+        help="detach partitions older than this many months (0 = keep all; default: per-table setting)",
+    )
+    parser.add_argument("--drop", action="store_true", help="drop expired partitions instead of archiving")
+    parser.add_argument("--dry-run", action="store_true", help="print actions, change nothing")
+    asyncio.run(manage(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Re-run sanitize + extract_blocks over stored ai_responses (after parser/sanitizer changes).
+
+Resumable: progress is checkpointed per tenant in reprocess_checkpoints under a job name that
+defaults to a fingerprint of the sanitizer/extractor code. Rerun the same command to continue.
+
+Usage: .venv/bin/python scripts/reprocess_ai_responses.py [--tenant ID] [--workers N]
+       [--batch-size N] [--max-rows-per-second N] [--job NAME] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.ai_response_reprocessor import (
+    ReprocessStats,
+    Throttle,
+    list_tenant_ids,
+    processor_fingerprint,
+    reprocess_tenant,
+)
+
+
+async def reprocess(args: argparse.Namespace) -> None:
+    engine = create_async_engine(settings.database_url)
+    job = args.job or f"blocks-{processor_fingerprint()}"
+    tenants = [UUID(args.tenant)] if args.tenant else await list_tenant_ids(engine)
+    throttle = Throttle(args.max_rows_per_second)
+    total = ReprocessStats()
+    started = time.perf_counter()
+    print(f"Job {job}: {len(tenants)} tenant(s), {args.workers} worker(s){' (dry run)' if args.dry_run else ''}")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for tenant_id in tenants:
+            stats = await reprocess_tenant(
+                engine,
+                tenant_id,
+                job=job,
+                executor=pool,
+                workers=args.workers,
+                batch_size=args.batch_size,
+                throttle=throttle,
+                dry_run=args.dry_run,
+            )
+            print(f"  {tenant_id}: {stats.processed} processed, {stats.updated} updated, {stats.failed} rejected")
+            total.processed += stats.processed
+            total.updated += stats.updated
+            total.failed += stats.failed
+
+    await engine.dispose()
+    elapsed = time.perf_counter() - started
+    print(
+        f"Reprocess complete: {total.processed} processed, {total.updated} updated, "
+        f"{total.failed} rejected by sanitizer (unchanged) in {elapsed:.1f}s."
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenant", help="only this tenant id (default: all tenants)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="render processes")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per cursor fetch / UPDATE")
+    parser.add_argument(
+        "--max-rows-per-second", type=float, default=0, help="throttle to protect production load (0 = off)"
+    )
+    parser.add_argument("--job", help="checkpoint job name (default: blocks-<code fingerprint>)")
+    parser.add_argument("--dry-run", action="store_true", help="count changes, write nothing")
+    asyncio.run(reprocess(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
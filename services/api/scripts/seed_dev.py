@@ -236,6 +236,10 @@ Use careful language such as:
                     """),
                     {"prompt_id": str(row[0]), "body": body},
                 )
+                await session.execute(
+                    text("UPDATE prompts SET latest_version = GREATEST(latest_version, 1) WHERE id = :prompt_id"),
+                    {"prompt_id": str(row[0])},
+                )
                 await session.execute(
                     text("""
                         UPDATE prompt_versions SET body = :body
@@ -0,0 +1,16 @@
+"""Activity calendar streaks (no DB)."""
+from datetime import date
+
+from app.services.activity_calendar import streak_stats
+
+
+def test_streak_stats_counts_latest_run():
+    days = [date(2026, 10, d) for d in (1, 2, 3, 7, 8)]
+    assert streak_stats(days) == (5, 2)
+    assert streak_stats([]) == (0, 0)
+
+
+def test_streak_stats_across_month_boundary():
+    assert streak_stats([date(2026, 9, 29), date(2026, 9, 30), date(2026, 10, 1)]) == (3, 3)
+    assert streak_stats([date(2026, 9, 30), date(2026, 10, 2)]) == (2, 1)
+
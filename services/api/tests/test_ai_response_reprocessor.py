@@ -0,0 +1,55 @@
+"""Unit tests for the ai_responses reprocessor (no DB)."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from app.services.ai_rendering_service import render_blocks
+from app.services.ai_response_reprocessor import Throttle, _render, processor_fingerprint, render_batch
+
+
+def test_render_batch_matches_render_blocks():
+    rows = [("a", "## Titel\n\nText"), ("b", "- eins\n- zwei")]
+    assert render_batch(rows) == [("a", render_blocks(rows[0][1])), ("b", render_blocks(rows[1][1]))]
+
+
+def test_render_batch_rejected_markdown_is_none():
+    assert render_batch([("x", "<script>alert(1)</script>")]) == [("x", None)]
+
+
+def test_render_spreads_batch_over_workers_and_keeps_every_row():
+    rows = [(str(i), f"Absatz {i}") for i in range(10)]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        rendered = asyncio.run(_render(pool, rows, 3))
+    assert sorted(rendered) == sorted(render_batch(rows))
+
+
+def test_processor_fingerprint_is_stable():
+    assert processor_fingerprint() == processor_fingerprint()
+    assert len(processor_fingerprint()) == 12
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_throttle_disabled():
+    assert Throttle(0).delay(10_000) == 0.0
+
+
+def test_throttle_paces_batches():
+    clock = _Clock()
+    throttle = Throttle(100, clock)
+    assert throttle.delay(50) == 0.5
+    clock.now = 0.2  # batch took 0.2s, schedule says next starts at 0.5
+    assert throttle.delay(50) == 0.8
+
+
+def test_throttle_does_not_make_up_lost_time():
+    clock = _Clock()
+    throttle = Throttle(100, clock)
+    throttle.delay(50)
+    clock.now = 10.0  # far behind schedule
+    assert throttle.delay(50) == 0.5
@@ -1,8 +1,14 @@
 """AI Responses API integration tests. Requires DB; auth bypass for local."""
+import asyncio
+from uuid import uuid4
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.db import session_scope
+from app.dependencies import DEV_TENANT_ID, DEV_USER_UUID
 from app.main import app
+from app.services.ai_rendering_service import AIRenderingService
 
 
 @pytest.fixture
@@ -123,3 +129,47 @@ async def test_execute_action(client):
     data = r.json()
     assert data["ok"] is True
     assert data["command"] == "open_queue_enterprise"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_versions_are_unique_and_gapless():
+    """Concurrent writers for one entity get versions 1..n (counter allocation, no MAX()+1 race)."""
+    entity_id = f"report_concurrent_{uuid4().hex[:8]}"
+
+    async def write(i: int) -> int:
+        async with session_scope(tenant_id=DEV_TENANT_ID, user_id=str(DEV_USER_UUID)) as session:
+            service = AIRenderingService(session, DEV_TENANT_ID, str(DEV_USER_UUID))
+            result = await service.process_markdown(f"## Version {i}\nContent.", "weekly_report", entity_id)
+            return result["version"]
+
+    versions = await asyncio.gather(*(write(i) for i in range(10)))
+    assert sorted(versions) == list(range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_process_markdown_batch(client):
+    entity_id = f"report_batch_{uuid4().hex[:8]}"
+    r = await client.post(
+        "/ai-responses/batch",
+        json={
+            "items": [
+                {"raw_markdown": SAMPLE_MARKDOWN, "entity_type": "weekly_report", "entity_id": entity_id, "confidence": 0.91},
+                {"raw_markdown": "Hello <script>alert(1)</script>", "entity_type": "weekly_report", "entity_id": entity_id},
+                {"raw_markdown": "## Second\nContent.", "entity_type": "weekly_report", "entity_id": entity_id},
+            ]
+        },
+    )
+    assert r.status_code == 200, r.text
+    first, rejected, second = r.json()
+    assert [first["version"], second["version"]] == [1, 2]
+    assert first["structured_blocks"] and first["needs_review"] is False
+    assert rejected["error"] == "Script tag detected" and "id" not in rejected
+
+    listed = await client.get("/ai-responses", params={"entity_id": entity_id})
+    assert [item["id"] for item in listed.json()] == [second["id"], first["id"]]
+
+
+@pytest.mark.asyncio
+async def test_process_markdown_batch_rejects_empty(client):
+    r = await client.post("/ai-responses/batch", json={"items": []})
+    assert r.status_code == 400
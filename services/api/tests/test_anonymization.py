@@ -1,7 +1,11 @@
 """Anonymization regex unit tests."""
+import random
+import re
+import time
+
 import pytest
 
-from app.services.anonymization import anonymize
+from app.services.anonymization import StreamingReidentifier, anonymize, pseudonymize
 
 
 def test_anonymize_email():
@@ -39,3 +43,198 @@ def test_anonymize_combined():
     assert "[EMAIL]" in result
     assert "[DATE_OF_BIRTH]" in result
     assert "user@test.de" not in result
+
+
+# --- Single-pass scanner: equivalence with the previous sequential substitutions ---
+
+# The patterns as they were before the scanner, applied one full pass each, in this order.
+_SEQUENTIAL = [
+    (re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"), "[EMAIL]"),
+    (re.compile(r"\+49[- ]?[0-9]{2,4}[- ]?[0-9]{4,10}"), "[PHONE]"),
+    (re.compile(r"0[0-9]{2,4}[- ]?[0-9]{4,10}"), "[PHONE]"),
+    (re.compile(r"\b\d{1,2}\.\d{1,2}\.\d{4}\b"), "[DATE_OF_BIRTH]"),
+    (re.compile(r"\b\d{1,2}/\d{1,2}/\d{4}\b"), "[DATE_OF_BIRTH]"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}\b"), "[DATE_OF_BIRTH]"),
+    (re.compile(r"\b\d{10,}\b"), "[ID_NUMBER]"),
+    (re.compile(r"\b(?:Herr|Frau)\s+[A-ZÄÖÜa-zäöüß]+\b"), "[PERSON]"),
+    (re.compile(r"\bDr\.\s*[A-ZÄÖÜa-zäöüß]+\b"), "[PERSON]"),
+]
+
+
+def _anonymize_sequential(text: str) -> str:
+    """Reference: one full pattern.sub pass per rule, in rule order (pre-scanner behaviour)."""
+    for pattern, replacement in _SEQUENTIAL:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+_PII_SAMPLES = [
+    "user@example.com",
+    "anna.schmidt+praxis@klinik-nord.de",
+    "+49 30 12345678",
+    "+49-89-1234567",
+    "030-12345678",
+    "0221 9876543",
+    "15.03.1980",
+    "1.2.1975",
+    "03/11/1990",
+    "1980-03-15",
+    "12345678901234",
+    "Herr Müller",
+    "Frau Özdemir",
+    "Dr. Weber",
+    "Dr.Schäfer",
+]
+_PROSE = ["Die", "Patientin", "berichtet", "über", "Schlafstörungen", "und", "Grübeln", "Termin", "am", "Montag"]
+_SEPARATORS = [" ", ", ", ". ", "\n", " (", ") ", ": "]
+
+
+def _random_note(rng: random.Random, tokens: int) -> str:
+    """Prose with embedded PII; every PII sample is followed by at least one prose word."""
+    parts = []
+    for _ in range(tokens):
+        if rng.random() < 0.3:
+            parts.append(rng.choice(_PII_SAMPLES))
+            parts.append(rng.choice(_SEPARATORS))
+        parts.append(rng.choice(_PROSE))
+        parts.append(rng.choice(_SEPARATORS))
+    return "".join(parts)
+
+
+def test_anonymize_matches_sequential_reference_on_fixed_cases():
+    cases = [
+        "Contact: user@example.com",
+        "Tel: +49 30 12345678 oder 030-12345678",
+        "Geboren am 15.03.1980, DOB: 1980-03-15, alt 03/11/1990",
+        "ID: 12345678901234",
+        "Herr Müller und Frau Schmidt bei Dr. Weber",
+        "Herr Müller (user@test.de) rief am 15.03.1980 an.",
+        "Herr Max@example.com schrieb",
+        "Mail: Frau Anna.b@x.de",
+        "ller@x.deAnna.b+tag@klinik-nord.de",
+        "",
+        "Keine personenbezogenen Daten.",
+    ]
+    for text in cases:
+        assert anonymize(text) == _anonymize_sequential(text)
+
+
+def test_anonymize_matches_sequential_reference_on_random_notes():
+    rng = random.Random(20260219)
+    for _ in range(300):
+        text = _random_note(rng, rng.randint(1, 80))
+        assert anonymize(text) == _anonymize_sequential(text)
+
+
+def test_anonymize_email_after_salutation_or_name_is_masked_whole():
+    assert anonymize("Herr Max@example.com schrieb") == "Herr [EMAIL] schrieb"
+    assert anonymize("Mail: Frau Anna.b@x.de") == "Mail: Frau [EMAIL]"
+    assert anonymize("Dr.Weber@klinik.de") == "[EMAIL]"
+    assert anonymize("Herr Müller@x.de") == "[PERSON][EMAIL]"
+    assert pseudonymize("Frau Anna.b@x.de und Frau Anna", {}) == "Frau [EMAIL] und [PERSON_1]"
+
+
+_NAMES = ["Herr", "Frau", "Dr.", "Herr Max", "Frau Özdemir", "Dr. Weber", "Dr.Schäfer", "Anna", "Müller"]
+_EMAILS = ["user@example.com", "Max@example.com", "anna.b@x.de", ".b+tag@klinik-nord.de", "ller@x.de"]
+
+
+def test_anonymize_matches_sequential_reference_on_adjacent_names_and_emails():
+    rng = random.Random(20261019)
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            parts.append(rng.choice(_NAMES))
+            parts.append(rng.choice(["", " ", ".", "  "]))
+            parts.append(rng.choice(_EMAILS))
+            parts.append(rng.choice(["", " ", ", "]))
+        text = "".join(parts)
+        assert anonymize(text) == _anonymize_sequential(text), text
+
+
+def test_anonymize_masks_whole_token_when_rules_overlap():
+    # Sequential passes let the phone rule bite into the middle of an ID ("1234567890 1234"),
+    # leaving fragments behind. The scanner masks the leftmost token as a whole.
+    text = "030-12345678 12345678901234 12345678901234"
+    assert anonymize(text) == "[PHONE] [ID_NUMBER] [ID_NUMBER]"
+
+
+def test_anonymize_linear_on_pathological_input():
+    # Long runs without '@' made the old email pass quadratic (seconds for 50 KB).
+    text = "a" * 500_000
+    start = time.perf_counter()
+    assert anonymize(text) == text
+    assert time.perf_counter() - start < 1.0
+
+
+# --- Per-conversation pseudonyms ---
+
+
+def test_pseudonymize_numbers_persons_stably():
+    pseudonyms: dict[str, str] = {}
+    first = pseudonymize("Herr Müller sprach mit Frau Schmidt.", pseudonyms)
+    second = pseudonymize("Später kam Herr  Müller allein (user@test.de).", pseudonyms)
+    assert first == "[PERSON_1] sprach mit [PERSON_2]."
+    assert second == "Später kam [PERSON_1] allein ([EMAIL])."
+    assert pseudonyms == {"Herr Müller": "[PERSON_1]", "Frau Schmidt": "[PERSON_2]"}
+
+
+def test_pseudonymize_keeps_existing_placeholders():
+    pseudonyms = {"Dr. Weber": "[PERSON_1]"}
+    assert pseudonymize("[PERSON_1] und Dr. Weber", pseudonyms) == "[PERSON_1] und [PERSON_1]"
+    assert pseudonymize("Frau Braun", pseudonyms) == "[PERSON_2]"
+
+
+# --- Streaming re-identification ---
+
+_MAP = {"Herr Müller": "[PERSON_1]", "Frau Schmidt": "[PERSON_2]"}
+
+
+def _stream(chunks: list[str]) -> str:
+    reid = StreamingReidentifier(_MAP)
+    return "".join(reid.feed(c) for c in chunks) + reid.flush()
+
+
+def test_reidentify_placeholder_split_at_every_boundary():
+    text = "[PERSON_1] und [PERSON_2] kamen; [PERSON_9] nicht [x]."
+    expected = "Herr Müller und Frau Schmidt kamen; [PERSON_9] nicht [x]."
+    for i in range(len(text) + 1):
+        for j in range(i, len(text) + 1):
+            assert _stream([text[:i], text[i:j], text[j:]]) == expected
+
+
+def test_reidentify_char_by_char_and_unfinished_tail():
+    assert _stream(list("Hallo [PERSON_2]!")) == "Hallo Frau Schmidt!"
+    assert _stream(["Ende [PERSON_"]) == "Ende [PERSON_"
+
+
+def test_reidentify_holds_back_at_most_one_placeholder():
+    reid = StreamingReidentifier(_MAP)
+    assert reid.feed("Text ohne Klammern") == "Text ohne Klammern"
+    assert reid.feed("a [PERS") == "a "
+    assert reid.feed("PECTIVE") == "[PERSPECTIVE"  # not a placeholder -> released immediately
+    assert reid.feed("[" + "1" * 50) == "[" + "1" * 50
+
+
+def test_reidentify_without_pseudonyms_is_passthrough():
+    reid = StreamingReidentifier({})
+    assert reid.feed("[PERS") == "[PERS"
+    assert reid.flush() == ""
+
+
+def test_reidentify_latency_per_token_is_constant():
+    """Extra work per streamed token does not grow with the length of the answer."""
+    tokens = ["Die", " Sitzung", " mit", " [PERS", "ON_1]", " verlief", " ruhig", "."]
+
+    def per_token_seconds(n_tokens: int) -> float:
+        reid = StreamingReidentifier({f"Name {i}": f"[PERSON_{i}]" for i in range(1, 200)})
+        stream = (tokens * (n_tokens // len(tokens) + 1))[:n_tokens]
+        start = time.perf_counter()
+        for t in stream:
+            reid.feed(t)
+        reid.flush()
+        return (time.perf_counter() - start) / n_tokens
+
+    short = min(per_token_seconds(1_000) for _ in range(3))
+    long = min(per_token_seconds(50_000) for _ in range(3))
+    assert long < short * 3
+    assert long < 50e-6  # budget: well under 50 µs per token
@@ -0,0 +1,30 @@
+"""Audit-log export formatting (no DB)."""
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.routers.admin import _audit_log_csv, _audit_log_ndjson, _audit_log_row
+
+
+def _row(action: str = "chat_message_sent"):
+    return _audit_log_row(
+        (uuid4(), "actor", uuid4(), datetime(2026, 10, 19, 12, tzinfo=timezone.utc), action,
+         "chat_with_ai", 10, 5, "gpt-4", None, "chat_message", uuid4())
+    )
+
+
+def test_ndjson_one_object_per_line():
+    rows = [_row(), _row("export_requested")]
+    lines = _audit_log_ndjson(rows).splitlines()
+    assert [json.loads(line)["action"] for line in lines] == ["chat_message_sent", "export_requested"]
+    assert json.loads(lines[0])["total_tokens"] == 15
+    assert _audit_log_ndjson([]) == ""
+
+
+def test_csv_header_only_once_and_roundtrips():
+    out = _audit_log_csv([], header=True) + _audit_log_csv([_row()]) + _audit_log_csv([_row('a,"quoted"')])
+    parsed = list(csv.DictReader(io.StringIO(out)))
+    assert [r["action"] for r in parsed] == ["chat_message_sent", 'a,"quoted"']
+    assert parsed[0]["model_version"] == "" and parsed[0]["timestamp"] == "2026-10-19T12:00:00+00:00"
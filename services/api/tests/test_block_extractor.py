@@ -1,7 +1,12 @@
 """Block extractor unit tests."""
+import random
+import re
+from typing import Any
+
 import pytest
 
-from app.services.block_extractor import extract_blocks
+from app.services.ai_rendering_service import SanitizedBlockStream, sanitize_block
+from app.services.block_extractor import ACTION_HEADER, ACTION_LINE, CONFIDENCE_LINE, LABEL_LINE, BlockStream, extract_blocks
 
 
 def test_extract_heading():
@@ -90,3 +95,281 @@ CONFIDENCE: 0.91"""
     assert "paragraph" in types
     assert "list" in types
     assert "action" in types
+
+
+# --- Incremental extraction (BlockStream) and equivalence with the previous implementation ---
+
+
+def _parse_action_block_reference(lines: list[str], start: int) -> tuple[dict[str, Any] | None, int]:
+    """
+    Try to parse action block. Returns (block_dict, next_line_index) or (None, start).
+    """
+    i = start
+    if i >= len(lines):
+        return None, start
+
+    # First line should be ### Recommended Action (already consumed by caller)
+    command: str | None = None
+    label: str | None = None
+    confidence: float = 0.0
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+        if stripped.startswith("#") and i > start:
+            break
+        if am := ACTION_LINE.match(stripped):
+            command = am.group(1).strip()
+        elif lb := LABEL_LINE.match(stripped):
+            label = lb.group(1).strip()
+        elif cf := CONFIDENCE_LINE.match(stripped):
+            try:
+                confidence = float(cf.group(1))
+            except ValueError:
+                pass
+        i += 1
+
+    if command and label:
+        return {
+            "type": "action",
+            "label": label,
+            "command": command,
+            "confidence": min(1.0, max(0.0, confidence)),
+        }, i
+    return None, start + 1
+
+
+def _extract_blocks_reference(markdown: str) -> list[dict[str, Any]]:
+    """Reference: the previous line loop (re.match with string patterns per check)."""
+    blocks: list[dict[str, Any]] = []
+    lines = markdown.split("\n")
+    i = 0
+    buffer: list[str] = []
+
+    def flush_paragraph():
+        nonlocal buffer
+        if buffer:
+            text = "\n".join(buffer).strip()
+            if text:
+                blocks.append({"type": "paragraph", "content": text})
+            buffer = []
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        # Empty line - flush paragraph
+        if not stripped:
+            flush_paragraph()
+            i += 1
+            continue
+
+        # Horizontal rule
+        if re.match(r"^[-*_]{3,}\s*$", stripped):
+            flush_paragraph()
+            blocks.append({"type": "divider", "content": ""})
+            i += 1
+            continue
+
+        # Action block: ### Recommended Action (must check before generic heading)
+        if ACTION_HEADER.match(stripped):
+            flush_paragraph()
+            action_block, next_i = _parse_action_block_reference(lines, i + 1)
+            if action_block:
+                blocks.append(action_block)
+                i = next_i
+                continue
+            i += 1
+            continue
+
+        # Heading
+        if m := re.match(r"^(#{1,6})\s+(.+)$", stripped):
+            flush_paragraph()
+            level = len(m.group(1))
+            blocks.append({"type": "heading", "content": m.group(2).strip(), "level": level})
+            i += 1
+            continue
+
+        # Blockquote
+        if stripped.startswith(">"):
+            flush_paragraph()
+            quote_lines = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                q = lines[i].strip()[1:].strip()
+                if q:
+                    quote_lines.append(q)
+                i += 1
+            if quote_lines:
+                blocks.append({"type": "quote", "content": "\n".join(quote_lines)})
+            continue
+
+        # Code block
+        if stripped.startswith("```"):
+            flush_paragraph()
+            lang = stripped[3:].strip() or ""
+            code_lines = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith("```"):
+                code_lines.append(lines[i])
+                i += 1
+            if i < len(lines):
+                i += 1
+            blocks.append({
+                "type": "code",
+                "content": "\n".join(code_lines),
+                "metadata": {"language": lang} if lang else {},
+            })
+            continue
+
+        # Table (simple: | a | b |)
+        if "|" in stripped and stripped.startswith("|"):
+            flush_paragraph()
+            table_rows = []
+            while i < len(lines) and "|" in lines[i]:
+                row = [c.strip() for c in lines[i].split("|")[1:-1]]
+                is_separator = row and all(re.match(r"^[-:]+$", c) for c in row)
+                if row and not is_separator:
+                    table_rows.append(row)
+                i += 1
+            if table_rows:
+                blocks.append({"type": "table", "content": "", "items": table_rows, "metadata": {}})
+            continue
+
+        # Unordered list
+        if re.match(r"^[-*+]\s+", stripped) or re.match(r"^\d+\.\s+", stripped):
+            flush_paragraph()
+            list_items = []
+            while i < len(lines):
+                li = lines[i]
+                um = re.match(r"^[-*+]\s+(.+)$", li.strip())
+                om = re.match(r"^(\d+)\.\s+(.+)$", li.strip())
+                if um:
+                    list_items.append(um.group(1))
+                    i += 1
+                elif om:
+                    list_items.append(om.group(2))
+                    i += 1
+                elif li.strip() and not li.strip().startswith("#"):
+                    break
+                else:
+                    break
+            if list_items:
+                blocks.append({"type": "list", "content": "", "items": list_items})
+            continue
+
+        # Regular paragraph line
+        buffer.append(line)
+        i += 1
+
+    flush_paragraph()
+    return blocks
+
+
+
+_LINES = [
+    "## Befund",
+    "# Titel",
+    "####### kein Heading",
+    "Die Patientin berichtet über Schlafstörungen.",
+    "  eingerückter Text  ",
+    "",
+    "",
+    "---",
+    "***",
+    "- Punkt eins",
+    "* Punkt zwei",
+    "1. Schritt",
+    "> Zitat",
+    ">",
+    "| A | B |",
+    "| --- | --- |",
+    "| 1 | 2 |",
+    "Text mit | Pipe",
+    "```python",
+    "```",
+    "x = 1",
+    "### Recommended Action",
+    "ACTION: open_queue_enterprise",
+    "LABEL: Review Enterprise Leads",
+    "CONFIDENCE: 0.91",
+    "CONFIDENCE: 1.5",
+    "#recommended   action",
+    "#ohne Leerzeichen",
+    "-kein Punkt",
+    "1.kein Schritt",
+    "**fett**",
+    "- - -",
+    "  | eingerückt |",
+    "|:--|--:|",
+]
+
+
+def _stream(markdown: str, cuts: list[int]) -> list[dict]:
+    stream = BlockStream()
+    blocks = []
+    prev = 0
+    for cut in [*cuts, len(markdown)]:
+        blocks += stream.feed(markdown[prev:cut])
+        prev = cut
+    return blocks + stream.close()
+
+
+def test_block_stream_matches_extract_blocks_on_random_markdown():
+    rng = random.Random(7)
+    for _ in range(1000):
+        md = "\n".join(rng.choice(_LINES) for _ in range(rng.randint(1, 30)))
+        if rng.random() < 0.3:
+            md += "\n"
+        cuts = sorted(rng.sample(range(len(md) + 1), min(len(md) + 1, rng.randint(0, 12))))
+        expected = _extract_blocks_reference(md)
+        assert extract_blocks(md) == expected, md
+        assert _stream(md, cuts) == expected, md
+
+
+def test_block_stream_char_by_char():
+    md = "## Weekly\n\nText **bold**.\n\n- a\n- b\n\n```\ncode\n```\n| A |\n|---|\n\n### Recommended Action\nACTION: x\nLABEL: y\n\n## End"
+    assert _stream(md, list(range(1, len(md)))) == extract_blocks(md)
+
+
+def test_block_stream_emits_blocks_as_soon_as_they_close():
+    stream = BlockStream()
+    assert stream.feed("## Befu") == []
+    assert stream.feed("nd\n") == [{"type": "heading", "content": "Befund", "level": 2}]
+    assert stream.feed("- a\n- b\n") == []  # list may continue
+    assert stream.feed("\nWeiter") == [{"type": "list", "content": "", "items": ["a", "b"]}]
+    assert stream.feed("\n```py\nx = 1\n") == [{"type": "paragraph", "content": "Weiter"}]
+    assert stream.feed("```\n") == [{"type": "code", "content": "x = 1", "metadata": {"language": "py"}}]
+    assert stream.close() == []
+
+
+def test_block_stream_action_block_without_label_is_parsed_as_markdown():
+    md = "### Recommended Action\nACTION: x\n- item\n## Next"
+    assert _stream(md, [10, 30]) == extract_blocks(md)
+    assert [b["type"] for b in extract_blocks(md)] == ["paragraph", "list", "heading"]
+
+
+# --- Sanitized block stream (SSE) ---
+
+
+def test_sanitize_block_strips_tags_and_rejects_scripts():
+    assert sanitize_block({"type": "paragraph", "content": "Ende <b>gut</b>."}) == {
+        "type": "paragraph",
+        "content": "Ende gut.",
+    }
+    assert sanitize_block({"type": "paragraph", "content": "<script>alert(1)</script>"}) is None
+    assert sanitize_block({"type": "list", "content": "", "items": ["a <i>b</i>", "[x](javascript:alert(1))"]}) is None
+    assert sanitize_block({"type": "table", "content": "", "items": [["<u>a</u>", "b"]], "metadata": {}})["items"] == [
+        ["a", "b"]
+    ]
+    assert sanitize_block({"type": "paragraph", "content": "<br>"}) is None
+
+
+def test_sanitized_block_stream_drops_script_split_across_chunks():
+    stream = SanitizedBlockStream()
+    chunks = ["Hallo.\n\n<scr", "ipt>alert(1)</sc", "ript>\n\nEnde <b>gut</b>.\n"]
+    streamed = [b for c in chunks for b in stream.feed(c)] + stream.close()
+    assert streamed == [{"type": "paragraph", "content": "Hallo."}, {"type": "paragraph", "content": "Ende gut."}]
+    assert stream.blocks == streamed
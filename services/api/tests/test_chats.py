@@ -1,5 +1,8 @@
 """Chat API smoke tests. Requires DB; Azure OpenAI mocked or skipped."""
+import json
+
 import pytest
+from unittest.mock import PropertyMock, patch
 from httpx import ASGITransport, AsyncClient
 
 from app.main import app
@@ -30,7 +33,20 @@ async def test_list_chats(client):
     r = await client.get("/chats")
     assert r.status_code == 200
     data = r.json()
-    assert isinstance(data, list)
+    assert isinstance(data["items"], list)
+    assert "next_cursor" in data
+
+
+@pytest.mark.asyncio
+async def test_list_chats_keyset_pages(client):
+    ids = [(await client.post("/chats", json={"title": f"Page {i}"})).json()["id"] for i in range(3)]
+    first = (await client.get("/chats?limit=2")).json()
+    assert [c["id"] for c in first["items"]] == ids[::-1][:2]
+    assert first["next_cursor"]
+    second = (await client.get("/chats", params={"limit": 2, "cursor": first["next_cursor"]})).json()
+    assert second["items"][0]["id"] == ids[0]
+    assert (await client.get("/chats?cursor=bogus")).status_code == 400
+    assert (await client.get("/chats?limit=1000")).status_code == 422
 
 
 @pytest.mark.asyncio
@@ -232,3 +248,172 @@ async def test_send_message_finalized_chat_rejected(client):
         json={"assist_mode_key": "CHAT_WITH_AI", "user_message": "Hello"},
     )
     assert r.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_send_message_history_uses_stable_pseudonyms(client):
+    """Whole history goes to the LLM pseudonymized, with the same placeholder per person across turns."""
+    from app.config import Settings
+
+    create = await client.post("/chats", json={"title": "Pseudonym Test"})
+    assert create.status_code == 200
+    chat_id = create.json()["id"]
+    sent: list[list[dict]] = []
+
+    async def fake_stream_chat(*, system_prompt, messages, deployment=None):
+        sent.append([dict(m) for m in messages])
+        yield ("Notiert.", None)
+        yield (None, {"prompt_tokens": 10, "completion_tokens": 2})
+
+    with patch("app.routers.chats.stream_chat", fake_stream_chat), patch.object(
+        Settings, "azure_openai_configured", new_callable=PropertyMock, return_value=True
+    ):
+        for msg in ("Herr Müller berichtet von Frau Schmidt.", "Herr Müller schläft schlecht."):
+            r = await client.post(
+                f"/chats/{chat_id}/messages",
+                json={"assist_mode_key": "CHAT_WITH_AI", "user_message": msg},
+            )
+            assert r.status_code == 200
+            assert "event: done" in r.text
+
+    assert sent[1][0]["content"] == "[PERSON_1] berichtet von [PERSON_2]."
+    assert sent[1][-1]["content"] == "[PERSON_1] schläft schlecht."
+    assert all("Müller" not in m["content"] for m in sent[1])
+
+    # Stored messages keep the original wording
+    get_r = await client.get(f"/chats/{chat_id}")
+    assert get_r.json()["messages"][0]["content"] == "Herr Müller berichtet von Frau Schmidt."
+
+
+@pytest.mark.asyncio
+async def test_send_message_streams_reidentified_names(client):
+    """Placeholders in the model output are mapped back, even when split across chunks."""
+    from app.config import Settings
+
+    create = await client.post("/chats", json={"title": "Reidentify Test"})
+    assert create.status_code == 200
+    chat_id = create.json()["id"]
+
+    async def fake_stream_chat(*, system_prompt, messages, deployment=None):
+        for chunk in ("[PERS", "ON_1] wirkt", " müde."):
+            yield (chunk, None)
+        yield (None, {"prompt_tokens": 10, "completion_tokens": 3})
+
+    with patch("app.routers.chats.stream_chat", fake_stream_chat), patch.object(
+        Settings, "azure_openai_configured", new_callable=PropertyMock, return_value=True
+    ):
+        r = await client.post(
+            f"/chats/{chat_id}/messages",
+            json={"assist_mode_key": "CHAT_WITH_AI", "user_message": "Frau Braun kam heute."},
+        )
+    assert r.status_code == 200
+    assert "[PERS" not in r.text
+    assert "Frau Braun wirkt" in r.text
+    # Structured block of the re-identified text, before the done event
+    block_event = 'event: block\ndata: {"index": 0, "block": {"type": "paragraph", "content": "Frau Braun wirkt m'
+    assert block_event in r.text
+    assert r.text.index(block_event) < r.text.index("event: done")
+
+    get_r = await client.get(f"/chats/{chat_id}")
+    assert get_r.json()["messages"][-1]["content"] == "Frau Braun wirkt müde."
+    # Blocks are rendered once at insert; user messages have none
+    assert get_r.json()["messages"][-1]["blocks"] == [{"type": "paragraph", "content": "Frau Braun wirkt müde."}]
+    assert get_r.json()["messages"][-2]["blocks"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_chat_pages_messages_backwards(client):
+    """GET /chats/{id} returns the newest messages; older ones are paged by seq cursor."""
+    from app.config import Settings
+
+    chat_id = (await client.post("/chats", json={"title": "Message Paging"})).json()["id"]
+
+    async def fake_stream_chat(*, system_prompt, messages, deployment=None):
+        yield ("Antwort.", None)
+        yield (None, {"prompt_tokens": 5, "completion_tokens": 1})
+
+    with patch("app.routers.chats.stream_chat", fake_stream_chat), patch.object(
+        Settings, "azure_openai_configured", new_callable=PropertyMock, return_value=True
+    ):
+        for text in ("Erste Frage.", "Zweite Frage."):
+            r = await client.post(
+                f"/chats/{chat_id}/messages",
+                json={"assist_mode_key": "CHAT_WITH_AI", "user_message": text},
+            )
+            assert r.status_code == 200
+
+    data = (await client.get(f"/chats/{chat_id}?limit=3")).json()
+    assert [m["content"] for m in data["messages"]] == ["Antwort.", "Zweite Frage.", "Antwort."]
+    assert [m["seq"] for m in data["messages"]] == sorted(m["seq"] for m in data["messages"])
+    assert data["messages_next_cursor"]
+    assert data["first_message_at"] < data["messages"][0]["created_at"]
+
+    older = await client.get(f"/chats/{chat_id}/messages", params={"cursor": data["messages_next_cursor"]})
+    assert older.status_code == 200
+    assert [m["content"] for m in older.json()["items"]] == ["Erste Frage."]
+    assert older.json()["next_cursor"] is None
+    assert (await client.get(f"/chats/{chat_id}/messages?cursor=bogus")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_chat_counters_follow_messages(client):
+    """Message count, tokens, timestamps and preview are kept on the chat by the write path."""
+    from app.config import Settings
+
+    chat_id = (await client.post("/chats", json={"title": "Counters"})).json()["id"]
+
+    async def fake_stream_chat(*, system_prompt, messages, deployment=None):
+        yield ("Kurze Antwort.", None)
+        yield (None, {"prompt_tokens": 7, "completion_tokens": 2})
+
+    with patch("app.routers.chats.stream_chat", fake_stream_chat), patch.object(
+        Settings, "azure_openai_configured", new_callable=PropertyMock, return_value=True
+    ):
+        r = await client.post(
+            f"/chats/{chat_id}/messages",
+            json={"assist_mode_key": "CHAT_WITH_AI", "user_message": "Eine Frage."},
+        )
+        assert r.status_code == 200
+
+    data = (await client.get(f"/chats/{chat_id}")).json()
+    assert data["total_tokens_in_session"] == 9
+    assert data["first_message_at"] == data["messages"][0]["created_at"]
+    assert data["last_message_at"] == data["messages"][-1]["created_at"]
+
+    summary = next(c for c in (await client.get("/chats")).json()["items"] if c["id"] == chat_id)
+    assert summary["message_count"] == 2
+    assert summary["last_message_preview"] == "Kurze Antwort."
+    assert summary["last_message_at"] == data["last_message_at"]
+
+
+@pytest.mark.asyncio
+async def test_send_message_streams_sanitized_blocks_equal_to_stored(client):
+    """Block events never carry raw HTML / script content and equal the blocks stored with the message."""
+    from app.config import Settings
+
+    chat_id = (await client.post("/chats", json={"title": "Sanitized Blocks"})).json()["id"]
+
+    async def fake_stream_chat(*, system_prompt, messages, deployment=None):
+        for chunk in ("Hallo.\n\n<scr", "ipt>alert(1)</script>\n\n", "Ende <b>gut</b>."):
+            yield (chunk, None)
+        yield (None, {"prompt_tokens": 5, "completion_tokens": 4})
+
+    with patch("app.routers.chats.stream_chat", fake_stream_chat), patch.object(
+        Settings, "azure_openai_configured", new_callable=PropertyMock, return_value=True
+    ):
+        r = await client.post(
+            f"/chats/{chat_id}/messages",
+            json={"assist_mode_key": "CHAT_WITH_AI", "user_message": "Bitte antworten."},
+        )
+    assert r.status_code == 200
+    events = [
+        json.loads(frame.split("\ndata: ", 1)[1])
+        for frame in r.text.split("\n\n")
+        if frame.startswith("event: block\n")
+    ]
+    streamed = [e["block"] for e in sorted(events, key=lambda e: e["index"])]
+    assert "script" not in json.dumps(streamed)
+    assert streamed == [{"type": "paragraph", "content": "Hallo."}, {"type": "paragraph", "content": "Ende gut."}]
+
+    stored = (await client.get(f"/chats/{chat_id}")).json()["messages"][-1]["blocks"]
+    assert stored == streamed
@@ -0,0 +1,70 @@
+"""Event store payload helpers (no DB)."""
+from uuid import uuid4
+
+from app.services.event_store import (
+    ai_response_created_payload,
+    content_hash,
+    hydrate_ai_response_created,
+)
+
+MARKDOWN = "## Befund\n\nDie Patientin berichtet über **Schlafstörungen**."
+BLOCKS = [{"type": "heading", "content": "Befund", "level": 2}, {"type": "paragraph", "content": "..."}]
+
+
+def test_reference_payload_holds_no_content():
+    payload = ai_response_created_payload(uuid4(), MARKDOWN, "gpt-4", 0.9, 3)
+    assert "raw_markdown" not in payload and "structured_blocks" not in payload
+    assert payload["raw_markdown_sha256"] == content_hash(MARKDOWN)
+
+
+def test_hydrated_payload_equals_full_payload():
+    response_id = uuid4()
+    full = {
+        "raw_markdown": MARKDOWN,
+        "structured_blocks": BLOCKS,
+        "model": "gpt-4",
+        "confidence": 0.9,
+        "version": 3,
+        "response_id": str(response_id),
+    }
+    reference = ai_response_created_payload(response_id, MARKDOWN, "gpt-4", 0.9, 3)
+    assert hydrate_ai_response_created(reference, MARKDOWN, BLOCKS) == full
+
+
+def test_hydrate_rejects_changed_content():
+    reference = ai_response_created_payload(uuid4(), MARKDOWN, "gpt-4", 0.9, 1)
+    assert hydrate_ai_response_created(reference, MARKDOWN + " geändert", BLOCKS) is None
+
+
+def test_enqueue_event_buffers_on_session_in_order():
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.services.event_store import _OUTBOX, enqueue_event
+
+    session = AsyncSession()
+    tenant_id = uuid4()
+    ids = [
+        enqueue_event(session, tenant_id, actor="u", entity_type="doc", entity_id="1", event_type=f"doc.e{i}", payload={"i": i})
+        for i in range(3)
+    ]
+    buffered = session.info[_OUTBOX]
+    assert [e["event_id"] for _, e in buffered] == ids
+    assert [e["event_type"] for _, e in buffered] == ["doc.e0", "doc.e1", "doc.e2"]
+    assert all(t == tenant_id for t, _ in buffered)
+
+
+def test_insert_params_column_arrays():
+    from app.services.event_store import _insert_params
+
+    events = [
+        {"event_id": uuid4(), "actor": "u", "entity_type": "doc", "entity_id": "1",
+         "event_type": "doc.created", "payload": {"ü": "ä", "n": [1, 2]}},
+        {"event_id": uuid4(), "actor": "ai_model", "entity_type": "doc", "entity_id": "2",
+         "event_type": "doc.generated", "payload": {}, "confidence": 0.5, "model": "gpt-4", "schema_version": "2"},
+    ]
+    params = _insert_params(uuid4(), events)
+    assert params["payloads"] == ['{"ü":"ä","n":[1,2]}', "{}"]
+    assert params["sources"] == ["praxis-pilot-api", "praxis-pilot-api"]
+    assert params["schema_versions"] == ["1", "2"]
+    assert params["confidences"] == [None, 0.5]
+    assert params["models"] == [None, "gpt-4"]
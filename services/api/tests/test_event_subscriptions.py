@@ -0,0 +1,41 @@
+"""Event subscription cursors and NOTIFY fan-out (no DB)."""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services.event_subscriptions import Cursor, EventNotifier, wait_for
+
+
+def test_cursor_roundtrip():
+    cursor = Cursor(datetime(2026, 10, 19, 12, 30, 5, 123456, tzinfo=timezone.utc), str(uuid4()))
+    assert Cursor.decode(cursor.encode()) == cursor
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["", "2026-10-19T12:00:00+00:00", "2026-10-19T12:00:00|" + str(uuid4()), "not-a-date|" + str(uuid4()), "2026-10-19T12:00:00+00:00|x"],
+)
+def test_cursor_decode_rejects_malformed(value):
+    with pytest.raises(ValueError):
+        Cursor.decode(value)
+
+
+@pytest.mark.asyncio
+async def test_notifier_wakes_only_the_notified_tenant():
+    notifier = EventNotifier("postgresql://127.0.0.1:1/unused")  # no DB: subscribers fall back to polling
+    tenant_a, tenant_b = uuid4(), uuid4()
+    async with notifier.listen(tenant_a) as woken_a, notifier.listen(tenant_b) as woken_b:
+        notifier._on_notify(None, 0, "domain_events", str(tenant_a))
+        assert woken_a.is_set()
+        assert not woken_b.is_set()
+    assert notifier._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_wait_for_times_out():
+    notifier = EventNotifier("postgresql://127.0.0.1:1/unused")
+    async with notifier.listen(uuid4()) as woken:
+        assert await wait_for(woken, 0.01) is False
+        woken.set()
+        assert await wait_for(woken, 0.01) is True
@@ -93,7 +93,7 @@ async def test_assign_chat_to_folder(client):
 
     list_r = await client.get(f"/chats?folder_id={folder_id}")
     assert list_r.status_code == 200
-    chats = list_r.json()
+    chats = list_r.json()["items"]
     assert any(c["id"] == chat_id for c in chats)
 
 
@@ -102,7 +102,7 @@ async def test_list_chats_unfiled_only(client):
     r = await client.get("/chats?unfiled_only=true")
     assert r.status_code == 200
     data = r.json()
-    assert isinstance(data, list)
+    assert isinstance(data["items"], list)
 
 
 @pytest.mark.asyncio
@@ -128,7 +128,7 @@ async def test_unassign_chat_from_folder(client):
 
     list_r = await client.get("/chats?unfiled_only=true")
     assert list_r.status_code == 200
-    assert any(c["id"] == chat_id for c in list_r.json())
+    assert any(c["id"] == chat_id for c in list_r.json()["items"])
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,79 @@
+"""KPI day-slice cache and folding (no DB)."""
+from datetime import date, datetime
+from uuid import uuid4
+
+from app.services.kpi_cache import (
+    DaySlice,
+    KPICache,
+    bucket_of,
+    bucket_slices,
+    cached_days,
+    merge_slices,
+)
+
+
+def _usage(requests: int, tokens: int, mode: str | None = "chat_with_ai") -> DaySlice:
+    day_slice = DaySlice()
+    day_slice.add_usage(mode, "gpt-4", None, requests, tokens, 0)
+    return day_slice
+
+
+def test_cached_days_exclude_partial_first_and_open_days():
+    from_ts, now = datetime(2026, 9, 19, 10, 30), datetime(2026, 10, 19, 10, 30)
+    assert cached_days(from_ts, now, now) == (date(2026, 9, 20), date(2026, 10, 18))
+
+
+def test_cached_days_wait_for_grace_after_midnight():
+    now = datetime(2026, 10, 19, 0, 5)
+    assert cached_days(datetime(2026, 10, 1), now, now) == (date(2026, 10, 1), date(2026, 10, 17))
+
+
+def test_cached_days_none_for_short_ranges():
+    now = datetime(2026, 10, 19, 10, 30)
+    assert cached_days(datetime(2026, 10, 18, 12), now, now) is None
+
+
+def test_merge_slices_does_not_modify_inputs():
+    a, b = _usage(2, 100), _usage(1, 50, mode=None)
+    total = merge_slices([a, b])
+    assert (total.request_count, total.input_tokens) == (3, 150)
+    assert total.assist_modes == {"chat_with_ai": [2, 100], None: [1, 50]}
+    assert a.request_count == 2 and a.assist_modes == {"chat_with_ai": [2, 100]}
+
+
+def test_bucket_of_matches_date_trunc():
+    day = date(2026, 10, 22)  # Thursday
+    assert bucket_of(day, "day") == day
+    assert bucket_of(day, "week") == date(2026, 10, 19)
+    assert bucket_of(day, "month") == date(2026, 10, 1)
+    assert bucket_of(day, "year") == date(2026, 1, 1)
+
+
+def test_bucket_slices_merges_days_in_order():
+    slices = {date(2026, 10, 2): _usage(1, 10), date(2026, 9, 30): _usage(2, 20), date(2026, 10, 1): _usage(3, 30)}
+    buckets = bucket_slices(slices, "month")
+    assert [(b, s.request_count) for b, s in buckets] == [(date(2026, 9, 1), 2), (date(2026, 10, 1), 4)]
+
+
+def test_cache_lru_and_stats():
+    cache = KPICache(max_entries=2)
+    tenant = uuid4()
+    for d in (1, 2, 3):
+        cache.put(tenant, None, date(2026, 10, d), _usage(d, d))
+    assert cache.get(tenant, None, date(2026, 10, 1)) is None
+    assert cache.get(tenant, None, date(2026, 10, 3)).request_count == 3
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1 and cache.stats()["hit_rate"] == 0.5
+
+
+def test_cache_generation_change_drops_tenant_only():
+    cache = KPICache(max_entries=10)
+    tenant, other = uuid4(), uuid4()
+    cache.sync_generation(tenant, 0)
+    cache.put(tenant, None, date(2026, 10, 1), _usage(1, 1))
+    cache.put(other, None, date(2026, 10, 1), _usage(1, 1))
+    cache.sync_generation(tenant, 0)
+    assert cache.get(tenant, None, date(2026, 10, 1)) is not None
+    cache.sync_generation(tenant, 1)
+    assert cache.get(tenant, None, date(2026, 10, 1)) is None
+    assert cache.get(other, None, date(2026, 10, 1)) is not None
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,27 @@
+"""KPI rollup range splitting (no DB)."""
+from datetime import datetime
+
+from app.services.kpi_rollups import ceil_hour, floor_hour, hour_bounds, range_params
+
+
+def test_hour_rounding():
+    ts = datetime(2026, 10, 19, 12, 30, 5)
+    assert floor_hour(ts) == datetime(2026, 10, 19, 12)
+    assert ceil_hour(ts) == datetime(2026, 10, 19, 13)
+    assert ceil_hour(datetime(2026, 10, 19, 12)) == datetime(2026, 10, 19, 12)
+
+
+def test_hour_bounds_cover_whole_hours_only():
+    from_hour, to_hour = hour_bounds(datetime(2026, 9, 19, 12, 30), datetime(2026, 10, 19, 12, 30))
+    assert (from_hour, to_hour) == (datetime(2026, 9, 19, 13), datetime(2026, 10, 19, 12))
+
+
+def test_hour_bounds_short_range_reads_raw_only():
+    from_hour, to_hour = hour_bounds(datetime(2026, 10, 19, 12, 10), datetime(2026, 10, 19, 12, 50))
+    assert from_hour == to_hour
+
+
+def test_range_params():
+    params = range_params(datetime(2026, 10, 19, 10, 0), datetime(2026, 10, 19, 12, 0))
+    assert params["from_hour"] == datetime(2026, 10, 19, 10)
+    assert params["to_hour"] == datetime(2026, 10, 19, 12)
@@ -1,4 +1,8 @@
 """Markdown sanitizer unit tests."""
+import random
+import re
+import time
+
 import pytest
 
 from app.services.markdown_sanitizer import sanitize_markdown
@@ -39,3 +43,113 @@ def test_sanitize_rejects_non_string():
     r = sanitize_markdown(123)  # type: ignore
     assert r.failed
     assert "string" in (r.reason or "").lower()
+
+
+# --- Single-pass tokenizer: equivalence with the previous regex passes, linear time ---
+
+
+def _sanitize_sequential(raw: str):
+    """Reference: the previous implementation (one search/sub per pattern, in order)."""
+    flags = re.DOTALL | re.IGNORECASE
+    if re.search(r"<script[^>]*>.*?</script>", raw, flags):
+        return ("", True, "Script tag detected")
+    if re.search(r"<iframe[^>]*>.*?</iframe>", raw, flags):
+        return ("", True, "Iframe detected")
+    text = re.sub(r'\s+style\s*=\s*["\'][^"\']*["\']', "", raw, flags=re.IGNORECASE)
+    text = re.sub(r"\s+on\w+\s*=\s*['\"][^'\"]*['\"]", "", text, flags=re.IGNORECASE)
+    if re.search(r"javascript:", text, re.IGNORECASE):
+        return ("", True, "javascript: URI detected")
+    if re.search(r"data:\s*text/html", text, re.IGNORECASE):
+        return ("", True, "data: text/html URI detected")
+    return (re.sub(r"<[^>]+>", "", text).strip(), False, None)
+
+
+_FRAGMENTS = [
+    "## Befund",
+    "**Schlafstörungen**",
+    "*Grübeln*",
+    "- Punkt",
+    "1. Schritt",
+    "> Zitat",
+    "| a | b |",
+    "---",
+    "```python\nx = 1\n```",
+    "a < b",
+    "x > y",
+    "<br>",
+    "<b>fett</b>",
+    '<span style="color:red">rot</span>',
+    "<div STYLE = 'margin:0'>",
+    "<a href='https://example.org' onclick=\"track()\">Link</a>",
+    '<img src="x.png" onerror="x()">',
+    "<p>",
+    "</p>",
+    "<>",
+    "<script>",
+    "</iframe>",
+    "[Link](https://example.org)",
+    "javascript:alert(1)",
+    "data:text/html,x",
+    "<script>alert(1)</script>",
+    "<iframe src='x'></iframe>",
+]
+_SEPARATORS = [" ", "\n", "\n\n", "  ", "\t", ""]
+
+
+def _random_markdown(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 25)):
+        parts.append(rng.choice(_FRAGMENTS))
+        parts.append(rng.choice(_SEPARATORS))
+    return "".join(parts)
+
+
+def test_sanitize_matches_sequential_on_fixed_cases():
+    cases = [
+        "## Hello\n**bold** and *italic*",
+        "Hello <script>alert(1)</script> world",
+        "Hello <iframe src='x'></iframe> world",
+        'Hello <span style="color:red">x</span>',
+        "Link [x](javascript:alert(1))",
+        '<a href="data: text/html;base64,xx">x</a>',
+        "<SCRIPT type='x'>\nalert(1)\n</Script>",
+        "only an opener <script> and text",
+        "a < b and c > d",
+        "",
+        "   \n  ",
+    ]
+    for raw in cases:
+        assert tuple(sanitize_markdown(raw)) == _sanitize_sequential(raw), raw
+
+
+def test_sanitize_matches_sequential_on_random_markdown():
+    rng = random.Random(1234)
+    for _ in range(500):
+        raw = _random_markdown(rng)
+        assert tuple(sanitize_markdown(raw)) == _sanitize_sequential(raw), raw
+
+
+def test_sanitize_rejects_uri_split_by_stripped_tag():
+    # Previously passed: tags were stripped after the URI check, leaving "javascript:" in the output
+    r = sanitize_markdown("[x](java<b></b>script:alert(1))")
+    assert r.failed
+    assert "javascript" in (r.reason or "").lower()
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "<script>" * 25_000,
+        "<iframe " * 25_000,
+        "<" * 200_000,
+        " " * 200_000 + "x",
+        ' style="' * 25_000,
+        " onclick='" * 20_000,
+        "<a" + " style=" * 25_000,
+    ],
+    ids=["script-openers", "iframe-openers", "lt-run", "space-run", "style-unterminated", "onevent-unterminated", "open-tag"],
+)
+def test_sanitize_linear_on_pathological_input(raw):
+    started = time.perf_counter()
+    sanitize_markdown(raw)
+    assert time.perf_counter() - started < 1.0
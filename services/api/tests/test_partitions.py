@@ -0,0 +1,53 @@
+"""Monthly partition planning (no DB)."""
+from datetime import date
+
+from app.services.partitions import (
+    add_months,
+    expired_months,
+    legacy_expired,
+    months_to_create,
+    partition_month,
+    partition_name,
+)
+
+
+def test_partition_name_roundtrip():
+    assert partition_name("domain_events", date(2026, 3, 1)) == "domain_events_y2026m03"
+    assert partition_month("domain_events", "domain_events_y2026m03") == date(2026, 3, 1)
+    assert partition_month("domain_events", "domain_events_default") is None
+    assert partition_month("domain_events", "archive_domain_events_y2026m03") is None
+
+
+def test_partition_month_is_scoped_to_parent():
+    assert partition_month("audit_logs", "llm_audit_logs_y2026m03") is None
+    assert partition_month("llm_audit_logs", "llm_audit_logs_y2026m03") == date(2026, 3, 1)
+    assert partition_month("usage_records", "usage_records_legacy") is None
+
+
+def test_add_months_across_years():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_months_to_create_fills_gaps_ahead():
+    existing = [date(2026, 10, 1), date(2026, 12, 1)]
+    assert months_to_create(existing, date(2026, 10, 19), 3) == [date(2026, 11, 1), date(2027, 1, 1)]
+
+
+def test_months_to_create_skips_months_covered_by_legacy():
+    existing = [date(2026, 12, 1), date(2027, 1, 1)]
+    assert months_to_create(existing, date(2026, 10, 19), 3, legacy=True) == []
+    assert months_to_create(existing, date(2026, 11, 19), 3, legacy=True) == [date(2027, 2, 1)]
+
+
+def test_expired_months_keeps_retention_window():
+    existing = [date(2025, m, 1) for m in range(1, 13)] + [date(2026, 1, 1)]
+    assert expired_months(existing, date(2026, 1, 15), 6) == [date(2025, m, 1) for m in range(1, 7)]
+    assert expired_months(existing, date(2026, 1, 15), 0) == []
+
+
+def test_legacy_expires_with_its_newest_month():
+    existing = [date(2026, 12, 1), date(2027, 1, 1)]  # legacy holds everything before 2026-12
+    assert not legacy_expired(existing, date(2027, 5, 15), 6)
+    assert legacy_expired(existing, date(2027, 6, 1), 6)
+    assert not legacy_expired(existing, date(2030, 1, 1), 0)
@@ -0,0 +1,110 @@
+"""Projection apply functions and snapshots (no DB): snapshot + tail equals full replay."""
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from app.services import projections
+from app.services.projections import CHAT, STRUCTURED_DOCUMENT, project, replay
+
+
+def _event(event_type: str, ts: str, **payload) -> dict:
+    return {"event_type": event_type, "timestamp": ts, "payload": payload}
+
+
+CHAT_EVENTS = [
+    _event("chat.folder_changed", "2026-01-01T10:00:00+00:00", chat_id="c1", old_folder_id=None, new_folder_id="f1"),
+    _event("chat.folder_changed", "2026-02-01T10:00:00+00:00", chat_id="c1", old_folder_id="f1", new_folder_id="f2"),
+    _event("chat.finalized", "2026-03-01T10:00:00+00:00", chat_id="c1"),
+]
+
+
+def test_chat_projection():
+    state = replay(CHAT, CHAT.initial("c1"), CHAT_EVENTS)
+    assert state == {"chat_id": "c1", "folder_id": "f2", "status": "finalized", "finalized_at": "2026-03-01T10:00:00+00:00"}
+
+
+def test_snapshot_plus_tail_equals_full_replay():
+    for split in range(len(CHAT_EVENTS) + 1):
+        snapshot = replay(CHAT, CHAT.initial("c1"), CHAT_EVENTS[:split])
+        assert replay(CHAT, snapshot, CHAT_EVENTS[split:]) == replay(CHAT, CHAT.initial("c1"), CHAT_EVENTS)
+
+
+def test_apply_does_not_mutate_snapshot():
+    snapshot = CHAT.initial("c1")
+    replay(CHAT, snapshot, CHAT_EVENTS)
+    assert snapshot == CHAT.initial("c1")
+
+
+def test_structured_document_projection():
+    events = [
+        _event("structured_document.created", "t1", document_id="d1", conversation_id="c1", version=1),
+        _event("structured_document.generated", "t2", document_id="d1", conversation_id="c1", version=1),
+        _event("structured_document.updated", "t3", document_id="d1", conversation_id="c1", version=2),
+        _event("structured_document.validation_failed", "t4", conversation_id="c1", reason="invalid_json"),
+    ]
+    state = replay(STRUCTURED_DOCUMENT, STRUCTURED_DOCUMENT.initial("d1"), events)
+    assert state == {"document_id": "d1", "conversation_id": "c1", "version": 2, "generated_count": 1}
+
+
+class _FakeEventStore:
+    """domain_events of one chat with commit visibility, and entity_snapshots, for project()."""
+
+    def __init__(self):
+        self.events: list[tuple[dict, bool]] = []  # (event, committed)
+        self.snapshot = None
+
+    def add(self, event_type: str, ts: str, committed: bool = True, **payload) -> dict:
+        event = {**_event(event_type, ts, chat_id="c1", **payload), "event_id": str(uuid4())}
+        self.events.append((event, committed))
+        return event
+
+    def commit(self, event: dict) -> None:
+        self.events = [(e, committed or e is event) for e, committed in self.events]
+
+    async def settled_horizon(self, session):
+        open_ts = [datetime.fromisoformat(e["timestamp"]) for e, committed in self.events if not committed]
+        return min(open_ts, default=datetime.fromisoformat("2100-01-01T00:00:00+00:00"))
+
+    async def read_events(self, session, tenant_id, *, after=None, after_event_id=None, before=None, limit, **_):
+        visible = sorted(
+            (e for e, committed in self.events if committed),
+            key=lambda e: (e["timestamp"], e["event_id"]),
+        )
+        out = []
+        for e in visible:
+            ts = datetime.fromisoformat(e["timestamp"])
+            if after is not None and (ts, e["event_id"]) <= (after, after_event_id or ""):
+                continue
+            if before is not None and ts >= before:
+                continue
+            out.append(e)
+        return out[:limit]
+
+    async def load_snapshot(self, session, tenant_id, projection, entity_id):
+        return self.snapshot or (projection.initial(entity_id), None, None, 0)
+
+    async def save_snapshot(self, session, tenant_id, projection, entity_id, state, ts, event_id, count):
+        self.snapshot = (state, ts, event_id, count)
+
+
+def test_snapshot_never_skips_event_committed_late_with_older_timestamp(monkeypatch):
+    store = _FakeEventStore()
+    for name in ("settled_horizon", "read_events"):
+        monkeypatch.setattr(projections, name, getattr(store, name))
+    monkeypatch.setattr(projections, "_load_snapshot", store.load_snapshot)
+    monkeypatch.setattr(projections, "_save_snapshot", store.save_snapshot)
+
+    def current() -> dict:
+        return asyncio.run(project(None, uuid4(), CHAT, "c1", snapshot_every=1))
+
+    store.add("chat.folder_changed", "2026-01-01T10:00:00+00:00", new_folder_id="f1")
+    finalized = store.add("chat.finalized", "2026-01-01T10:00:01+00:00", committed=False)  # transaction still open
+    store.add("chat.folder_changed", "2026-01-01T10:00:02+00:00", new_folder_id="f2")
+
+    assert current()["folder_id"] == "f2"  # unsettled tail is part of the returned state ...
+    assert store.snapshot[0]["folder_id"] == "f1"  # ... but the snapshot stops before the open transaction
+
+    store.commit(finalized)
+    state = current()
+    assert state["status"] == "finalized" and state["folder_id"] == "f2"
+    assert store.snapshot[0] == state and store.snapshot[3] == 3
@@ -0,0 +1,91 @@
+"""Columnar usage analytics: aggregation and bounded tables (no DB)."""
+from datetime import datetime
+
+from app.services.usage_analytics import Columns, Dictionary, NewestRows, TenantTable, aggregate, epoch
+
+MON_10H = epoch(datetime(2026, 10, 19, 10, 15))  # Monday
+TUE_23H = epoch(datetime(2026, 10, 20, 23, 59, 59))
+
+
+def _columns(dictionary: Dictionary) -> Columns:
+    return Columns.from_rows(
+        [
+            (MON_10H, "u1", "chat_with_ai", "gpt-4", None, 100, 50),
+            (MON_10H + 60, "u2", None, "gpt-4", None, 10, 5),
+            (TUE_23H, "u1", "chat_with_ai", "gpt-4o", "2024-08", 1, None),
+        ],
+        dictionary,
+    )
+
+
+def test_aggregate_groups_and_sorts_by_requests():
+    dictionary = Dictionary()
+    rows = aggregate(
+        _columns(dictionary), dictionary, from_ts=0, to_ts=TUE_23H, group_by=["model_name"], filters={}
+    )
+    assert rows == [
+        {"model_name": "gpt-4", "request_count": 2, "input_tokens": 110, "output_tokens": 55, "total_tokens": 165},
+        {"model_name": "gpt-4o", "request_count": 1, "input_tokens": 1, "output_tokens": 0, "total_tokens": 1},
+    ]
+
+
+def test_aggregate_time_dimensions():
+    dictionary = Dictionary()
+    columns = _columns(dictionary)
+    by_time = aggregate(
+        columns, dictionary, from_ts=0, to_ts=TUE_23H, group_by=["weekday", "hour_of_day"], filters={}
+    )
+    assert [(r["weekday"], r["hour_of_day"], r["request_count"]) for r in by_time] == [(0, 10, 2), (1, 23, 1)]
+    by_week = aggregate(columns, dictionary, from_ts=0, to_ts=TUE_23H, group_by=["week", "month", "day"], filters={})
+    assert [(r["week"], r["month"], r["day"]) for r in by_week] == [
+        ("2026-10-19", "2026-10", "2026-10-19"),
+        ("2026-10-19", "2026-10", "2026-10-20"),
+    ]
+
+
+def test_aggregate_filters_and_range():
+    dictionary = Dictionary()
+    columns = _columns(dictionary)
+    rows = aggregate(
+        columns, dictionary, from_ts=0, to_ts=TUE_23H, group_by=[], filters={"assist_mode": [None], "user_id": ["u2"]}
+    )
+    assert [r["request_count"] for r in rows] == [1]
+    assert aggregate(columns, dictionary, from_ts=0, to_ts=TUE_23H, group_by=[], filters={"user_id": ["nobody"]}) == []
+    assert aggregate(columns, dictionary, from_ts=TUE_23H, to_ts=TUE_23H, group_by=[], filters={})[0]["request_count"] == 1
+
+
+def test_tenant_table_drops_old_rows_and_caps_memory():
+    dictionary = Dictionary()
+    table = TenantTable(dictionary, Columns(), start=0, watermark=0, generation=0)
+    table.append(_columns(dictionary), start=0, watermark=TUE_23H, max_rows=10)
+    assert len(table.columns) == 3 and table.start == 0
+
+    table.append(Columns(), start=MON_10H, watermark=TUE_23H, max_rows=10)
+    assert len(table.columns) == 2 and table.start == MON_10H
+
+    table.append(Columns(), start=MON_10H, watermark=TUE_23H, max_rows=1)
+    assert table.columns.ts.tolist() == [TUE_23H] and table.start == MON_10H + 60
+
+
+def test_newest_rows_releases_old_chunks_while_loading():
+    dictionary = Dictionary()
+    newest = NewestRows(max_rows=3)
+    for ts in range(0, 10, 2):
+        newest.add(Columns.from_rows([(ts, "u", None, "m", None, 1, 1), (ts + 1, "u", None, "m", None, 1, 1)], dictionary))
+        assert sum(len(p) for p in newest._parts) <= 3 + 2  # max_rows plus one chunk
+    columns = newest.columns()
+    assert columns.ts.tolist() == [7, 8, 9]
+    assert newest.dropped_until == 6
+
+    unbounded = NewestRows(max_rows=None)
+    unbounded.add(columns)
+    assert len(unbounded.columns()) == 3 and unbounded.dropped_until is None
+
+
+def test_dictionary_copy_leaves_original_unchanged():
+    dictionary = Dictionary()
+    code = dictionary.encode("u1")
+    tail = dictionary.copy()
+    assert tail.encode("u1") == code
+    tail.encode("u2")
+    assert dictionary.values == ["u1"] and dictionary.lookup("u2") is None